@@ -0,0 +1,163 @@
+"""restricciones de cruce en horario (grupo, docente, aula)
+
+Agrega horario.id_grupo / horario.id_docente (copias mantenidas por trigger)
+y los índices únicos parciales que impiden los cruces en la propia BD.
+
+Si la BD ya tiene cruces guardados, los índices no se podrían crear: antes se
+desactivan (estado = 0) las casillas sobrantes de cada cruce, dejando la de menor
+id, y se listan en el log de la migración para revisarlas.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Copia congelada del DDL de app/models/horario.py tal como quedó en esta revisión.
+# No se importa de app.models: si el modelo cambia después, esta migración no debe cambiar.
+
+DDL_CRUCES = (
+    # 1. Al insertar o cambiar la sesión de una casilla, copiamos grupo y docente
+    """
+    CREATE OR REPLACE FUNCTION horario_sync_grupo_docente() RETURNS trigger AS $$
+    BEGIN
+        IF NEW.id_sesion IS NULL THEN
+            NEW.id_grupo := NULL;
+            NEW.id_docente := NULL;
+        ELSE
+            SELECT g.id, g.id_docente INTO NEW.id_grupo, NEW.id_docente
+            FROM sesion s JOIN grupo g ON g.id = s.id_grupo
+            WHERE s.id = NEW.id_sesion;
+        END IF;
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER trg_horario_sync_grupo_docente
+    BEFORE INSERT OR UPDATE OF id_sesion ON horario
+    FOR EACH ROW EXECUTE FUNCTION horario_sync_grupo_docente()
+    """,
+
+    # 2. Si cambia el docente de un grupo, sus casillas cambian de dueño
+    #    (si el nuevo docente ya tiene clase en ese bloque, el UPDATE del grupo falla)
+    """
+    CREATE OR REPLACE FUNCTION grupo_propaga_docente() RETURNS trigger AS $$
+    BEGIN
+        UPDATE horario SET id_docente = NEW.id_docente WHERE id_grupo = NEW.id;
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER trg_grupo_propaga_docente
+    AFTER UPDATE OF id_docente ON grupo
+    FOR EACH ROW WHEN (OLD.id_docente IS DISTINCT FROM NEW.id_docente)
+    EXECUTE FUNCTION grupo_propaga_docente()
+    """,
+
+    # 3. Si una sesión se mueve a otro grupo, sus casillas también
+    """
+    CREATE OR REPLACE FUNCTION sesion_propaga_grupo() RETURNS trigger AS $$
+    BEGIN
+        UPDATE horario
+        SET id_grupo = NEW.id_grupo,
+            id_docente = (SELECT g.id_docente FROM grupo g WHERE g.id = NEW.id_grupo)
+        WHERE id_sesion = NEW.id;
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER trg_sesion_propaga_grupo
+    AFTER UPDATE OF id_grupo ON sesion
+    FOR EACH ROW WHEN (OLD.id_grupo IS DISTINCT FROM NEW.id_grupo)
+    EXECUTE FUNCTION sesion_propaga_grupo()
+    """,
+)
+
+INDICES_CRUCE = (
+    ('uq_horario_grupo_bloque', 'id_grupo'),
+    ('uq_horario_docente_bloque', 'id_docente'),
+    ('uq_horario_aula_bloque', 'id_aula'),
+)
+
+
+log = logging.getLogger("alembic.runtime.migration")
+
+
+def _desactivar_cruces(columna: str) -> None:
+    """Deja activa solo la primera casilla (menor id) de cada (periodo, bloque, columna) repetido."""
+    sql = f"""
+        WITH repetidas AS (
+            SELECT id, row_number() OVER (PARTITION BY id_periodo, id_bloque, {columna} ORDER BY id) AS n
+            FROM horario
+            WHERE estado = 1 AND {columna} IS NOT NULL
+        )
+        UPDATE horario h SET estado = 0
+        FROM repetidas r
+        WHERE r.id = h.id AND r.n > 1
+    """
+    if op.get_context().as_sql:
+        op.execute(sql)  # alembic upgrade --sql: sin conexión, no hay reporte
+        return
+    sobrantes = op.get_bind().execute(sa.text(sql + f" RETURNING h.id, h.id_periodo, h.id_bloque, h.{columna}")).all()
+    for id_horario, id_periodo, id_bloque, valor in sorted(sobrantes):
+        log.warning("Cruce de %s: horario %s (periodo %s, bloque %s, %s=%s) queda con estado=0",
+                    columna, id_horario, id_periodo, id_bloque, columna, valor)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Sin FK (ver app/models/horario.py): son copias que mantiene el trigger
+    op.add_column('horario', sa.Column('id_grupo', sa.Integer(), nullable=True))
+    op.add_column('horario', sa.Column('id_docente', sa.Integer(), nullable=True))
+
+    # Rellenar las filas que ya existen
+    op.execute("""
+        UPDATE horario h
+        SET id_grupo = g.id, id_docente = g.id_docente
+        FROM sesion s JOIN grupo g ON g.id = s.id_grupo
+        WHERE s.id = h.id_sesion
+    """)
+
+    for sql in DDL_CRUCES:
+        op.execute(sql)
+
+    for _, columna in INDICES_CRUCE:
+        _desactivar_cruces(columna)
+
+    for nombre, columna in INDICES_CRUCE:
+        op.create_index(
+            nombre, 'horario', ['id_periodo', 'id_bloque', columna], unique=True,
+            postgresql_where=sa.text(f'estado = 1 AND {columna} IS NOT NULL'),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for nombre, _ in INDICES_CRUCE:
+        op.drop_index(nombre, table_name='horario')
+
+    op.execute("DROP TRIGGER IF EXISTS trg_sesion_propaga_grupo ON sesion")
+    op.execute("DROP TRIGGER IF EXISTS trg_grupo_propaga_docente ON grupo")
+    op.execute("DROP TRIGGER IF EXISTS trg_horario_sync_grupo_docente ON horario")
+    op.execute("DROP FUNCTION IF EXISTS sesion_propaga_grupo()")
+    op.execute("DROP FUNCTION IF EXISTS grupo_propaga_docente()")
+    op.execute("DROP FUNCTION IF EXISTS horario_sync_grupo_docente()")
+
+    op.drop_column('horario', 'id_docente')
+    op.drop_column('horario', 'id_grupo')
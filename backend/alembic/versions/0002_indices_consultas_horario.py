@@ -0,0 +1,47 @@
+"""índices compuestos para las consultas de la grilla
+
+Las consultas calientes filtran por periodo/estado/bloque en horario y recorren
+sesion -> grupo -> curso_aperturado por sus FKs; sin estos índices todas
+terminan en Seq Scan.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (nombre, tabla, columnas) -> deben coincidir con los modelos
+INDICES = (
+    ('ix_horario_periodo_estado_bloque', 'horario', ['id_periodo', 'estado', 'id_bloque']),
+    ('ix_horario_sesion', 'horario', ['id_sesion']),
+    ('ix_sesion_id_grupo', 'sesion', ['id_grupo']),
+    ('ix_grupo_id_docente', 'grupo', ['id_docente']),
+    ('ix_grupo_id_curso_aperturado', 'grupo', ['id_curso_aperturado']),
+    ('ix_curso_aperturado_id_periodo', 'curso_aperturado', ['id_periodo']),
+    ('ix_bloque_horario_id_turno', 'bloque_horario', ['id_turno']),
+    ('ix_restriccion_entidad', 'restriccion', ['entidad_referencia', 'id_entidad', 'tipo', 'estado']),
+    ('ix_disponibilidad_docente_periodo', 'disponibilidad_docente', ['id_docente', 'id_periodo']),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for nombre, tabla, columnas in INDICES:
+        op.create_index(nombre, tabla, columnas, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for nombre, tabla, _ in reversed(INDICES):
+        op.drop_index(nombre, table_name=tabla, if_exists=True)
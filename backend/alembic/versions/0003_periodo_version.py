@@ -0,0 +1,104 @@
+"""versión de escritura por periodo (periodo_version)
+
+Tabla contador + triggers por sentencia en horario, sesion, grupo y
+curso_aperturado. La usan los cachés (auditoría de cruces, etc.) como clave.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# DDL de periodo_version en esta revisión, copiado aquí a propósito: el modelo puede
+# seguir cambiando en revisiones posteriores y esta no.
+
+# Cómo llegar al periodo desde las filas tocadas. {t} = tabla de transición (nuevas / viejas)
+PERIODO_DESDE = {
+    'horario': "SELECT t.id_periodo FROM {t} t",
+    'curso_aperturado': "SELECT t.id_periodo FROM {t} t",
+    'grupo': "SELECT ca.id_periodo FROM {t} t JOIN curso_aperturado ca ON ca.id = t.id_curso_aperturado",
+    'sesion': ("SELECT ca.id_periodo FROM {t} t JOIN grupo g ON g.id = t.id_grupo "
+               "JOIN curso_aperturado ca ON ca.id = g.id_curso_aperturado"),
+}
+
+
+def _ddl_version() -> tuple:
+    sentencias = [
+        # plpgsql (no sql) para que no valide que periodo_version exista al crearse
+        """
+        CREATE OR REPLACE FUNCTION periodo_version_subir(periodos integer[]) RETURNS void AS $$
+        BEGIN
+            -- ORDER BY: siempre se bloquea en el mismo orden (evita deadlocks)
+            INSERT INTO periodo_version (id_periodo, version)
+            SELECT DISTINCT p, 1 FROM unnest(periodos) p WHERE p IS NOT NULL ORDER BY 1
+            ON CONFLICT (id_periodo) DO UPDATE SET version = periodo_version.version + 1;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+    ]
+    for tabla, consulta in PERIODO_DESDE.items():
+        nuevas, viejas = consulta.format(t='nuevas'), consulta.format(t='viejas')
+        sentencias.append(f"""
+        CREATE OR REPLACE FUNCTION {tabla}_sube_version() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                PERFORM periodo_version_subir(ARRAY({nuevas}));
+            ELSIF TG_OP = 'DELETE' THEN
+                PERFORM periodo_version_subir(ARRAY({viejas}));
+            ELSE
+                PERFORM periodo_version_subir(ARRAY({nuevas} UNION {viejas}));
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """)
+        # Postgres no deja tablas de transición en triggers de varios eventos: uno por evento
+        for evento, referencias in (
+            ('INSERT', 'NEW TABLE AS nuevas'),
+            ('UPDATE', 'NEW TABLE AS nuevas OLD TABLE AS viejas'),
+            ('DELETE', 'OLD TABLE AS viejas'),
+        ):
+            sentencias.append(f"""
+            CREATE TRIGGER trg_{tabla}_version_{evento.lower()}
+            AFTER {evento} ON {tabla} REFERENCING {referencias}
+            FOR EACH STATEMENT EXECUTE FUNCTION {tabla}_sube_version()
+            """)
+    return tuple(sentencias)
+
+
+DDL_VERSION = _ddl_version()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # if_not_exists: una versión anterior de la app hacía create_all al arrancar y pudo crearla
+    op.create_table(
+        'periodo_version',
+        sa.Column('id_periodo', sa.Integer(), primary_key=True),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        if_not_exists=True,
+    )
+    for sql in DDL_VERSION:
+        op.execute(sql)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for tabla in PERIODO_DESDE:
+        for evento in ('insert', 'update', 'delete'):
+            op.execute(f"DROP TRIGGER IF EXISTS trg_{tabla}_version_{evento} ON {tabla}")
+        op.execute(f"DROP FUNCTION IF EXISTS {tabla}_sube_version()")
+    op.execute("DROP FUNCTION IF EXISTS periodo_version_subir(integer[])")
+    op.drop_table('periodo_version')
@@ -0,0 +1,55 @@
+"""catálogos también suben periodo_version
+
+Las respuestas por periodo (con ETag) incluyen nombres de docente, curso, aula
+y horas de bloque: si cambian, el ETag tiene que cambiar.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Triggers de catálogos tal como eran en esta revisión (copiados, no importados).
+CATALOGOS = ('curso', 'docente', 'aula', 'bloque_horario')
+
+DDL_VERSION_CATALOGOS = (
+    """
+    CREATE OR REPLACE FUNCTION catalogo_sube_version() RETURNS trigger AS $$
+    BEGIN
+        PERFORM periodo_version_subir(ARRAY(SELECT id FROM periodo_academico));
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+) + tuple(
+    f"""
+    CREATE TRIGGER trg_{tabla}_version
+    AFTER INSERT OR UPDATE OR DELETE ON {tabla}
+    FOR EACH STATEMENT EXECUTE FUNCTION catalogo_sube_version()
+    """
+    for tabla in CATALOGOS
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for sql in DDL_VERSION_CATALOGOS:
+        op.execute(sql)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for tabla in CATALOGOS:
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{tabla}_version ON {tabla}")
+    op.execute("DROP FUNCTION IF EXISTS catalogo_sube_version()")
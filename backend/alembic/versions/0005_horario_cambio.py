@@ -0,0 +1,94 @@
+"""bitácora de cambios de horario (sincronización por deltas)
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Trigger de la bitácora tal como era en esta revisión (copiado, no importado).
+
+# Bloqueo por periodo hasta el commit: sin él, una transacción con seq=100 podría
+# confirmar DESPUÉS de que un cliente ya leyó seq=101 y ese cambio se perdería.
+_BLOQUEAR_PERIODOS = """
+            FOR p IN SELECT DISTINCT x.id_periodo FROM ({filas}) x ORDER BY 1 LOOP
+                PERFORM pg_advisory_xact_lock(4217, p);
+            END LOOP;"""
+
+DDL_CAMBIOS = (
+    f"""
+    CREATE OR REPLACE FUNCTION horario_registra_cambio() RETURNS trigger AS $$
+    DECLARE
+        p integer;
+    BEGIN
+        IF TG_OP = 'INSERT' THEN{_BLOQUEAR_PERIODOS.format(filas="SELECT id_periodo FROM nuevas")}
+            INSERT INTO horario_cambio (id_periodo, id_horario, operacion)
+            SELECT id_periodo, id, 'I' FROM nuevas ORDER BY id;
+        ELSIF TG_OP = 'DELETE' THEN{_BLOQUEAR_PERIODOS.format(filas="SELECT id_periodo FROM viejas")}
+            INSERT INTO horario_cambio (id_periodo, id_horario, operacion)
+            SELECT id_periodo, id, 'D' FROM viejas ORDER BY id;
+        ELSE{_BLOQUEAR_PERIODOS.format(filas="SELECT id_periodo FROM nuevas UNION SELECT id_periodo FROM viejas")}
+            -- Si la casilla cambió de periodo, para el periodo viejo es un borrado
+            INSERT INTO horario_cambio (id_periodo, id_horario, operacion)
+            SELECT n.id_periodo, n.id, 'U' FROM nuevas n
+            UNION ALL
+            SELECT v.id_periodo, v.id, 'D' FROM viejas v JOIN nuevas n ON n.id = v.id
+            WHERE n.id_periodo <> v.id_periodo;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+) + tuple(
+    f"""
+    CREATE TRIGGER trg_horario_cambio_{evento.lower()}
+    AFTER {evento} ON horario REFERENCING {referencias}
+    FOR EACH STATEMENT EXECUTE FUNCTION horario_registra_cambio()
+    """
+    for evento, referencias in (
+        ('INSERT', 'NEW TABLE AS nuevas'),
+        ('UPDATE', 'NEW TABLE AS nuevas OLD TABLE AS viejas'),
+        ('DELETE', 'OLD TABLE AS viejas'),
+    )
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'horario_cambio',
+        sa.Column('seq', sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column('id_periodo', sa.Integer(), nullable=False),
+        sa.Column('id_horario', sa.Integer(), nullable=False),
+        sa.Column('operacion', sa.String(1), nullable=False),
+        sa.Column('fecha', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        if_not_exists=True,  # ver 0003: create_all al arrancar pudo crearla antes
+    )
+    op.create_index('ix_horario_cambio_periodo_seq', 'horario_cambio', ['id_periodo', 'seq'], if_not_exists=True)
+    op.add_column('periodo_version', sa.Column('seq_compactado', sa.BigInteger(), nullable=False, server_default='0'),
+                  if_not_exists=True)
+
+    for sql in DDL_CAMBIOS:
+        op.execute(sql)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for evento in ('insert', 'update', 'delete'):
+        op.execute(f"DROP TRIGGER IF EXISTS trg_horario_cambio_{evento} ON horario")
+    op.execute("DROP FUNCTION IF EXISTS horario_registra_cambio()")
+    op.drop_column('periodo_version', 'seq_compactado')
+    op.drop_index('ix_horario_cambio_periodo_seq', table_name='horario_cambio')
+    op.drop_table('horario_cambio')
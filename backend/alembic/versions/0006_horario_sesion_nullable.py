@@ -0,0 +1,32 @@
+"""horario.id_sesion admite NULL (casillas vacías)
+
+Las casillas vacías del esqueleto de un grupo (y las que deja una sesión al
+moverse) tienen id_sesion NULL. El modelo lo declaraba NOT NULL, así que una
+base creada con create_all no podía guardarlas.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, Sequence[str], None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column('horario', 'id_sesion', nullable=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DELETE FROM horario WHERE id_sesion IS NULL")
+    op.alter_column('horario', 'id_sesion', nullable=False)
@@ -0,0 +1,160 @@
+"""periodo_version se sube al hacer commit; catálogos solo a sus periodos
+
+Antes cada sentencia hacía el UPSERT en periodo_version y la fila del periodo
+quedaba bloqueada hasta el commit (todas las escrituras del periodo en fila).
+Ahora las sentencias anotan (xid, periodo) en periodo_version_pendiente y un
+CONSTRAINT TRIGGER diferido sube la versión al final de la transacción.
+Los triggers de catálogos pasan de subir todos los periodos a subir solo los
+que usan las filas tocadas.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, Sequence[str], None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# DDL de esta revisión, copiado (no importado de app.models).
+
+PENDIENTES = (
+    """
+    CREATE OR REPLACE FUNCTION periodo_version_subir(periodos integer[]) RETURNS void AS $$
+    BEGIN
+        INSERT INTO periodo_version_pendiente (xid, id_periodo)
+        SELECT DISTINCT txid_current(), p FROM unnest(periodos) p WHERE p IS NOT NULL
+        ON CONFLICT DO NOTHING;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION periodo_version_aplicar() RETURNS trigger AS $$
+    BEGIN
+        WITH hechos AS (
+            DELETE FROM periodo_version_pendiente WHERE xid = NEW.xid RETURNING id_periodo
+        )
+        INSERT INTO periodo_version (id_periodo, version)
+        SELECT id_periodo, 1 FROM hechos ORDER BY 1
+        ON CONFLICT (id_periodo) DO UPDATE SET version = periodo_version.version + 1;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE CONSTRAINT TRIGGER trg_periodo_version_aplicar
+    AFTER INSERT ON periodo_version_pendiente
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION periodo_version_aplicar()
+    """,
+)
+
+CATALOGOS = {
+    'curso': "SELECT ca.id_periodo FROM {t} t JOIN curso_aperturado ca ON ca.id_curso = t.id",
+    'docente': ("SELECT ca.id_periodo FROM {t} t JOIN grupo g ON g.id_docente = t.id "
+                "JOIN curso_aperturado ca ON ca.id = g.id_curso_aperturado"),
+    'aula': "SELECT h.id_periodo FROM {t} t JOIN horario h ON h.id_aula = t.id",
+    'bloque_horario': ("SELECT ca.id_periodo FROM {t} t JOIN grupo g ON g.id_turno = t.id_turno "
+                       "JOIN curso_aperturado ca ON ca.id = g.id_curso_aperturado"),
+}
+
+EVENTOS = (
+    ('INSERT', 'NEW TABLE AS nuevas'),
+    ('UPDATE', 'NEW TABLE AS nuevas OLD TABLE AS viejas'),
+    ('DELETE', 'OLD TABLE AS viejas'),
+)
+
+
+def _ddl_catalogos() -> list:
+    sentencias = []
+    for tabla, consulta in CATALOGOS.items():
+        nuevas, viejas = consulta.format(t='nuevas'), consulta.format(t='viejas')
+        sentencias.append(f"""
+        CREATE OR REPLACE FUNCTION {tabla}_sube_version() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                PERFORM periodo_version_subir(ARRAY({nuevas}));
+            ELSIF TG_OP = 'DELETE' THEN
+                PERFORM periodo_version_subir(ARRAY({viejas}));
+            ELSE
+                PERFORM periodo_version_subir(ARRAY({nuevas} UNION {viejas}));
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """)
+        for evento, referencias in EVENTOS:
+            sentencias.append(f"""
+            CREATE TRIGGER trg_{tabla}_version_{evento.lower()}
+            AFTER {evento} ON {tabla} REFERENCING {referencias}
+            FOR EACH STATEMENT EXECUTE FUNCTION {tabla}_sube_version()
+            """)
+    return sentencias
+
+
+# Lo que había en 0003 / 0004, para el downgrade
+SUBIR_ANTERIOR = """
+    CREATE OR REPLACE FUNCTION periodo_version_subir(periodos integer[]) RETURNS void AS $$
+    BEGIN
+        -- ORDER BY: siempre se bloquea en el mismo orden (evita deadlocks)
+        INSERT INTO periodo_version (id_periodo, version)
+        SELECT DISTINCT p, 1 FROM unnest(periodos) p WHERE p IS NOT NULL ORDER BY 1
+        ON CONFLICT (id_periodo) DO UPDATE SET version = periodo_version.version + 1;
+    END;
+    $$ LANGUAGE plpgsql
+"""
+CATALOGO_ANTERIOR = """
+    CREATE OR REPLACE FUNCTION catalogo_sube_version() RETURNS trigger AS $$
+    BEGIN
+        PERFORM periodo_version_subir(ARRAY(SELECT id FROM periodo_academico));
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'periodo_version_pendiente',
+        sa.Column('xid', sa.BigInteger(), primary_key=True),
+        sa.Column('id_periodo', sa.Integer(), primary_key=True),
+        if_not_exists=True,  # ver 0003: create_all al arrancar pudo crearla (con su trigger)
+    )
+    op.execute("DROP TRIGGER IF EXISTS trg_periodo_version_aplicar ON periodo_version_pendiente")
+    for sql in PENDIENTES:
+        op.execute(sql)
+
+    for tabla in CATALOGOS:
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{tabla}_version ON {tabla}")
+    op.execute("DROP FUNCTION IF EXISTS catalogo_sube_version()")
+    for sql in _ddl_catalogos():
+        op.execute(sql)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for tabla in CATALOGOS:
+        for evento, _ in EVENTOS:
+            op.execute(f"DROP TRIGGER IF EXISTS trg_{tabla}_version_{evento.lower()} ON {tabla}")
+        op.execute(f"DROP FUNCTION IF EXISTS {tabla}_sube_version()")
+    op.execute(CATALOGO_ANTERIOR)
+    for tabla in CATALOGOS:
+        op.execute(f"""
+            CREATE TRIGGER trg_{tabla}_version
+            AFTER INSERT OR UPDATE OR DELETE ON {tabla}
+            FOR EACH STATEMENT EXECUTE FUNCTION catalogo_sube_version()
+        """)
+
+    op.execute(SUBIR_ANTERIOR)
+    op.drop_table('periodo_version_pendiente')  # se lleva el constraint trigger
+    op.execute("DROP FUNCTION IF EXISTS periodo_version_aplicar()")
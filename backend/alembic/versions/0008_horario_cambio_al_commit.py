@@ -0,0 +1,148 @@
+"""horario_cambio saca su seq al hacer commit, sin candado por periodo
+
+Antes el trigger de la bitácora tomaba pg_advisory_xact_lock(4217, periodo) y lo
+tenía hasta el commit: todas las escrituras de un periodo iban en fila y dos
+transacciones que tocaban periodos en distinto orden podían trabarse.
+Ahora la sentencia solo anota en horario_cambio_pendiente y el trigger diferido
+de periodo_version (0007), con las filas de periodo_version ya bloqueadas, pasa
+las anotaciones a horario_cambio: el seq sale en el orden de los commits.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, Sequence[str], None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# DDL de esta revisión, copiado (no importado de app.models).
+
+CAMBIOS = (
+    """
+    CREATE OR REPLACE FUNCTION horario_registra_cambio() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO horario_cambio_pendiente (xid, id_periodo, id_horario, operacion)
+            SELECT txid_current(), id_periodo, id, 'I' FROM nuevas ORDER BY id;
+        ELSIF TG_OP = 'DELETE' THEN
+            INSERT INTO horario_cambio_pendiente (xid, id_periodo, id_horario, operacion)
+            SELECT txid_current(), id_periodo, id, 'D' FROM viejas ORDER BY id;
+        ELSE
+            -- Si la casilla cambió de periodo, para el periodo viejo es un borrado
+            INSERT INTO horario_cambio_pendiente (xid, id_periodo, id_horario, operacion)
+            SELECT txid_current(), n.id_periodo, n.id, 'U' FROM nuevas n
+            UNION ALL
+            SELECT txid_current(), v.id_periodo, v.id, 'D' FROM viejas v JOIN nuevas n ON n.id = v.id
+            WHERE n.id_periodo <> v.id_periodo;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION horario_cambio_confirmar(transaccion bigint) RETURNS void AS $$
+    BEGIN
+        WITH movidos AS (
+            DELETE FROM horario_cambio_pendiente WHERE xid = transaccion
+            RETURNING id, id_periodo, id_horario, operacion
+        )
+        INSERT INTO horario_cambio (id_periodo, id_horario, operacion)
+        SELECT id_periodo, id_horario, operacion FROM movidos ORDER BY id;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION periodo_version_aplicar() RETURNS trigger AS $$
+    BEGIN
+        WITH hechos AS (
+            DELETE FROM periodo_version_pendiente WHERE xid = NEW.xid RETURNING id_periodo
+        )
+        INSERT INTO periodo_version (id_periodo, version)
+        SELECT id_periodo, 1 FROM hechos ORDER BY 1
+        ON CONFLICT (id_periodo) DO UPDATE SET version = periodo_version.version + 1;
+        PERFORM horario_cambio_confirmar(NEW.xid);
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+)
+
+# Lo que había en 0005 / 0007, para el downgrade
+_BLOQUEAR_PERIODOS = """
+            FOR p IN SELECT DISTINCT x.id_periodo FROM ({filas}) x ORDER BY 1 LOOP
+                PERFORM pg_advisory_xact_lock(4217, p);
+            END LOOP;"""
+
+CAMBIOS_ANTERIOR = (
+    f"""
+    CREATE OR REPLACE FUNCTION horario_registra_cambio() RETURNS trigger AS $$
+    DECLARE
+        p integer;
+    BEGIN
+        IF TG_OP = 'INSERT' THEN{_BLOQUEAR_PERIODOS.format(filas="SELECT id_periodo FROM nuevas")}
+            INSERT INTO horario_cambio (id_periodo, id_horario, operacion)
+            SELECT id_periodo, id, 'I' FROM nuevas ORDER BY id;
+        ELSIF TG_OP = 'DELETE' THEN{_BLOQUEAR_PERIODOS.format(filas="SELECT id_periodo FROM viejas")}
+            INSERT INTO horario_cambio (id_periodo, id_horario, operacion)
+            SELECT id_periodo, id, 'D' FROM viejas ORDER BY id;
+        ELSE{_BLOQUEAR_PERIODOS.format(filas="SELECT id_periodo FROM nuevas UNION SELECT id_periodo FROM viejas")}
+            -- Si la casilla cambió de periodo, para el periodo viejo es un borrado
+            INSERT INTO horario_cambio (id_periodo, id_horario, operacion)
+            SELECT n.id_periodo, n.id, 'U' FROM nuevas n
+            UNION ALL
+            SELECT v.id_periodo, v.id, 'D' FROM viejas v JOIN nuevas n ON n.id = v.id
+            WHERE n.id_periodo <> v.id_periodo;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION periodo_version_aplicar() RETURNS trigger AS $$
+    BEGIN
+        WITH hechos AS (
+            DELETE FROM periodo_version_pendiente WHERE xid = NEW.xid RETURNING id_periodo
+        )
+        INSERT INTO periodo_version (id_periodo, version)
+        SELECT id_periodo, 1 FROM hechos ORDER BY 1
+        ON CONFLICT (id_periodo) DO UPDATE SET version = periodo_version.version + 1;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'horario_cambio_pendiente',
+        sa.Column('id', sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column('xid', sa.BigInteger(), nullable=False),
+        sa.Column('id_periodo', sa.Integer(), nullable=False),
+        sa.Column('id_horario', sa.Integer(), nullable=False),
+        sa.Column('operacion', sa.String(1), nullable=False),
+        if_not_exists=True,  # ver 0003: create_all al arrancar pudo crearla antes
+    )
+    op.create_index('ix_horario_cambio_pendiente_xid', 'horario_cambio_pendiente', ['xid'], if_not_exists=True)
+    for sql in CAMBIOS:
+        op.execute(sql)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for sql in CAMBIOS_ANTERIOR:
+        op.execute(sql)
+    op.execute("DROP FUNCTION IF EXISTS horario_cambio_confirmar(bigint)")
+    op.drop_index('ix_horario_cambio_pendiente_xid', table_name='horario_cambio_pendiente')
+    op.drop_table('horario_cambio_pendiente')
@@ -0,0 +1,58 @@
+"""disponibilidad_docente: una sola fila por (docente, periodo)
+
+El saldo de horas se creaba con un SELECT y luego un INSERT: dos asignaciones
+simultáneas al mismo docente podían crear dos filas, y desde ahí cada una sumaba
+en una fila distinta. Los duplicados que ya existan se funden en la fila más
+antigua (sumando sus horas) y el índice pasa a ser una restricción UNIQUE.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, Sequence[str], None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+FUNDIR_DUPLICADOS = """
+    WITH grupos AS (
+        SELECT id_docente, id_periodo, min(id) AS id_queda,
+               sum(coalesce(horas_asignadas_actuales, 0)) AS horas, max(estado) AS estado
+        FROM disponibilidad_docente
+        WHERE id_docente IS NOT NULL AND id_periodo IS NOT NULL
+        GROUP BY id_docente, id_periodo
+        HAVING count(*) > 1
+    ),
+    sumados AS (
+        UPDATE disponibilidad_docente d
+        SET horas_asignadas_actuales = g.horas, estado = g.estado
+        FROM grupos g
+        WHERE d.id = g.id_queda
+    )
+    DELETE FROM disponibilidad_docente d
+    USING grupos g
+    WHERE d.id_docente = g.id_docente AND d.id_periodo = g.id_periodo AND d.id <> g.id_queda
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(FUNDIR_DUPLICADOS)
+    op.drop_index('ix_disponibilidad_docente_periodo', table_name='disponibilidad_docente', if_exists=True)
+    op.create_unique_constraint(
+        'uq_disponibilidad_docente_periodo', 'disponibilidad_docente', ['id_docente', 'id_periodo']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_disponibilidad_docente_periodo', 'disponibilidad_docente', type_='unique')
+    op.create_index('ix_disponibilidad_docente_periodo', 'disponibilidad_docente', ['id_docente', 'id_periodo'])
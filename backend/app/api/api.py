@@ -11,6 +11,7 @@ from app.api.endpoints import contratos
 
 from app.api.endpoints import horarios
 from app.api.endpoints import grupos
+from app.api.endpoints import exportaciones
 api_router = APIRouter()
 
 #PLANIFICACION
@@ -42,4 +43,5 @@ api_router.include_router(horarios.router,  prefix="/horarios", tags=["Horarios"
 #api_router.include_router(gestion_horarios.router,  prefix="/gestion_horarios", tags=["Horarios"])
 
 api_router.include_router(grupos.router, prefix="/grupos", tags=["grupos"])
+api_router.include_router(exportaciones.router, prefix="/exportaciones", tags=["Exportaciones"])
 # api_router.include_router(escuela.router, prefix="/escuelas", tags=["Escuelas"])
\ No newline at end of file
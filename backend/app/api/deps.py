@@ -1,10 +1,13 @@
-from typing import AsyncGenerator
-from fastapi import Depends, HTTPException, status
+from typing import AsyncGenerator, Any, List, Optional
+from fastapi import Depends, HTTPException, status, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from jose import jwt, JWTError # <-- Necesitamos JWTError para capturar fallos
 from app.core.config import settings
 from app.core.database import get_db
+from app.core import cache_usuarios
 # Importamos el CRUD para buscar el usuario
 from app.crud.crud_usuario import usuario as crud_usuario 
 from app.models.usuario import Usuario
@@ -26,7 +29,12 @@ async def get_current_user(
     db: AsyncSession = Depends(get_db),
     token: str = Depends(oauth2_scheme)
 ) -> Usuario:
-    """Decodifica el token, verifica su validez y retorna el objeto Usuario.""" 
+    """
+    Decodifica el token, verifica su validez y retorna el objeto Usuario.
+    El usuario se reutiliza unos segundos (USUARIO_CACHE_TTL) por (sub, iat): las pantallas
+    de la grilla hacen muchas llamadas seguidas con el mismo token. Se invalida al editar
+    el usuario. El objeto viene desligado de la sesión: solo leer sus columnas.
+    """ 
 
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -44,6 +52,7 @@ async def get_current_user(
         )
         
         username: str = payload.get("sub") # Usamos 'sub' (subject) como clave principal
+        iat = payload.get("iat")  # Tokens viejos sin iat comparten la clave (username, None)
         
         if username is None:
             raise credentials_exception
@@ -52,13 +61,20 @@ async def get_current_user(
         # Captura errores comunes de token: expiración, firma incorrecta, etc.
         raise credentials_exception
         
+    user = cache_usuarios.obtener(username, iat)
+    if user is not None:
+        return user
+
     # 2. BÚSQUEDA DEL USUARIO:
     # Usamos el CRUD que creamos (crud_usuario) para buscar el usuario
     user = await crud_usuario.get_by_username(db, username=username)
     
     if user is None:
         raise credentials_exception # El usuario existe en el token pero no en la BD
-        
+
+    # Se saca de la sesión para poder compartirlo entre peticiones
+    db.expunge(user)
+    cache_usuarios.guardar(username, iat, user)
     return user
 
 
@@ -78,4 +94,75 @@ def get_current_active_admin(current_user: Usuario = Depends(get_current_user))
         )
     # También puedes agregar aquí la verificación de id_escuela is None si fuera SuperAdmin
     
-    return current_user
\ No newline at end of file
+    return current_user
+
+
+# ----------------------------------------------------------------------
+# Paginación común de los listados
+# ----------------------------------------------------------------------
+
+class Paginacion:
+    """
+    Parámetros de todos los listados (usar como Depends(Paginacion)):
+      ?skip=&limit=       paginación clásica (OFFSET)
+      ?despues_de=<id>    cursor: la página siguiente al último id recibido (viene en X-Siguiente)
+      ?campos=id,nombre   solo esas columnas
+      ?contar=true        total del listado en X-Total (X-Total-Exacto=false si es estimado)
+    """
+
+    def __init__(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        despues_de: Optional[int] = None,
+        campos: Optional[str] = None,
+        contar: bool = False
+    ):
+        self.skip = skip
+        self.limit = limit
+        self.despues_de = despues_de
+        self.campos = [c.strip() for c in campos.split(",") if c.strip()] if campos else None
+        self.contar = contar
+
+
+def _responder(filas: List[Any], pag: Paginacion, response: Response, total=None):
+    cabeceras = {}
+    if len(filas) == pag.limit and filas:
+        ultimo = filas[-1]
+        cabeceras["X-Siguiente"] = str(ultimo["id"] if isinstance(ultimo, dict) else ultimo.id)
+    if total is not None:
+        cabeceras["X-Total"] = str(total[0])
+        cabeceras["X-Total-Exacto"] = "true" if total[1] else "false"
+
+    if pag.campos:
+        # Filas parciales: no pasan por el response_model del endpoint
+        return JSONResponse(jsonable_encoder(filas), headers=cabeceras)
+    response.headers.update(cabeceras)
+    return filas
+
+
+async def listar(crud, db: AsyncSession, pag: Paginacion, response: Response, *, base=None):
+    """Listado estándar sobre CRUDBase.get_multi (base = consulta ya filtrada del CRUD)."""
+    filas = await crud.get_multi(
+        db, skip=pag.skip, limit=pag.limit, despues_de=pag.despues_de, campos=pag.campos, base=base
+    )
+    total = await crud.contar(db, base=base) if pag.contar else None
+    return _responder(filas, pag, response, total)
+
+
+def paginar_lista(lista: List[Any], pag: Paginacion, response: Response):
+    """Lo mismo que listar(), pero sobre una lista que ya está en memoria (caché de referencias)."""
+    if pag.despues_de is not None:
+        filas = [f for f in lista if f.id > pag.despues_de][:pag.limit]
+    else:
+        filas = lista[pag.skip:pag.skip + pag.limit]
+
+    if pag.campos:
+        if filas:
+            invalidos = [c for c in pag.campos if c not in type(filas[0]).model_fields]
+            if invalidos:
+                raise HTTPException(400, f"Campos no válidos: {', '.join(invalidos)}")
+        filas = [f.model_dump(include={"id", *pag.campos}) for f in filas]
+
+    total = (len(lista), True) if pag.contar else None
+    return _responder(filas, pag, response, total)
@@ -1,10 +1,10 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
 from app.core.database import get_db
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, Paginacion, paginar_lista
 from app.models.usuario import Usuario
 
 from app.crud.crud_aula import aula as crud_aula
@@ -14,18 +14,16 @@ router = APIRouter()
 
 @router.get("/", response_model=List[AulaResponse])
 async def read_aulas(
+    response: Response,
+    pag: Paginacion = Depends(),
     db: AsyncSession = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user),
-    skip: int = 0,
-    limit: int = 100
+    current_user: Usuario = Depends(get_current_user)
 ):
 
     id_escuela_filter = current_user.id_escuela if current_user.id_escuela is not None else None
     
-    aulas = await crud_aula.get_multi_by_escuela(
-        db, id_escuela=id_escuela_filter, skip=skip, limit=limit
-    )
-    return aulas
+    aulas = await crud_aula.get_by_escuela_cache(db, id_escuela=id_escuela_filter)
+    return paginar_lista(aulas, pag, response)
 
 
 @router.post("/", response_model=AulaResponse)
@@ -9,7 +9,8 @@ from app.crud.crud_usuario import usuario as crud_usuario
 from app.schemas.auth_schema import Token
 
 from app.schemas.usuario import PasswordRecovery, PasswordReset
-from app.core.security import get_password_hash, verify_password
+from app.core.security import get_password_hash_async
+from app.core.cache_usuarios import invalidar_usuario
 
 from app.schemas.usuario import UsuarioResponse
 from app.models.usuario import Usuario
@@ -79,10 +80,12 @@ async def reset_password(
         raise HTTPException(status_code=403, detail="DNI incorrecto.")
         
     
-    hashed_password = get_password_hash(reset_in.new_password)  #Genera el hash de la nueva contraseña
+    hashed_password = await get_password_hash_async(reset_in.new_password)  #Genera el hash de la nueva contraseña
     
+    username = user.username  # Después del commit el objeto queda expirado
     user.password = hashed_password
     db.add(user)
     await db.commit()
+    await invalidar_usuario(username)
     
     return {"message": "Contraseña actualizada correctamente"}
@@ -1,20 +1,22 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from app.schemas.catalogo import CatalogoCreate, CatalogoUpdate, CatalogoResponse
 from app.crud.crud_catalogo import catalogo as crud_catalogo # Instancia
+from app.api.deps import Paginacion, paginar_lista
 
 router = APIRouter()
 
 @router.get("/", response_model=List[CatalogoResponse])
 async def read_catalogos(
-    skip: int = 0, 
-    limit: int = 100, 
+    response: Response,
+    pag: Paginacion = Depends(),
     db: AsyncSession = Depends(get_db)
 ):
-    # ¡Mira qué limpio! Una sola línea llama a la lógica de base de datos
-    return await crud_catalogo.get_multi(db, skip=skip, limit=limit)
+    # Sale del caché de referencia (se invalida al crear / editar)
+    catalogos = await crud_catalogo.get_all_cache(db)
+    return paginar_lista(catalogos, pag, response)
 
 @router.post("/", response_model=CatalogoResponse)
 async def create_catalogo(
@@ -9,7 +9,6 @@ from app.models.usuario import Usuario
 
 # Importamos Modelos
 from app.models.contrato_docente import ContratoDocente
-from app.models.disponibilidad_docente import DisponibilidadDocente
 from app.models.periodo_academico import PeriodoAcademico
 from app.models.restriccion import Restriccion  # <--- NUEVO IMPORT
 
@@ -21,6 +20,7 @@ from app.schemas.contrato_docente import (
     ContratoDocenteResponse
 )
 from app.crud.crud_contrato_docente import contrato_docente
+from app.services.carga_docente_service import asegurar_disponibilidad
 
 router = APIRouter()
 
@@ -63,13 +63,8 @@ async def crear_contrato_manual(
         )
         db.add(nuevo_contrato)
         
-        # 2. Crear Disponibilidad (Contador de horas)
-        nueva_disp = DisponibilidadDocente(
-            id_docente=data.id_docente,
-            id_periodo=periodo.id,
-            horas_asignadas_actuales=0
-        )
-        db.add(nueva_disp)
+        # 2. Crear Disponibilidad (Contador de horas), si no existe ya
+        await asegurar_disponibilidad(db, data.id_docente, periodo.id)
 
         # [cite_start]3. CREAR RESTRICCIONES (La lógica nueva) [cite: 121]
         # Si el usuario marcó días en rojo (ej. no puede venir los Lunes)
@@ -119,15 +114,9 @@ async def crear_contrato_automatico(
             horas_tope_semanales=payload.get('horas_tope_semanales', 20),
             turnos_preferidos=payload.get('turnos_preferidos', 'MAÑANA')
         )
-        
-        nueva_disponibilidad = DisponibilidadDocente(
-            id_docente=payload['id_docente'],
-            id_periodo=periodo.id,
-            horas_asignadas_actuales=0
-        )
 
         db.add(nuevo_contrato)
-        db.add(nueva_disponibilidad)
+        await asegurar_disponibilidad(db, payload['id_docente'], periodo.id)
         await db.commit()
         
         return {"msg": "Docente asignado (Simple)."}
@@ -189,14 +178,8 @@ async def renovar_contratos(
             )
             
             # B. Clonar Disponibilidad
-            disp = DisponibilidadDocente(
-                id_docente=c.id_docente,
-                id_periodo=periodo_nuevo.id,
-                horas_asignadas_actuales=0
-            )
-            
             db.add(nuevo)
-            db.add(disp)
+            await asegurar_disponibilidad(db, c.id_docente, periodo_nuevo.id)
 
             # C. CLONAR RESTRICCIONES (Mejora Crítica)
             # Buscamos las restricciones que tenía en el periodo anterior
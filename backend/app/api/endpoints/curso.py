@@ -1,5 +1,5 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy import select
@@ -8,7 +8,7 @@ from app.core.database import get_db
 from app.crud.crud_curso import curso as crud_curso
 from app.schemas.curso import CursoCreate, CursoResponse, CursoUpdate
 
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, Paginacion, listar
 from app.models.usuario import Usuario
 from app.models.curso import Curso
 from app.models.plan_version import PlanVersion
@@ -16,6 +16,7 @@ from app.models.plan_estudio import PlanEstudio
 
 from sqlalchemy import insert, delete, and_
 from app.models.curso import curso_requisito_assoc
+from app.services import importacion_plan_service
 
 router = APIRouter()
 
@@ -35,17 +36,13 @@ async def get_curso_with_relations_helper(db: AsyncSession, id: int) -> Optional
 
 @router.get("/", response_model=List[CursoResponse], tags=["Cursos"])
 async def read_cursos(
+    response: Response,
+    pag: Paginacion = Depends(),
     db: AsyncSession = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user),
-    skip: int = 0,
-    limit: int = 100
+    current_user: Usuario = Depends(get_current_user)
 ):
-    id_escuela_filter = current_user.id_escuela
-
-    cursos = await crud_curso.get_multi_by_escuela(
-        db, id_escuela=id_escuela_filter, skip=skip, limit=limit
-    )
-    return cursos
+    base = crud_curso.consulta_por_escuela(current_user.id_escuela)
+    return await listar(crud_curso, db, pag, response, base=base)
 
 
 @router.post("/", response_model=CursoResponse, tags=["Cursos"])
@@ -88,6 +85,35 @@ async def create_curso(
             detail="Error de integridad. Verifica los datos enviados.",)
 
 
+@router.post("/importar", tags=["Cursos"])
+async def importar_cursos(
+    id_plan_version: int,
+    file: UploadFile = File(...),
+    confirmar_guardado: bool = False,
+    db: AsyncSession = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Carga masiva de una versión del plan desde CSV o Excel.
+    Columnas: CODIGO, NOMBRE, CICLO, PARIDAD, CREDITOS, HORAS_TEORICAS, HORAS_PRACTICAS,
+    TIPO_CURSO y REQUISITOS (códigos separados por ';'). Sin confirmar_guardado solo valida.
+    """
+    stmt = (
+        select(PlanEstudio.id_escuela)
+        .join(PlanVersion, PlanVersion.id_plan_estudio == PlanEstudio.id)
+        .where(PlanVersion.id == id_plan_version)
+    )
+    escuelas = (await db.execute(stmt)).scalars().all()
+    if not escuelas:
+        raise HTTPException(status_code=404, detail="La versión del plan especificada no existe.")
+    if current_user.id_escuela is not None and escuelas[0] != current_user.id_escuela:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No puedes importar cursos en un Plan de Estudio de otra escuela."
+        )
+    return await importacion_plan_service.importar_plan(db, id_plan_version, file.file, file.filename, confirmar_guardado)
+
+
 @router.put("/{curso_id}", response_model=CursoResponse, tags=["Cursos"])
 async def update_curso(
     curso_id: int,
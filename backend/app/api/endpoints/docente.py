@@ -1,10 +1,10 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
 from app.core.database import get_db
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, Paginacion, listar
 from app.models.usuario import Usuario
 
 from app.crud.crud_docente import docente as crud_docente
@@ -14,19 +14,17 @@ router = APIRouter()
 
 @router.get("/", response_model=List[DocenteResponse], tags=["Docentes"])
 async def read_docentes(
+    response: Response,
+    pag: Paginacion = Depends(),
     db: AsyncSession = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user),
-    skip: int = 0,
-    limit: int = 100
+    current_user: Usuario = Depends(get_current_user)
 ):
 
     id_escuela_filter = current_user.id_escuela if current_user.id_escuela is not None else None
     
     # Aqui uso un solo método en el CRUD que maneje el filtro
-    docentes = await crud_docente.get_multi_by_escuela(
-        db, id_escuela=id_escuela_filter, skip=skip, limit=limit
-    )
-    return docentes
+    base = crud_docente.consulta_por_escuela(id_escuela_filter)
+    return await listar(crud_docente, db, pag, response, base=base)
 
 @router.post("/", response_model=DocenteResponse, tags=["Docentes"])
 async def create_docente(
@@ -1,11 +1,12 @@
 from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
 from app.core.database import get_db
 # Nota: YA NO IMPORTAMOS get_current_user porque es público
 from app.crud.crud_escuela import escuela as crud_escuela
+from app.api.deps import Paginacion, paginar_lista
 from app.schemas.escuela import EscuelaCreate, EscuelaUpdate, EscuelaResponse
 
 router = APIRouter()
@@ -13,16 +14,16 @@ router = APIRouter()
 # 1. LISTAR ESCUELAS (GET) - PÚBLICO
 @router.get("/", response_model=List[EscuelaResponse])
 async def read_escuelas(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    pag: Paginacion = Depends(),
     db: AsyncSession = Depends(get_db)
 ) -> Any:
     """
     Obtener lista de todas las escuelas.
     No requiere autenticación.
     """
-    escuelas = await crud_escuela.get_multi(db, skip=skip, limit=limit)
-    return escuelas
+    escuelas = await crud_escuela.get_all_cache(db)
+    return paginar_lista(escuelas, pag, response)
 
 
 # 2. CREAR ESCUELA (POST) - PÚBLICO
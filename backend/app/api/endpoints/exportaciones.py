@@ -0,0 +1,57 @@
+from pathlib import Path
+
+from fastapi import APIRouter, Depends, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.api.deps import get_current_user
+from app.models.usuario import Usuario
+from app.schemas.exportacion import ExportacionCreate, ExportacionResponse
+from app.services import artefactos_service, trabajos_service
+
+router = APIRouter()
+
+
+def _respuesta(request: Request, trabajo: dict) -> dict:
+    """Estado del trabajo; si ya terminó, con un enlace de descarga recién firmado."""
+    datos = dict(trabajo)
+    if trabajo["estado"] == trabajos_service.LISTO:
+        token, datos["expira"] = trabajos_service.emitir_token(trabajo["id"])
+        datos["descarga"] = str(request.url_for("descargar_exportacion", token=token))
+    return datos
+
+
+@router.post("/", response_model=ExportacionResponse, status_code=status.HTTP_202_ACCEPTED)
+async def crear_exportacion(
+    payload: ExportacionCreate,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Encola una exportación pesada y responde al instante (202). El archivo se genera en
+    segundo plano (render en el pool de procesos); consultar GET /exportaciones/{id}
+    hasta que el estado sea 'listo' y bajar el archivo con el enlace 'descarga'.
+    Pedidos iguales sobre la misma versión del periodo comparten el trabajo.
+    """
+    trabajo = await trabajos_service.enviar(db, payload.tipo, payload.id_periodo, payload.filtros)
+    return _respuesta(request, trabajo)
+
+
+@router.get("/{id_trabajo}", response_model=ExportacionResponse)
+async def estado_exportacion(
+    id_trabajo: str,
+    request: Request,
+    current_user: Usuario = Depends(get_current_user)
+):
+    return _respuesta(request, await trabajos_service.consultar(id_trabajo))
+
+
+@router.get("/descargar/{token}", name="descargar_exportacion")
+async def descargar_exportacion(token: str):
+    """
+    Sin cabecera Authorization: el token corto del enlace es la credencial
+    (sirve para un <a href> o para compartir el enlace unos minutos).
+    """
+    trabajo = await trabajos_service.trabajo_del_token(token)
+    return artefactos_service.respuesta(trabajo["tipo"], Path(trabajo["ruta"]))
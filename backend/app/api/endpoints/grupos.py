@@ -1,8 +1,10 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, distinct, func, update, and_, delete, cast, Integer
-from sqlalchemy.orm import joinedload, aliased
+from sqlalchemy.orm import joinedload, selectinload, aliased
 
 from app.core.database import get_db
 # Modelos
@@ -17,6 +19,14 @@ from app.models.contrato_docente import ContratoDocente
 from app.models.disponibilidad_docente import DisponibilidadDocente
 
 from app.schemas.grupo import GrupoCreateMasivo, GrupoUpdate
+from app.crud.crud_bloque import bloque as crud_bloque
+from app.crud.crud_grupo import grupo as crud_grupo
+from app.crud.crud_sesion import sesion as crud_sesion
+from sqlalchemy.exc import IntegrityError
+from app.services.cruce_service import tipo_cruce
+from app.services.carga_docente_service import mover_horas_docente
+from app.services.version_service import respuesta_versionada
+from app.services.ndjson_service import respuesta_ndjson
 
 
 from app.models.sesion import Sesion
@@ -29,7 +39,9 @@ router = APIRouter()
 
 async def actualizar_disponibilidad_docente(db: AsyncSession, id_docente: int, id_periodo: int):
     """
-    Suma las horas de los grupos del docente y actualiza la tabla DisponibilidadDocente.
+    RECÁLCULO COMPLETO: suma las horas de los grupos del docente y pisa DisponibilidadDocente.
+    El día a día usa mover_horas_docente (delta); esto queda para clonar periodos
+    o para reparar un saldo descuadrado.
     """
     if not id_docente:
         return
@@ -72,51 +84,6 @@ async def actualizar_disponibilidad_docente(db: AsyncSession, id_docente: int, i
         # pero idealmente deberíamos corregirlo.
 
 
-async def validar_tope_horario(db: AsyncSession, id_docente: int, id_periodo: int, horas_a_sumar: int):
-    """
-    Consulta el CONTRATO del docente para ver su 'horas_tope_semanales'.
-    Si (Horas Actuales + Nuevas) > Tope, lanza error.
-    """
-    if not id_docente:
-        return
-
-    # 1. Obtener Horas ACTUALES (De la disponibilidad)
-    stmt_disp = select(DisponibilidadDocente).where(
-        DisponibilidadDocente.id_docente == id_docente,
-        DisponibilidadDocente.id_periodo == id_periodo
-    )
-    disp = (await db.execute(stmt_disp)).scalars().first()
-    
-    if not disp:
-        # Si no tiene disponibilidad creada, asumimos 0 horas actuales
-        # (Aunque esto debería existir si hay contrato)
-        horas_actuales = 0
-    else:
-        horas_actuales = disp.horas_asignadas_actuales
-
-    # 2. Obtener Tope del CONTRATO (Tu petición: Usar ContratoDocente)
-    # Buscamos el contrato activo. Asumimos que validas que solo haya uno por docente/fecha.
-    stmt_contrato = select(ContratoDocente).where(
-        ContratoDocente.id_docente == id_docente
-    )
-    contrato = (await db.execute(stmt_contrato)).scalars().first()
-
-    if not contrato:
-        # Si no tiene contrato, ¡No debería poder tener grupos!
-        raise HTTPException(400, "El docente seleccionado NO TIENE CONTRATO vigente.")
-    
-    tope_maximo = contrato.horas_tope_semanales
-
-    # 3. Comparar
-    nueva_carga = horas_actuales + horas_a_sumar
-    
-    if nueva_carga > tope_maximo:
-        raise HTTPException(
-            status_code=400, 
-            detail=f"Límite excedido: El docente tiene {horas_actuales} hrs asignadas. Con estas +{horas_a_sumar} llegaría a {nueva_carga}, superando su contrato de {tope_maximo} hrs."
-        )
-
-
 # =====================================================================
 #  ENDPOINTS
 # =====================================================================
@@ -160,20 +127,39 @@ async def get_grupos_by_ciclo(ciclo: int, id_periodo: int = None, db: AsyncSessi
 
 
 @router.get("/periodo/{id_periodo}/detallado")
-async def get_cursos_con_grupos(id_periodo: int, db: AsyncSession = Depends(get_db)):
-    try:
-        stmt = (
-            select(CursoAperturado)
-            .where(CursoAperturado.id_periodo == id_periodo)
-            .options(
-                joinedload(CursoAperturado.curso),
-                joinedload(CursoAperturado.grupos).joinedload(Grupo.docente),
-                joinedload(CursoAperturado.grupos).joinedload(Grupo.turno)
-            )
-            .order_by(CursoAperturado.id)
+async def get_cursos_con_grupos(id_periodo: int, request: Request, db: AsyncSession = Depends(get_db)):
+    # Con ETag: si el periodo no cambió, 304 o respuesta desde caché
+    async def consultar() -> bytes:
+        cursos = await _consultar_cursos_con_grupos(db, id_periodo)
+        return JSONResponse(jsonable_encoder(cursos)).body
+
+    # Con Accept: application/x-ndjson: un curso (con sus grupos) por línea
+    return await respuesta_versionada(
+        request, db, "grupos-detallado", id_periodo, consultar,
+        flujo=lambda: respuesta_ndjson(_consulta_cursos_con_grupos(id_periodo))
+    )
+
+
+def _consulta_cursos_con_grupos(id_periodo: int):
+    # Los grupos (colección) van con selectinload: un IN sobre ix_grupo_id_curso_aperturado
+    # en vez de un LEFT JOIN que recorre todos los grupos de todos los periodos.
+    # Además joinedload de colecciones no es compatible con el cursor por lotes del streaming
+    return (
+        select(CursoAperturado)
+        .where(CursoAperturado.id_periodo == id_periodo)
+        .options(
+            joinedload(CursoAperturado.curso),
+            selectinload(CursoAperturado.grupos).joinedload(Grupo.docente),
+            selectinload(CursoAperturado.grupos).joinedload(Grupo.turno)
         )
-        result = await db.execute(stmt)
-        return result.unique().scalars().all()
+        .order_by(CursoAperturado.id)
+    )
+
+
+async def _consultar_cursos_con_grupos(db: AsyncSession, id_periodo: int):
+    try:
+        result = await db.execute(_consulta_cursos_con_grupos(id_periodo))
+        return result.scalars().all()
     except Exception as e:
         print(f"ERROR: {e}")
         raise HTTPException(status_code=500, detail=f"Error interno al cargar grupos: {str(e)}")
@@ -200,9 +186,9 @@ async def crear_grupos_masivo(payload: GrupoCreateMasivo, db: AsyncSession = Dep
         horas_totales_curso = h_teoria + h_practica
         total_horas_nuevas = horas_totales_curso * payload.cantidad_grupos 
 
-        # 2. VALIDAR TOPE (Luz Roja)
+        # 2. VALIDAR TOPE Y RESERVAR LAS HORAS (Luz Roja). Bloquea el saldo del docente hasta el commit
         if payload.id_docente:
-            await validar_tope_horario(db, payload.id_docente, target_periodo_id, total_horas_nuevas)
+            await mover_horas_docente(db, payload.id_docente, target_periodo_id, total_horas_nuevas)
 
         # 3. PREPARAR OBJETOS (GRUPOS + SESIONES) EN MEMORIA
         letras = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J']
@@ -216,53 +202,27 @@ async def crear_grupos_masivo(payload: GrupoCreateMasivo, db: AsyncSession = Dep
             indice_real = existentes + i
             nombre_grupo = letras[indice_real] if indice_real < len(letras) else f"Grupo {indice_real + 1}"
             
-            nuevo_grupo = Grupo(
+            nuevos_grupos.append(dict(
                 nombre=nombre_grupo,
                 id_curso_aperturado=payload.id_curso_aperturado,
                 id_docente=payload.id_docente,
                 id_turno=payload.id_turno,
                 vacantes=payload.vacantes_por_grupo
-            )
-            
-            # B) Crear Sesiones Automáticas (VINCULADAS DIRECTAMENTE AL OBJETO GRUPO)
-            # Truco: Al pasar `grupo=nuevo_grupo`, SQLAlchemy entiende la relación sin necesitar el ID aún.
-            
-            # Sesión Teórica
+            ))
+
+        # 4. GUARDAR EN LOTE: un INSERT para los grupos y otro para todas sus sesiones
+        grupos_creados = await crud_grupo.create_many(db, objs_in=nuevos_grupos, commit=False)
+
+        # B) Sesiones Automáticas (teoría y/o práctica) de cada grupo recién creado
+        sesiones = []
+        for grupo in grupos_creados:
             if h_teoria > 0:
-                sesion_t = Sesion(
-                    tipo_sesion='TEORIA',
-                    duracion_horas=h_teoria,
-                    grupo=nuevo_grupo, # Vinculación en memoria
-                    estado=1
-                )
-                db.add(sesion_t) # Agregamos a la sesión
-            
-            # Sesión Práctica
+                sesiones.append(dict(tipo_sesion='TEORIA', duracion_horas=h_teoria, id_grupo=grupo["id"], estado=1))
             if h_practica > 0:
-                sesion_p = Sesion(
-                    tipo_sesion='PRACTICA',
-                    duracion_horas=h_practica,
-                    grupo=nuevo_grupo, # Vinculación en memoria
-                    estado=1
-                )
-                db.add(sesion_p)
-
-            nuevos_grupos.append(nuevo_grupo)
+                sesiones.append(dict(tipo_sesion='PRACTICA', duracion_horas=h_practica, id_grupo=grupo["id"], estado=1))
+        await crud_sesion.create_many(db, objs_in=sesiones, commit=False)
         
-        # 4. GUARDAR TODO (FLUSH)
-        db.add_all(nuevos_grupos)
-        
-        # FLUSH: Envía a la BD, genera IDs, pero NO cierra la transacción.
-        # Esto permite que 'actualizar_disponibilidad' vea los datos nuevos sin romper la sesión async.
-        await db.flush() 
-
-        # 5. ACTUALIZAR DISPONIBILIDAD (Luz Verde)
-        if payload.id_docente:
-            print(f"Actualizando horas para docente {payload.id_docente}...")
-            # Como usamos flush(), esta función ya puede "ver" los grupos nuevos en la BD
-            await actualizar_disponibilidad_docente(db, payload.id_docente, target_periodo_id)
-
-        # 6. COMMIT FINAL (Ahora sí cerramos todo)
+        # 5. COMMIT: grupos, sesiones y horas del docente en la misma transacción
         await db.commit()
 
         return {"message": f"Se crearon {len(nuevos_grupos)} grupos y sus sesiones correspondientes."}
@@ -298,24 +258,25 @@ async def actualizar_grupo(id_grupo: int, payload: GrupoUpdate, db: AsyncSession
     # 2. Si cambia el docente
     if nuevo_docente != docente_anterior:
         
-        # Validar al nuevo
-        if nuevo_docente is not None:
-            await validar_tope_horario(db, nuevo_docente, id_periodo, horas_curso)
+        # Pasar las horas del anterior al nuevo (valida el tope del nuevo).
+        # Siempre en el mismo orden de id para que dos cambios cruzados no se bloqueen
+        movimientos = [(nuevo_docente, horas_curso), (docente_anterior, -horas_curso)]
+        for id_docente, delta in sorted((m for m in movimientos if m[0]), key=lambda m: m[0]):
+            await mover_horas_docente(db, id_docente, id_periodo, delta)
         
         # Aplicar cambio
         grupo.id_docente = nuevo_docente
         if payload.id_turno is not None: grupo.id_turno = payload.id_turno
         if payload.vacantes is not None: grupo.vacantes = payload.vacantes
         
-        await db.commit() # Guardar cambio de dueño
-        
-        # Actualizar horas de ambos
-        if nuevo_docente:
-            await actualizar_disponibilidad_docente(db, nuevo_docente, id_periodo)
-        if docente_anterior:
-            await actualizar_disponibilidad_docente(db, docente_anterior, id_periodo)
-            
-        await db.commit() 
+        # Guardar cambio de dueño y horas juntos (el trigger mueve las casillas al nuevo docente)
+        try:
+            await db.commit()
+        except IntegrityError as e:
+            await db.rollback()
+            if tipo_cruce(e) != "DOCENTE":
+                raise
+            raise HTTPException(400, "CRUCE: El nuevo docente ya tiene clase en alguno de los bloques de este grupo.")
 
     else:
         # Actualización simple
@@ -345,6 +306,7 @@ async def eliminar_grupo(id_grupo: int, db: AsyncSession = Depends(get_db)):
     ciclo_grupo = grupo.curso_aperturado.curso.ciclo
     id_periodo = grupo.curso_aperturado.id_periodo
     id_docente_afectado = grupo.id_docente
+    horas_grupo = (grupo.curso_aperturado.curso.horas_teoricas or 0) + (grupo.curso_aperturado.curso.horas_practicas or 0)
     
     # ---------------------------------------------------------
     # 2. BORRADO FÍSICO EXPLICITO DE LA MALLA (LA CORRECCIÓN)
@@ -367,10 +329,8 @@ async def eliminar_grupo(id_grupo: int, db: AsyncSession = Depends(get_db)):
     # 4. Ahora sí, borramos el Grupo
     await db.delete(grupo)
     
-    # 5. Actualizar docente (si tenía uno asignado)
-    if id_docente_afectado:
-        await db.commit() # Commit intermedio para que el update de horas lea bien
-        await actualizar_disponibilidad_docente(db, id_docente_afectado, id_periodo)
+    # 5. Devolver las horas al docente (si tenía uno asignado), en la misma transacción
+    await mover_horas_docente(db, id_docente_afectado, id_periodo, -horas_grupo)
     
     await db.commit()
         
@@ -382,11 +342,7 @@ async def crear_esqueleto_horario(db: AsyncSession, grupo_obj: Grupo, id_periodo
     Crea las filas vacías (id_sesion=NULL) en la tabla Horario para un grupo nuevo.
     """
     # 1. Traer todos los bloques del turno de ese grupo
-    stmt = select(BloqueHorario).where(
-        BloqueHorario.id_turno == grupo_obj.id_turno,
-        BloqueHorario.estado == 1
-    )
-    bloques = (await db.execute(stmt)).scalars().all()
+    bloques = await crud_bloque.get_by_turno_cache(db, id_turno=grupo_obj.id_turno)
     
     casillas = []
     for b in bloques:
@@ -1,5 +1,7 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, File, HTTPException, Request, Response, UploadFile, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, or_, func, delete, update
 from sqlalchemy.orm import joinedload
@@ -20,24 +22,35 @@ from app.models.curso_aperturado import CursoAperturado
 # Schemas
 # Asegúrate de importar SesionFullResponse donde lo hayas definido
 from app.schemas.sesion_completa import SesionFullResponse
-from app.schemas.horario import HorarioCreate, HorarioResponse
+from app.schemas.horario import HorarioCreate, HorarioResponse, LoteMovimientos, CambiosHorarioResponse
 from app.schemas.bloque_horario import BloqueHorarioResponse, BloqueMasivoCreate
 from app.schemas.sesion import SesionResponse
 
 # CRUDs
 from app.crud.crud_sesion import sesion as crud_sesion
 from app.crud.crud_bloque import bloque as crud_bloque
+from app.crud.crud_horario import horario as crud_horario
 
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, JSONResponse
 import pandas as pd
 import traceback
-from io import BytesIO
+import json
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from app.core.motor_horario import GeneradorHorario # Tu motor lógico
+from app.services.cruce_service import describir_cruce, tipo_cruce
+from app.services.lote_horario_service import planificar_lote, guardar_lote
+from app.services.auditoria_service import auditar_periodo
+from app.services.version_service import respuesta_versionada, etag_coincide
+from app.services.ndjson_service import respuesta_ndjson
+from app.services.cambios_service import armar_cambios, compactar_cambios
+from app.services import tiempo_real_service, artefactos_service, exportacion_service, calendario_service, snapshot_service, importacion_excel_service, importacion_service
 
 router = APIRouter()
 
+# Serializador de /periodo/{id} (mismo resultado que response_model, pero a bytes para el caché)
+_lista_horarios = TypeAdapter(List[HorarioResponse])
+
 # =====================================================================
 #  1. LÓGICA DE VALIDACIÓN (EL ÁRBITRO)
 # =====================================================================
@@ -119,9 +132,23 @@ async def validar_reglas_asignacion(
 # =====================================================================
 
 @router.get("/sesiones/pendientes/{id_periodo}")
-async def get_sesiones_pendientes(id_periodo: int, db: AsyncSession = Depends(get_db)):
+async def get_sesiones_pendientes(id_periodo: int, request: Request, db: AsyncSession = Depends(get_db)):
+    # Con ETag: si el periodo no cambió, 304 o respuesta desde caché
+    # Con Accept: application/x-ndjson se transmite fila por fila (periodos grandes)
+    async def consultar() -> bytes:
+        pendientes = await _consultar_sesiones_pendientes(db, id_periodo)
+        return JSONResponse(jsonable_encoder(pendientes)).body
+
+    return await respuesta_versionada(
+        request, db, "pendientes", id_periodo, consultar,
+        flujo=lambda: respuesta_ndjson(_consulta_sesiones_pendientes(id_periodo))
+    )
+
+
+def _consulta_sesiones_pendientes(id_periodo: int):
     # Buscamos sesiones activas que NO estén en la tabla horario
-    stmt = (
+    # (solo joinedload muchos-a-uno: la misma consulta sirve para el streaming)
+    return (
         select(Sesion)
         .join(Grupo).join(CursoAperturado).join(Curso)
         .outerjoin(Horario) 
@@ -139,37 +166,83 @@ async def get_sesiones_pendientes(id_periodo: int, db: AsyncSession = Depends(ge
             joinedload(Sesion.grupo).joinedload(Grupo.turno) 
         )
     )
-    result = await db.execute(stmt)
+
+
+async def _consultar_sesiones_pendientes(db: AsyncSession, id_periodo: int):
+    result = await db.execute(_consulta_sesiones_pendientes(id_periodo))
     return result.unique().scalars().all()
 
 
 @router.get("/bloques/turno/{id_turno}", response_model=List[BloqueHorarioResponse])
 async def read_bloques(id_turno: int, db: AsyncSession = Depends(get_db)):
     """Trae los bloques (horas) de un turno específico."""
-    return await crud_bloque.get_by_turno(db, id_turno=id_turno)
+    return await crud_bloque.get_by_turno_cache(db, id_turno=id_turno)
 
 
 
 @router.get("/periodo/{id_periodo}", response_model=List[HorarioResponse])
-async def get_horario_periodo(id_periodo: int, db: AsyncSession = Depends(get_db)):
-    """Trae todo el horario ya asignado (Fichas en la grilla)."""
-    stmt = (
-        select(Horario)
-        .where(Horario.id_periodo == id_periodo, Horario.estado == 1)
-        .options(
-            # --- CORRECCIÓN AQUÍ: Usar import_module para evitar crash por referencia circular ---
-            joinedload(Horario.sesion).joinedload(Sesion.grupo).joinedload(Grupo.curso_aperturado).joinedload(
-                import_module('app.models.curso_aperturado').CursoAperturado.curso
-            ),
-            # -----------------------------------------------------------------------------------
-            joinedload(Horario.sesion).joinedload(Sesion.grupo).joinedload(Grupo.docente),
-            joinedload(Horario.bloque_horario),
-            joinedload(Horario.aula)
+async def get_horario_periodo(id_periodo: int, request: Request, db: AsyncSession = Depends(get_db)):
+    """Trae todo el horario ya asignado (Fichas en la grilla). Con ETag + caché por versión del periodo."""
+    async def consultar() -> bytes:
+        horarios = await crud_horario.get_horario_periodo(db, id_periodo)
+        return _lista_horarios.dump_json(horarios)
+
+    return await respuesta_versionada(
+        request, db, "horario", id_periodo, consultar,
+        flujo=lambda: respuesta_ndjson(
+            crud_horario.consulta_horario_periodo(id_periodo),
+            lambda h: HorarioResponse.model_validate(h).model_dump_json()
         )
     )
-    # Agregamos unique() por seguridad ante joins complejos
-    result = await db.execute(stmt)
-    return result.unique().scalars().all()
+
+
+@router.get("/periodo/{id_periodo}/cambios", response_model=CambiosHorarioResponse)
+async def get_cambios_periodo(id_periodo: int, desde: int = 0, db: AsyncSession = Depends(get_db)):
+    """
+    Solo lo que cambió en la grilla desde `desde` (el `seq` de la respuesta anterior).
+    Si el cliente quedó muy atrás (bitácora compactada) responde modo 'completo'.
+    """
+    return await armar_cambios(db, id_periodo, desde)
+
+
+@router.websocket("/ws/periodo/{id_periodo}")
+async def ws_cambios_periodo(websocket: WebSocket, id_periodo: int):
+    """
+    Editores en vivo de la grilla del periodo. El servidor empuja:
+      {"tipo": "conectado", "seq"}                   al conectarse
+      {"tipo": "cambios", "desde", "seq", "actualizados", "eliminados"}   tras cada guardado
+      {"tipo": "recargar", "seq"}                    si el cliente debe pedir el periodo completo
+    Lo que mande el cliente se ignora (solo mantiene viva la conexión).
+    """
+    await tiempo_real_service.conectar(websocket, id_periodo)
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        tiempo_real_service.desconectar(websocket, id_periodo)
+
+
+@router.post("/periodo/{id_periodo}/cambios/compactar")
+async def compactar_cambios_periodo(id_periodo: int, conservar_horas: int = 24, db: AsyncSession = Depends(get_db)):
+    """Borra la bitácora de cambios más vieja que `conservar_horas`."""
+    borrados = await compactar_cambios(db, id_periodo, conservar_horas)
+    return {"message": "Bitácora compactada", "borrados": borrados}
+
+
+@router.get("/periodo/{id_periodo}/grilla")
+async def get_grilla_periodo(id_periodo: int, request: Request, db: AsyncSession = Depends(get_db)):
+    """
+    Versión liviana de /periodo/{id}: una consulta plana y JSON columnar
+    (catálogos por id + listas de celdas). Sin ORM ni validación pydantic por celda.
+    """
+    async def consultar() -> bytes:
+        grilla = await crud_horario.get_grilla_plana(db, id_periodo)
+        # JSONResponse directo: el payload ya son tipos simples, no hace falta jsonable_encoder
+        return JSONResponse(grilla).body
+
+    return await respuesta_versionada(request, db, "grilla", id_periodo, consultar)
 
 
 @router.get("/periodo/{id_periodo}/ciclos")
@@ -187,6 +260,28 @@ async def get_ciclos_en_periodo(id_periodo: int, db: AsyncSession = Depends(get_
     return [{"id": c, "nombre": f"Ciclo {c}"} for c in ciclos]
 
 
+@router.get("/periodo/{id_periodo}/auditoria-cruces")
+async def auditar_cruces_periodo(
+    id_periodo: int,
+    usar_cache: bool = True,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Lista TODOS los cruces ya guardados en el periodo (docente, grupo, aula).
+    Respuesta NDJSON: una línea de resumen y luego una línea por cruce.
+    """
+    reporte = await auditar_periodo(db, id_periodo, usar_cache=usar_cache)
+    cruces = reporte.pop("cruces")
+    reporte["total"] = len(cruces)
+
+    def lineas():
+        yield json.dumps(reporte) + "\n"
+        for cruce in cruces:
+            yield json.dumps(cruce, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(lineas(), media_type="application/x-ndjson")
+
+
 
 @router.get("/sesiones/pendientes/{id_periodo}")
 async def read_sesiones_pendientes(
@@ -287,10 +382,55 @@ async def guardar_asignacion_manual(
             ))
     
     if nuevos: db.add_all(nuevos)
-    await db.commit()
+
+    # 6. GUARDAR: Postgres valida los cruces (índices únicos de horario)
+    try:
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        detalle = await describir_cruce(db, e, data.id_sesion, data.id_periodo, ids_bloques, data.id_aula)
+        if detalle is None:
+            raise
+        raise HTTPException(400, "CRUCE: " + detalle)
+    await tiempo_real_service.avisar(data.id_periodo)
     return {"message": "Guardado"}
 
 
+# ==========================================
+# 3.1 MOVER / INTERCAMBIAR EN LOTE (un solo commit)
+# ==========================================
+@router.post("/mover-lote")
+async def mover_sesiones_en_lote(
+    lote: LoteMovimientos,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Aplica varios movimientos e intercambios de sesiones de una vez.
+    Se valida el estado FINAL (un intercambio no choca consigo mismo);
+    si algo falla no se guarda nada. Un lote mal armado responde 404/422 (lo lanza
+    planificar_lote); solo los cruces reales salen como 400 "CRUCE: ...".
+    """
+    filas, errores = await planificar_lote(db, lote)
+    if errores:
+        raise HTTPException(400, "CRUCE: " + " | ".join(errores))
+    if not filas:
+        return {"message": "Nada que mover", "sesiones": 0}
+
+    try:
+        await guardar_lote(db, lote.id_periodo, filas)
+        await db.commit()
+    except IntegrityError as e:
+        # Alguien guardó en esos bloques entre la validación y el commit
+        await db.rollback()
+        tipo = tipo_cruce(e)
+        if tipo is None:
+            raise
+        raise HTTPException(409, f"CRUCE: Otro usuario ocupó uno de los bloques ({tipo}). Vuelva a intentarlo.")
+
+    await tiempo_real_service.avisar(lote.id_periodo)
+    return {"message": "Guardado", "sesiones": len({f['id_sesion'] for f in filas})}
+
+
 
 @router.delete("/{id_horario}")
 async def eliminar_horario(id_horario: int, db: AsyncSession = Depends(get_db)):
@@ -322,6 +462,7 @@ async def eliminar_horario(id_horario: int, db: AsyncSession = Depends(get_db)):
     
     await db.execute(stmt_delete)
     await db.commit()
+    await tiempo_real_service.avisar(id_periodo)
     
     return {"message": "Sesión liberada completamente del horario"}
 
@@ -342,7 +483,7 @@ async def autogenerar_por_ciclo(
 
     # 1. RECUPERAR TODOS LOS BLOQUES Y MAPEARLOS POR TURNO
     # Esto es la clave: Saber qué 'orden' existe para cada 'id_turno'
-    all_bloques = (await db.execute(select(BloqueHorario))).scalars().all()
+    all_bloques = await crud_bloque.get_all_cache(db)  # Caché de referencia: no se relee en cada corrida
     
     # Mapa para el Motor: { id_turno: [orden1, orden2, orden11...] }
     mapa_ordenes_por_turno = {} 
@@ -468,157 +609,137 @@ async def autogenerar_por_ciclo(
             constraint='uq_horario_casilla', 
             set_={ "id_sesion": stmt.excluded.id_sesion, "estado": 1 }
         )
-        await db.execute(stmt)
-        await db.commit()
+        try:
+            await db.execute(stmt)
+            await db.commit()
+        except IntegrityError as e:
+            await db.rollback()
+            tipo = tipo_cruce(e)
+            if tipo is None:
+                raise
+            raise HTTPException(409, f"CRUCE: La generación chocó con un horario de {tipo} guardado mientras tanto. Vuelva a intentarlo.")
+        await tiempo_real_service.avisar(id_periodo)
+        artefactos_service.regenerar_en_segundo_plano(id_periodo)
 
     return {"status": "success", "generados": len(lista_para_upsert), "fallos": len(fallos)}
 
 
 
-def safe_to_roman(n):
-    if not isinstance(n, int) or n < 1: return "0"
-    mapa = ["", "I", "II", "III", "IV", "V", "VI", "VII", "VIII", "IX", "X"]
-    return mapa[n] if n <= 10 else str(n)
-
-
-
 @router.get("/exportar-excel/{id_periodo}")
 async def exportar_horario_excel(
     id_periodo: int,
     db: AsyncSession = Depends(get_db)
 ):
+    """Horario general en Excel. Se genera una vez por versión del periodo y se sirve desde disco."""
     try:
-        periodo_obj = await db.get(PeriodoAcademico, id_periodo)
-        nombre_semestre = periodo_obj.nombre if periodo_obj else "202X"
-
-        stmt_grupos = (
-            select(Grupo)
-            .join(CursoAperturado).join(Curso)
-            .where(CursoAperturado.id_periodo == id_periodo)
-            .options(joinedload(Grupo.curso_aperturado).joinedload(CursoAperturado.curso), joinedload(Grupo.docente))
-            .order_by(Curso.ciclo, Grupo.nombre)
-        )
-        grupos = (await db.execute(stmt_grupos)).scalars().all()
-
-        if not grupos:
-            df_vacio = pd.DataFrame(["No hay grupos registrados"])
-            output = BytesIO()
-            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                df_vacio.to_excel(writer, sheet_name='Info')
-            output.seek(0)
-            return StreamingResponse(output, headers={'Content-Disposition': 'attachment; filename="Vacio.xlsx"'})
-
-        stmt_horarios = (
-            select(Horario)
-            .join(Sesion).join(Grupo).join(BloqueHorario).outerjoin(Aula)
-            .where(Horario.id_periodo == id_periodo, Horario.estado == 1)
-            .options(
-                joinedload(Horario.bloque_horario), joinedload(Horario.aula),
-                joinedload(Horario.sesion).joinedload(Sesion.grupo).joinedload(Grupo.docente),
-                joinedload(Horario.sesion).joinedload(Sesion.grupo).joinedload(Grupo.curso_aperturado).joinedload(CursoAperturado.curso)
-            )
-        )
-        asignaciones = (await db.execute(stmt_horarios)).scalars().all()
-
-        mapa_contenido = {}
-        for h in asignaciones:
-            if not h.bloque_horario: continue
-            key = (h.sesion.id_grupo, h.bloque_horario.dia_semana, h.bloque_horario.orden)
-            curso = h.sesion.grupo.curso_aperturado.curso.nombre
-            docente = h.sesion.grupo.docente.apellido if h.sesion.grupo.docente else "(VACANTE)"
-            aula = f"[{h.aula.codigo}]" if h.aula else ""
-            mapa_contenido[key] = f"{curso}\n{docente} {aula}"
-
-        stmt_bloques = select(BloqueHorario).distinct(BloqueHorario.orden).order_by(BloqueHorario.orden)
-        bloques_unicos = (await db.execute(stmt_bloques)).scalars().all()
-        dias_semana = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado"]
-
-        data_excel = []
-        for g in grupos:
-            ciclo_num = g.curso_aperturado.curso.ciclo
-            lbl_ciclo = f"CICLO {safe_to_roman(ciclo_num)}"
-            lbl_grupo = f"GRUPO {g.nombre}"
-            
-            mis_bloques = [b for b in bloques_unicos if b.id_turno == g.id_turno] or bloques_unicos
-
-            for dia in dias_semana:
-                for b in mis_bloques:
-                    hora_fmt = f"{b.hora_inicio.strftime('%H:%M')} - {b.hora_fin.strftime('%H:%M')}"
-                    val = mapa_contenido.get((g.id, dia, b.orden), "")
-                    data_excel.append({
-                        "CicloSort": ciclo_num, "Ciclo": lbl_ciclo, "Grupo": lbl_grupo,
-                        "Dia": dia, "Hora": hora_fmt, "Orden": b.orden, "Contenido": val
-                    })
-
-        df = pd.DataFrame(data_excel)
-        df['Dia'] = pd.Categorical(df['Dia'], categories=dias_semana, ordered=True)
-        df.sort_values(by=['CicloSort', 'Grupo', 'Dia', 'Orden'], inplace=True)
-
-        pivot_df = df.pivot_table(
-            index=["Dia", "Hora"], columns=["Ciclo", "Grupo"], values="Contenido", 
-            aggfunc=lambda x: ' / '.join([str(v) for v in x if v]), sort=False
-        )
-
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            pivot_df.to_excel(writer, sheet_name='Horario General', startrow=6)
-            ws = writer.sheets['Horario General']
-            from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-
-            # Títulos
-            titulos = [
-                "UNIVERSIDAD NACIONAL DE UCAYALI",
-                "FACULTAD DE CIENCIAS ECONOMICAS ADMINISTRATIVAS Y CONTABLES",
-                "ESCUELA PROFESIONAL DE CIENCIAS ADMINISTRATIVAS",
-                f"SEMESTRE ACADÉMICO {nombre_semestre} - HORARIO GENERAL"
-            ]
-            total_cols = ws.max_column
-            for i, txt in enumerate(titulos, start=1):
-                cell = ws.cell(row=i, column=1)
-                cell.value = txt
-                cell.font = Font(name='Arial', size=12, bold=True)
-                cell.alignment = Alignment(horizontal='center', vertical='center')
-                ws.merge_cells(start_row=i, start_column=1, end_row=i, end_column=total_cols)
-
-            # Estilos
-            thin = Side(style='thin', color="000000")
-            border_full = Border(left=thin, right=thin, top=thin, bottom=thin)
-            fill_header_ciclo = PatternFill("solid", fgColor="366092")
-            fill_header_grupo = PatternFill("solid", fgColor="B8CCE4")
-            font_white = Font(color="FFFFFF", bold=True)
-            font_black = Font(color="000000", bold=True)
-
-            for row in ws.iter_rows(min_row=7):
-                for cell in row:
-                    cell.border = border_full
-                    cell.alignment = Alignment(wrap_text=True, vertical='center', horizontal='center')
-                    if cell.row == 7 and cell.value:
-                        cell.fill = fill_header_ciclo
-                        cell.font = font_white
-                    elif cell.row == 8 and cell.column > 2:
-                        cell.fill = fill_header_grupo
-                        cell.font = font_black
-                    if cell.column <= 2:
-                        cell.font = font_black
-                        cell.fill = PatternFill("solid", fgColor="F2F2F2")
-
-            ws.column_dimensions['A'].width = 14
-            ws.column_dimensions['B'].width = 15
-            for col in range(3, total_cols + 1):
-                col_letter = ws.cell(row=8, column=col).column_letter
-                ws.column_dimensions[col_letter].width = 25
-
-        output.seek(0)
-        return StreamingResponse(
-            output, 
-            headers={'Content-Disposition': f'attachment; filename="Horario_General_{id_periodo}.xlsx"'},
-            media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-
+        ruta = await artefactos_service.obtener(db, "horario_general", id_periodo)
     except Exception as e:
         print("❌ ERROR EXPORTAR EXCEL:")
         traceback.print_exc()
         raise HTTPException(500, f"Error interno: {str(e)}")
+    return artefactos_service.respuesta("horario_general", ruta)
+
+
+@router.post("/importar-excel/{id_periodo}")
+async def importar_horario_excel(
+    id_periodo: int,
+    file: UploadFile = File(...),
+    confirmar_guardado: bool = False,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Vuelve a cargar el Excel general (exportar-excel) editado a mano: compara el libro con el
+    horario guardado y, si se confirma, aplica solo las casillas que cambiaron.
+    Sin confirmar_guardado devuelve la lista de cambios (vista previa).
+    """
+    resultado = await importacion_excel_service.importar_horario_excel(db, id_periodo, file.file, confirmar_guardado)
+    if resultado["status"] == "success" and resultado["cambios"]:
+        await tiempo_real_service.avisar(id_periodo)
+        artefactos_service.regenerar_en_segundo_plano(id_periodo)
+    return resultado
+
+
+@router.get("/exportar-plantilla/{id_periodo}")
+async def exportar_plantilla_horarios(
+    id_periodo: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    CSV borrador del periodo para importar-csv: columnas de datos (curso/grupo/sesión) y
+    de trabajo (día, bloque, aula). Se envía por lotes desde el cursor.
+    """
+    periodo = await db.get(PeriodoAcademico, id_periodo)
+    nombre_archivo = f"Horario_Borrador_{periodo.codigo}.csv" if periodo else "Horario_Borrador.csv"
+    return exportacion_service.respuesta_plantilla_csv(id_periodo, nombre_archivo)
+
+
+@router.post("/importar-csv/{id_periodo}")
+async def importar_horarios_csv(
+    id_periodo: int,
+    file: UploadFile = File(...),
+    confirmar_guardado: bool = False,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Carga el CSV de la plantilla (ID_SESION, DIA, BLOQUE_ORDEN, ID_AULA) llenado a mano.
+    Sin confirmar_guardado solo valida. Por lotes: el archivo no se carga entero en memoria.
+    """
+    resultado = await importacion_service.importar_horarios_csv(db, id_periodo, file.file, confirmar_guardado)
+    if resultado["status"] == "success":
+        await tiempo_real_service.avisar(id_periodo)
+        artefactos_service.regenerar_en_segundo_plano(id_periodo)
+    return resultado
+
+
+async def _respuesta_ics(request: Request, db: AsyncSession, tipo: str, id_entidad: int, id_periodo: int) -> Response:
+    etag, cuerpo = await calendario_service.feed(db, tipo, id_entidad, id_periodo)
+    cabeceras = {"ETag": f"W/{etag}", "Cache-Control": "no-cache"}
+    if etag_coincide(request, etag):
+        return Response(status_code=304, headers=cabeceras)
+    cabeceras["Content-Disposition"] = f'inline; filename="{tipo}-{id_entidad}.ics"'
+    return Response(content=cuerpo, media_type=calendario_service.MEDIA_ICS, headers=cabeceras)
+
+
+@router.get("/ics/{id_periodo}/docente/{id_docente}.ics")
+async def feed_ics_docente(id_periodo: int, id_docente: int, request: Request, db: AsyncSession = Depends(get_db)):
+    """Horario semanal del docente para suscribirse desde Google Calendar, Outlook, etc."""
+    return await _respuesta_ics(request, db, "docente", id_docente, id_periodo)
+
+
+@router.get("/ics/{id_periodo}/grupo/{id_grupo}.ics")
+async def feed_ics_grupo(id_periodo: int, id_grupo: int, request: Request, db: AsyncSession = Depends(get_db)):
+    """Horario semanal del grupo (mismo formato que el del docente)."""
+    return await _respuesta_ics(request, db, "grupo", id_grupo, id_periodo)
+
+
+@router.get("/exportar-zip/{id_periodo}")
+async def exportar_zip_por_entidad(
+    id_periodo: int,
+    tipo: str = "docente",
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Un Excel por docente, grupo o aula del periodo, todos en un ZIP.
+    El periodo se lee una sola vez; los libros se generan en paralelo (pool de procesos).
+    """
+    if tipo not in exportacion_service.ENTIDADES:
+        raise HTTPException(400, f"Tipo inválido. Use: {', '.join(exportacion_service.ENTIDADES)}")
+    entidades = await exportacion_service.datos_por_entidad(db, id_periodo, tipo)
+    if not entidades:
+        raise HTTPException(404, f"No hay horarios por {tipo} en este periodo")
+    return exportacion_service.respuesta_zip(entidades, f"Horarios_{tipo}_{id_periodo}.zip")
+
+
+@router.get("/snapshot/{id_periodo}")
+async def exportar_snapshot_parquet(id_periodo: int, db: AsyncSession = Depends(get_db)):
+    """
+    Snapshot desnormalizado del periodo en Parquet (sesiones, grupos, docentes, bloques,
+    asignaciones y aulas) para análisis. Se envía por row groups desde el cursor.
+    """
+    periodo = await db.get(PeriodoAcademico, id_periodo)
+    if not periodo:
+        raise HTTPException(404, "Periodo no encontrado")
+    return snapshot_service.respuesta_snapshot(id_periodo, f"Snapshot_{periodo.codigo}.parquet")
 
 # ==========================================
 # 2. ENDPOINTS DE GESTIÓN (Bloques y Sesiones)
@@ -626,7 +747,7 @@ async def exportar_horario_excel(
 
 @router.get("/bloques/turno/{id_turno}", response_model = List[BloqueHorarioResponse])
 async def read_bloques(id_turno: int, db: AsyncSession = Depends(get_db)):
-    return await crud_bloque.get_by_turno(db, id_turno=id_turno)
+    return await crud_bloque.get_by_turno_cache(db, id_turno=id_turno)
 
 @router.post("/bloques/masivo")
 async def create_bloques_masivos(payload: BloqueMasivoCreate, db: AsyncSession = Depends(get_db)):
@@ -1,10 +1,10 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
 from app.core.database import get_db
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, Paginacion, paginar_lista
 from app.models.usuario import Usuario
 
 # Importamos la instancia 'periodo' que creamos arriba
@@ -16,14 +16,14 @@ router = APIRouter()
 
 @router.get("/", response_model=List[PeriodoResponse])
 async def read_periodos(
+    response: Response,
+    pag: Paginacion = Depends(),
     db: AsyncSession = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user),
-    skip: int = 0,
-    limit: int = 100
+    current_user: Usuario = Depends(get_current_user)
 ):
-    # Usamos el método get_multi que heredas de CRUDBase
-    periodos = await crud_periodo.get_multi(db, skip=skip, limit=limit)
-    return periodos
+    # Caché de referencia heredado de CRUDBase (se invalida al crear / editar)
+    periodos = await crud_periodo.get_all_cache(db)
+    return paginar_lista(periodos, pag, response)
 
 @router.post("/", response_model=PeriodoResponse)
 async def create_periodo(
@@ -1,10 +1,10 @@
 from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
 from app.core.database import get_db
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, Paginacion, listar
 from app.models.usuario import Usuario
 
 from app.crud.crud_plan_estudio import plan_estudio as crud_plan_estudio
@@ -14,20 +14,18 @@ router = APIRouter()
 
 @router.get("/", response_model=List[PlanEstudioResponse])
 async def read_planes(
+    response: Response,
+    pag: Paginacion = Depends(),
     db: AsyncSession = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user),
-    skip: int = 0,
-    limit: int = 100
+    current_user: Usuario = Depends(get_current_user)
 ):
 
     if current_user.id_escuela is None:
         # SuperAdmin: verá todos
-        planes = await crud_plan_estudio.get_multi(db, skip=skip, limit=limit)
+        base = None
     else:
-        planes = await crud_plan_estudio.get_multi_by_escuela(
-            db, id_escuela=current_user.id_escuela, skip=skip, limit=limit
-        )
-    return planes
+        base = crud_plan_estudio.consulta_por_escuela(current_user.id_escuela)
+    return await listar(crud_plan_estudio, db, pag, response, base=base)
 
 @router.post("/", response_model=PlanEstudioResponse)
 async def create_plan(
@@ -1,11 +1,11 @@
 from typing import List, Optional, Any
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy import select
 
 from app.core.database import get_db 
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, Paginacion, listar
 
 from app.models.usuario import Usuario
 from app.models.plan_version import PlanVersion
@@ -18,20 +18,15 @@ router = APIRouter()
 
 @router.get("/", response_model=List[PlanVersionResponse], tags=["Planes de Estudio"])
 async def read_plan_versions(
+    response: Response,
+    pag: Paginacion = Depends(),
     db: AsyncSession = Depends(get_db),
     current_user: Usuario = Depends(get_current_user),
-    skip: int = 0,
-    limit: int = 100,
     id_plan_estudio: Optional[int] = None # Cambiado a id_plan para coincidir con el front
 ):
     """Lista versiones. Soporta filtro por id_plan."""
-    if id_plan_estudio:
-        # Query manual directa para filtrar
-        stmt = select(PlanVersion).where(PlanVersion.id_plan_estudio == id_plan_estudio) 
-        result = await db.execute(stmt)
-        return result.scalars().all()
-    else:
-        return await crud_plan_version.get_multi(db, skip=skip, limit=limit)
+    base = crud_plan_version.consulta_por_plan(id_plan_estudio) if id_plan_estudio else None
+    return await listar(crud_plan_version, db, pag, response, base=base)
     
 
 @router.post("/", response_model=PlanVersionResponse, tags=["Planes de Estudio"])
@@ -1,5 +1,5 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy import select
@@ -8,7 +8,7 @@ from app.core.database import get_db
 from app.crud.crud_turno import turno as crud_turno
 from app.schemas.turno import TurnoCreate, TurnoResponse 
 
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, Paginacion, paginar_lista
 from app.models.usuario import Usuario
 from app.models.turno import Turno
 from app.models.plan_version import PlanVersion
@@ -23,13 +23,16 @@ router = APIRouter()
 
 @router.get("/", response_model=List[TurnoResponse])
 async def read_turnos(
+    response: Response,
+    pag: Paginacion = Depends(),
     db: AsyncSession = Depends(get_db),
     current_user: Usuario = Depends(get_current_user)
 ):
     """Obtiene los turnos de la escuela del usuario actual."""
     if not current_user.id_escuela:
         return []
-    return await crud_turno.get_multi_by_escuela(db, id_escuela=current_user.id_escuela)
+    turnos = await crud_turno.get_by_escuela_cache(db, id_escuela=current_user.id_escuela)
+    return paginar_lista(turnos, pag, response)
 
 @router.post("/", response_model=TurnoResponse)
 async def create_turno(
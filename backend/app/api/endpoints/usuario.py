@@ -1,5 +1,5 @@
 from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
@@ -8,6 +8,7 @@ from app.crud.crud_usuario import usuario as crud_usuario
 from app.schemas.usuario import UsuarioCreate, UsuarioResponse, UsuarioUpdate
 
 from app.api.deps import get_current_user # <--- IMPORTANTE: Importar la dependencia de seguridad
+from app.api.deps import Paginacion, listar
 from app.models.usuario import Usuario # Importar el modelo
 
 router = APIRouter()
@@ -25,12 +26,11 @@ async def read_users_me(current_user: Usuario = Depends(get_current_user)):
 # 1. LISTAR USUARIOS (GET)
 @router.get("/", response_model=List[UsuarioResponse])
 async def read_users(
-    skip: int = 0, 
-    limit: int = 100, 
+    response: Response,
+    pag: Paginacion = Depends(),
     db: AsyncSession = Depends(get_db)
 ):
-    users = await crud_usuario.get_multi(db, skip=skip, limit=limit)
-    return users
+    return await listar(crud_usuario, db, pag, response)
 
 
 # 2. CREAR USUARIO (POST)
@@ -0,0 +1,46 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class CacheTTL:
+    """
+    Caché en memoria del proceso con expiración (TTL) y tope de entradas (LRU).
+    Pensado para claves que ya incluyen la versión del dato (ej: (id_periodo, version)),
+    así que el TTL solo limpia lo que nadie vuelve a pedir.
+    """
+
+    def __init__(self, max_items: int = 128, ttl: float = 300):
+        self.max_items = max_items
+        self.ttl = ttl
+        self._datos: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, clave: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._datos.get(clave)
+            if item is None:
+                return default
+            expira, valor = item
+            if expira < time.monotonic():
+                del self._datos[clave]
+                return default
+            self._datos.move_to_end(clave)
+            return valor
+
+    def set(self, clave: Hashable, valor: Any) -> None:
+        with self._lock:
+            self._datos[clave] = (time.monotonic() + self.ttl, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_items:
+                self._datos.popitem(last=False)
+
+    def invalidar(self, prefijo: Any = None) -> None:
+        """Sin prefijo borra todo; con prefijo borra las claves tupla que empiezan con él."""
+        with self._lock:
+            if prefijo is None:
+                self._datos.clear()
+                return
+            for clave in [c for c in self._datos if isinstance(c, tuple) and c[:1] == (prefijo,)]:
+                del self._datos[clave]
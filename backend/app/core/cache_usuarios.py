@@ -0,0 +1,41 @@
+import traceback
+from typing import Any, Optional
+
+from app.core.cache import CacheTTL
+from app.core.config import settings
+from app.core.pubsub import pubsub
+
+# Usuarios ya resueltos por get_current_user: {(username, iat): Usuario (desligado de la sesión)}
+# iat en la clave: un login nuevo siempre vuelve a leer la BD
+_usuarios = CacheTTL(max_items=512, ttl=settings.USUARIO_CACHE_TTL)
+
+# Canal para que los otros workers también olviden al usuario (mensaje = username)
+CANAL = "usuario_invalidar"
+
+
+def obtener(username: str, iat: Any) -> Optional[Any]:
+    return _usuarios.get((username, iat))
+
+
+def guardar(username: str, iat: Any, usuario: Any) -> None:
+    _usuarios.set((username, iat), usuario)
+
+
+async def invalidar_usuario(*usernames: str) -> None:
+    """Llamar después del commit que cambió la fila del usuario (todos sus tokens)."""
+    for username in usernames:
+        if not username:
+            continue
+        _usuarios.invalidar(username)
+        try:
+            await pubsub.publicar(CANAL, username)
+        except Exception:
+            traceback.print_exc()
+
+
+async def _al_invalidar(username: str) -> None:
+    _usuarios.invalidar(username)
+
+
+async def escuchar_invalidaciones() -> None:
+    await pubsub.suscribir(CANAL, _al_invalidar)
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -17,5 +18,25 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "TU_SECRET_KEY_SUPER_SECRETA_CAMBIALA_EN_PRODUCCION"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24  # 1 día
+    # Segundos que get_current_user reutiliza un usuario ya leído (0 = siempre ir a la BD)
+    USUARIO_CACHE_TTL: int = int(os.getenv("USUARIO_CACHE_TTL", "60"))
+    # Costo de bcrypt (2^rounds iteraciones; 12 = default de passlib). Los hashes viejos siguen validando
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    # Hilos dedicados a bcrypt por worker: un pico de logins no se come todo el pool por defecto
+    BCRYPT_WORKERS: int = int(os.getenv("BCRYPT_WORKERS", "2"))
+
+    # Tiempo real (WebSocket de la grilla): 'local' = un solo worker, 'postgres' = LISTEN/NOTIFY entre workers
+    PUBSUB_BACKEND: str = os.getenv("PUBSUB_BACKEND", "local")
+
+    # Exportaciones ya generadas (Excel, etc.) por versión del periodo. Compartida si hay varios workers
+    EXPORT_CACHE_DIR: str = os.getenv("EXPORT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "horarios_exportaciones"))
+    # Procesos para generar archivos en paralelo (ZIP por docente/grupo/aula)
+    EXPORT_PROCESOS: int = int(os.getenv("EXPORT_PROCESOS", str(min(4, os.cpu_count() or 1))))
+    # Trabajos de exportación en segundo plano: segundos sin terminar para darlo por perdido
+    # (worker reiniciado) y volver a lanzarlo; minutos de validez del token de descarga
+    EXPORT_TRABAJO_TIMEOUT: int = int(os.getenv("EXPORT_TRABAJO_TIMEOUT", "600"))
+    EXPORT_TOKEN_MINUTOS: int = int(os.getenv("EXPORT_TOKEN_MINUTOS", "5"))
+    # Zona horaria de las clases (feeds .ics)
+    ZONA_HORARIA: str = os.getenv("ZONA_HORARIA", "America/Lima")
 
 settings = Settings()
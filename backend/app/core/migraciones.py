@@ -0,0 +1,51 @@
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect, pool, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+# Un solo proceso migra: los demás workers (o réplicas) esperan en este candado
+_CANDADO = 4218
+
+
+def _migrar(conexion: Connection) -> None:
+    from app import models  # noqa: F401  (registra tablas y DDL de triggers)
+    from app.models.base import Base
+
+    config = Config(str(ALEMBIC_INI))
+    config.attributes["connection"] = conexion
+    tablas = inspect(conexion)
+    if not tablas.has_table("alembic_version") and not tablas.has_table("horario"):
+        # BD vacía: el esquema completo de una vez y se marca como al día
+        print("BD nueva: creando tablas...")
+        Base.metadata.create_all(conexion)
+        command.stamp(config, "head")
+    else:
+        # BD existente (con o sin alembic_version): las migraciones pendientes
+        command.upgrade(config, "head")
+
+
+async def preparar_bd() -> None:
+    """
+    Deja el esquema al día ANTES de atender peticiones. create_all solo se usa con
+    una BD vacía: sobre una BD existente crearía las tablas nuevas pero no las columnas
+    nuevas, y la migración siguiente fallaría por "relation already exists".
+    """
+    engine = create_async_engine(settings.DATABASE_URL, poolclass=pool.NullPool)
+    try:
+        async with engine.connect() as conexion:
+            await conexion.execute(text("SELECT pg_advisory_lock(:k)"), {"k": _CANDADO})
+            try:
+                await conexion.run_sync(_migrar)
+                await conexion.commit()
+            finally:
+                await conexion.rollback()
+                await conexion.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": _CANDADO})
+    finally:
+        await engine.dispose()
@@ -0,0 +1,36 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional
+
+from app.core.config import settings
+
+# Render de archivos (openpyxl) es CPU puro y no suelta el GIL: con hilos no escala.
+# Procesos aparte, creados al primer uso. 'spawn' para no heredar el event loop ni las
+# conexiones abiertas del worker (y porque es lo único que hay en Windows).
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _obtener_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.EXPORT_PROCESOS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pool
+
+
+def en_proceso(fn: Callable[..., Any], *args: Any) -> "asyncio.Future[Any]":
+    """
+    Corre fn(*args) en el pool de procesos. fn debe ser una función de módulo y
+    args/resultado deben poder serializarse (pickle): nada de objetos ORM ni sesiones.
+    """
+    return asyncio.get_running_loop().run_in_executor(_obtener_pool(), fn, *args)
+
+
+def cerrar() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -0,0 +1,120 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, List
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import engine
+
+Callback = Callable[[str], Awaitable[None]]
+
+
+class PubSubLocal:
+    """
+    Pub/Sub dentro del mismo proceso. Sirve con UN solo worker de uvicorn
+    (o para desarrollo): los mensajes no salen del proceso.
+    """
+
+    def __init__(self):
+        self._suscriptores: Dict[str, List[Callback]] = {}
+
+    async def iniciar(self) -> None:
+        pass
+
+    async def cerrar(self) -> None:
+        self._suscriptores.clear()
+
+    async def suscribir(self, canal: str, callback: Callback) -> None:
+        self._suscriptores.setdefault(canal, []).append(callback)
+
+    async def publicar(self, canal: str, mensaje: str) -> None:
+        for callback in self._suscriptores.get(canal, []):
+            asyncio.create_task(callback(mensaje))
+
+
+class PubSubPostgres(PubSubLocal):
+    """
+    Pub/Sub con LISTEN/NOTIFY de Postgres: todos los workers (y servidores) conectados
+    a la misma BD reciben los mensajes. El que publica también recibe su propio mensaje.
+    - LISTEN: una conexión asyncpg propia, fuera del pool, que solo escucha. Si se cae
+      (reinicio de Postgres, red) se reconecta sola y vuelve a suscribir los canales;
+      los avisos de mientras tanto se pierden.
+    - NOTIFY: por el pool de SQLAlchemy, así los avisos simultáneos no se pisan en
+      una sola conexión y los errores llegan a quien publica.
+    """
+
+    def __init__(self, dsn: str):
+        super().__init__()
+        self._dsn = dsn
+        self._conexion = None
+        self._reconexion = None
+        self._cerrando = False
+
+    async def iniciar(self) -> None:
+        self._cerrando = False
+        await self._conectar()
+
+    async def _conectar(self) -> None:
+        import asyncpg
+        conexion = await asyncpg.connect(self._dsn)
+        for canal in self._suscriptores:
+            await conexion.add_listener(canal, self._al_notificar)
+        conexion.add_termination_listener(self._al_perder_conexion)
+        self._conexion = conexion
+
+    def _al_perder_conexion(self, conexion) -> None:
+        if self._cerrando or conexion is not self._conexion:
+            return
+        self._conexion = None
+        if self._reconexion is None or self._reconexion.done():
+            self._reconexion = asyncio.create_task(self._reconectar())
+
+    async def _reconectar(self) -> None:
+        espera = 1
+        while not self._cerrando:
+            await asyncio.sleep(espera)
+            try:
+                await self._conectar()
+                print("PubSub: conexión LISTEN recuperada")
+                return
+            except Exception as e:
+                print(f"PubSub: no se pudo reconectar ({e}); reintento en {espera}s")
+                espera = min(espera * 2, 30)
+
+    async def cerrar(self) -> None:
+        self._cerrando = True
+        if self._reconexion is not None:
+            self._reconexion.cancel()
+            self._reconexion = None
+        if self._conexion is not None:
+            await self._conexion.close()
+            self._conexion = None
+        await super().cerrar()
+
+    async def suscribir(self, canal: str, callback: Callback) -> None:
+        # Sin conexión (reconectando): el canal se agrega al volver, en _conectar
+        if canal not in self._suscriptores and self._conexion is not None:
+            await self._conexion.add_listener(canal, self._al_notificar)
+        await super().suscribir(canal, callback)
+
+    def _al_notificar(self, conexion, pid, canal, mensaje) -> None:
+        # asyncpg llama a esto fuera de una corrutina: reenviamos a los callbacks locales
+        for callback in self._suscriptores.get(canal, []):
+            asyncio.create_task(callback(mensaje))
+
+    async def publicar(self, canal: str, mensaje: str) -> None:
+        # NOTIFY limita el mensaje a ~8000 bytes: mandar avisos cortos, no datos.
+        # Se entrega al hacer commit (engine.begin)
+        async with engine.begin() as conn:
+            await conn.execute(text("SELECT pg_notify(:canal, :mensaje)"), {"canal": canal, "mensaje": mensaje})
+
+
+def crear_pubsub():
+    """Elige el backend según settings.PUBSUB_BACKEND ('local' o 'postgres')."""
+    if settings.PUBSUB_BACKEND == "postgres":
+        # asyncpg no entiende el prefijo de SQLAlchemy
+        return PubSubPostgres(settings.DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://"))
+    return PubSubLocal()
+
+
+pubsub = crear_pubsub()
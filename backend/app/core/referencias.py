@@ -0,0 +1,65 @@
+import traceback
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, List, Sequence, Type, TypeVar
+
+from pydantic import BaseModel
+
+from app.core.cache import CacheTTL
+from app.core.pubsub import pubsub
+
+T = TypeVar("T", bound=BaseModel)
+
+# Canal para que los OTROS workers también limpien su copia (mensaje = nombre del caché)
+CANAL = "referencias_invalidar"
+
+_referencias: Dict[str, "CacheReferencia"] = {}
+
+
+class CacheReferencia(Generic[T]):
+    """
+    Caché de datos de referencia (catálogos, turnos, bloques, periodos, aulas, escuelas):
+    cambian pocas veces por semestre pero se leen en todas las pantallas.
+    Guarda listas ya validadas con el esquema de respuesta, no objetos ORM (que
+    quedarían atados a la sesión que los cargó).
+    El TTL es solo la red de seguridad: el CRUD que escribe llama a invalidar().
+    """
+
+    def __init__(self, nombre: str, esquema: Type[T], ttl: float = 600, max_items: int = 64):
+        self.nombre = nombre
+        self.esquema = esquema
+        self._cache = CacheTTL(max_items=max_items, ttl=ttl)
+        # Sube en cada invalidación: una carga que empezó antes no guarda datos viejos
+        self._generacion = 0
+        _referencias[nombre] = self
+
+    async def obtener(self, clave: Hashable, cargar: Callable[[], Awaitable[Sequence[Any]]]) -> List[T]:
+        datos = self._cache.get(clave)
+        if datos is None:
+            generacion = self._generacion
+            filas = await cargar()
+            datos = tuple(self.esquema.model_validate(f, from_attributes=True) for f in filas)
+            if generacion == self._generacion:
+                self._cache.set(clave, datos)
+        return list(datos)
+
+    def limpiar(self) -> None:
+        """Solo este worker."""
+        self._generacion += 1
+        self._cache.invalidar()
+
+    async def invalidar(self) -> None:
+        """Llamar después del commit que cambió la tabla. Avisa también al resto de workers."""
+        self.limpiar()
+        try:
+            await pubsub.publicar(CANAL, self.nombre)
+        except Exception:
+            traceback.print_exc()
+
+
+async def _al_invalidar(nombre: str) -> None:
+    cache = _referencias.get(nombre)
+    if cache is not None:
+        cache.limpiar()
+
+
+async def escuchar_invalidaciones() -> None:
+    await pubsub.suscribir(CANAL, _al_invalidar)
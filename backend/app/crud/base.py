@@ -1,11 +1,14 @@
 # app/crud/base.py
 from typing import TypeVar, Generic, Type, Optional
 from pydantic import BaseModel
+import json
+from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func, insert, update, delete, values, column
 from app.models.base import Base # Asume la Base
+from app.core.referencias import CacheReferencia
 
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from typing import Any, Dict, Generic, List, Optional, Sequence, Set, Tuple, Type, TypeVar, Union
 from fastapi.encoders import jsonable_encoder
 
 
@@ -16,6 +19,13 @@ CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    # Caché de datos de referencia (ver app/core/referencias.py). None = la tabla no se cachea
+    referencia: Optional[CacheReferencia] = None
+    # Relaciones que necesita el esquema de respuesta al listar objetos completos
+    opciones_listado: Sequence[Any] = ()
+    # Columnas que nunca se pueden pedir con ?campos= (ej: password)
+    campos_ocultos: Set[str] = set()
+
     def __init__(self, model: Type[ModelType]):
         """
         Objeto CRUD con métodos por defecto para Crear, Leer, Actualizar, Borrar (CRUD).
@@ -23,6 +33,17 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """
         self.model = model
 
+    async def _invalidar_referencia(self) -> None:
+        if self.referencia is not None:
+            await self.referencia.invalidar()
+
+    # Toda la tabla (ordenada por id) desde el caché de referencia
+    async def get_all_cache(self, db: AsyncSession) -> List[Any]:
+        async def cargar():
+            result = await db.execute(select(self.model).order_by(self.model.id))
+            return result.scalars().all()
+        return await self.referencia.obtener("todos", cargar)
+
     # Método para buscar por ID
     async def get(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
         stmt = select(self.model).where(self.model.id == id)
@@ -30,10 +51,61 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         return result.scalars().first()
 
     # Método para buscar todo
-    async def get_multi(self, db: AsyncSession, *, skip: int = 0, limit: int = 100) -> List[ModelType]:
-        stmt = select(self.model).offset(skip).limit(limit)
-        result = await db.execute(stmt)
-        return result.scalars().all()
+    async def get_multi(
+        self, db: AsyncSession, *, skip: int = 0, limit: int = 100,
+        despues_de: Optional[int] = None, campos: Optional[List[str]] = None, base=None
+    ) -> List[Any]:
+        """
+        Listado ordenado por id.
+        **despues_de**: paginación por cursor (WHERE id > despues_de). A diferencia de OFFSET
+            no lee y descarta las páginas anteriores, así que la página 500 cuesta lo mismo
+            que la primera. Si viene, se ignora skip.
+        **campos**: solo esas columnas (id siempre va). Retorna dicts y no carga relaciones.
+        **base**: select(self.model) ya filtrado por el CRUD hijo (joins / where), sin options.
+        """
+        stmt = base if base is not None else select(self.model)
+        if despues_de is not None:
+            stmt = stmt.where(self.model.id > despues_de)
+        else:
+            stmt = stmt.offset(skip)
+        stmt = stmt.order_by(self.model.id).limit(limit)
+
+        if campos:
+            result = await db.execute(stmt.with_only_columns(*self._columnas(campos)))
+            return [dict(fila) for fila in result.mappings().all()]
+
+        result = await db.execute(stmt.options(*self.opciones_listado))
+        return result.scalars().unique().all()
+
+    def _columnas(self, campos: List[str]) -> list:
+        columnas = self.model.__table__.c
+        invalidos = [c for c in campos if c not in columnas or c in self.campos_ocultos]
+        if invalidos:
+            raise HTTPException(400, f"Campos no válidos: {', '.join(invalidos)}")
+        return [columnas.id] + [columnas[c] for c in dict.fromkeys(campos) if c != "id"]
+
+    # Total de filas de un listado: estimado si es grande, exacto si es chico
+    async def contar(self, db: AsyncSession, *, base=None, exacto_hasta: int = 10000) -> Tuple[int, bool]:
+        """
+        Primero pregunta al planificador (EXPLAIN, no lee la tabla). Si estima pocas filas
+        hace el COUNT(*) real, que ahí es barato. Retorna (total, es_exacto).
+        """
+        stmt = (base if base is not None else select(self.model)).with_only_columns(self.model.id)
+        conn = await db.connection()
+        compilado = stmt.compile(dialect=conn.dialect, compile_kwargs={"render_postcompile": True})
+        # asyncpg usa parámetros posicionales ($1, $2...): se pasan en el orden del SQL compilado
+        params = compilado.params
+        if compilado.positiontup is not None:
+            params = tuple(params[nombre] for nombre in compilado.positiontup)
+        plan = (await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compilado}", params)).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimado = int(plan[0]["Plan"]["Plan Rows"])
+        if estimado > exacto_hasta:
+            return estimado, False
+
+        total = (await db.execute(select(func.count()).select_from(stmt.subquery()))).scalar()
+        return total, True
     
     # Método para crear un nuevo registro
     async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
@@ -43,6 +115,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db.add(db_obj)
         await db.commit()
         await db.refresh(db_obj)
+        await self._invalidar_referencia()
         return db_obj
     
     # Metodo para actualizar
@@ -63,9 +136,92 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db.add(db_obj)
         await db.commit()
         await db.refresh(db_obj)
+        await self._invalidar_referencia()
         return db_obj
 
        
+    # =================================================================
+    #  OPERACIONES EN LOTE: una sentencia por lote, no un objeto por vez
+    #  commit=True  -> confirman solas (como create / update).
+    #  commit=False -> solo ejecutan; el llamador junta varias en su transacción y
+    #                  hace el commit (y la invalidación del caché de referencia, si aplica).
+    # =================================================================
+
+    def _datos(self, obj_in: Union[CreateSchemaType, UpdateSchemaType, Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+        if isinstance(obj_in, dict):
+            return obj_in
+        return obj_in.model_dump(**kwargs)
+
+    async def create_many(
+        self, db: AsyncSession, *, objs_in: Sequence[Union[CreateSchemaType, Dict[str, Any]]], commit: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        INSERT ... RETURNING de todo el lote (asyncpg executemany, en bloques de VALUES).
+        Retorna las filas creadas (dicts con id y defaults) en el MISMO orden que objs_in.
+        """
+        filas = [self._datos(o) for o in objs_in]
+        if not filas:
+            return []
+        stmt = insert(self.model.__table__).returning(*self.model.__table__.c, sort_by_parameter_order=True)
+        result = await db.execute(stmt, filas)
+        creadas = [dict(f) for f in result.mappings().all()]
+        if commit:
+            await db.commit()
+            await self._invalidar_referencia()
+        return creadas
+
+    async def update_many(
+        self, db: AsyncSession, *, objs_in: Sequence[Dict[str, Any]], commit: bool = True
+    ) -> int:
+        """
+        UPDATE tabla SET ... FROM (VALUES (id, ...), ...) v WHERE tabla.id = v.id
+        Cada dict trae 'id' y las columnas a cambiar; los dicts con las mismas columnas
+        van en la misma sentencia. Retorna filas actualizadas.
+        """
+        tabla = self.model.__table__
+        grupos: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        for fila in objs_in:
+            claves = tuple(sorted(k for k in fila if k != "id"))
+            if claves:
+                grupos.setdefault(claves, []).append(fila)
+
+        total = 0
+        for claves, filas in grupos.items():
+            nombres = ("id",) + claves
+            lote = values(*[column(n, tabla.c[n].type) for n in nombres], name="lote").data(
+                [tuple(f[n] for n in nombres) for f in filas]
+            )
+            stmt = (
+                update(tabla)
+                .where(tabla.c.id == lote.c.id)
+                .values({n: lote.c[n] for n in claves})
+            )
+            total += (await db.execute(stmt)).rowcount
+        if commit:
+            await db.commit()
+            await self._invalidar_referencia()
+        return total
+
+    async def delete_many(self, db: AsyncSession, *, ids: Sequence[int], commit: bool = True) -> int:
+        """Borrado LÓGICO (estado = 0) de varios ids en un UPDATE. Retorna filas afectadas."""
+        if not ids:
+            return 0
+        result = await db.execute(update(self.model.__table__).where(self.model.id.in_(ids)).values(estado=0))
+        if commit:
+            await db.commit()
+            await self._invalidar_referencia()
+        return result.rowcount
+
+    async def remove_many(self, db: AsyncSession, *, ids: Sequence[int], commit: bool = True) -> int:
+        """Eliminación FÍSICA de varios ids en un DELETE. Retorna filas borradas."""
+        if not ids:
+            return 0
+        result = await db.execute(delete(self.model.__table__).where(self.model.id.in_(ids)))
+        if commit:
+            await db.commit()
+            await self._invalidar_referencia()
+        return result.rowcount
+
     #Metodo Borrado logico
     async def delete(self, db: AsyncSession, *, id: Any) -> Optional[ModelType]:
 
@@ -78,6 +234,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             db.add(obj)
             await db.commit()
             await db.refresh(obj)
+            await self._invalidar_referencia()
         return obj
 
     #Metodo Eliminación Fisica
@@ -86,4 +243,5 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         if obj:
             await db.delete(obj)
             await db.commit()
+            await self._invalidar_referencia()
         return obj
\ No newline at end of file
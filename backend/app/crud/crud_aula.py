@@ -3,9 +3,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.crud.base import CRUDBase
 from app.models.aula import Aula
-from app.schemas.aula import AulaCreate, AulaUpdate
+from app.schemas.aula import AulaCreate, AulaUpdate, AulaResponse
+from app.core.referencias import CacheReferencia
 
 class CRUDAula(CRUDBase[Aula, AulaCreate, AulaUpdate]):
+    referencia = CacheReferencia("aula", AulaResponse)
     
     # Filtro Multi-tenant
     async def get_multi_by_escuela(
@@ -25,6 +27,13 @@ class CRUDAula(CRUDBase[Aula, AulaCreate, AulaUpdate]):
         result = await db.execute(stmt)
         return result.scalars().all()
 
+    async def get_by_escuela_cache(self, db: AsyncSession, *, id_escuela: Optional[int]) -> List[AulaResponse]:
+        """Todas las aulas de la escuela (sin paginar) desde el caché; el endpoint pagina."""
+        async def cargar():
+            stmt = select(self.model).where(self.model.id_escuela == id_escuela).order_by(self.model.id)
+            return (await db.execute(stmt)).scalars().all()
+        return await self.referencia.obtener(("escuela", id_escuela), cargar)
+
     async def get_con_relaciones(self, db: AsyncSession, *, id: int) -> Optional[Aula]:
         stmt = (
             select(self.model)
@@ -5,9 +5,13 @@ from sqlalchemy import delete
 from app.crud.base import CRUDBase
 from app.models.bloque_horario import BloqueHorario
 from app.schemas.bloque_horario import BloqueHorarioCreate
+from app.schemas.turno import BloqueHorarioResponse
+from app.core.referencias import CacheReferencia
 from sqlalchemy import case
 
 class CRUDBloque(CRUDBase[BloqueHorario, BloqueHorarioCreate, BloqueHorarioCreate]):    
+    # Esquema con campos opcionales: el caché de "todos" no debe romperse por un bloque a medio llenar
+    referencia = CacheReferencia("bloque_horario", BloqueHorarioResponse)
     
     async def get_by_turno(self, db: AsyncSession, id_turno: int) -> List[BloqueHorario]:
 
@@ -25,29 +29,33 @@ class CRUDBloque(CRUDBase[BloqueHorario, BloqueHorarioCreate, BloqueHorarioCreat
         result = await db.execute(stmt)
         return result.scalars().all()
 
+    async def get_by_turno_cache(self, db: AsyncSession, id_turno: int) -> List[BloqueHorarioResponse]:
+        """Igual que get_by_turno (activos, por día y orden), pero desde el caché de referencia."""
+        async def cargar():
+            return await self.get_by_turno(db, id_turno=id_turno)
+        return await self.referencia.obtener(("turno", id_turno), cargar)
+
     async def create_bulk(self, db: AsyncSession, id_turno: int, dias: List[str], intervalos: List):
-        bloques_creados = []
-        for dia in dias:
-            for inv in intervalos:
-                db_obj = BloqueHorario(
-                    dia_semana=dia,
-                    hora_inicio=inv.inicio, # Cambio: acceso a atributo del schema
-                    hora_fin=inv.fin,       # Cambio: acceso a atributo del schema
-                    orden=inv.orden,        # Cambio: acceso a atributo del schema
-                    id_turno=id_turno,
-                    estado=1
-                )
-                db.add(db_obj)
-                bloques_creados.append(db_obj)
-        
-        await db.commit()
-        return bloques_creados  
+        # Toda la rejilla en un solo INSERT ... RETURNING (create_many ya invalida el caché)
+        return await self.create_many(db, objs_in=[
+            dict(
+                dia_semana=dia,
+                hora_inicio=inv.inicio, # Cambio: acceso a atributo del schema
+                hora_fin=inv.fin,       # Cambio: acceso a atributo del schema
+                orden=inv.orden,        # Cambio: acceso a atributo del schema
+                id_turno=id_turno,
+                estado=1
+            )
+            for dia in dias
+            for inv in intervalos
+        ])
     
     async def remove_by_turno(self, db: AsyncSession, id_turno: int):
         """Elimina todos los bloques asociados a un turno específico[cite: 9, 10]."""
         stmt = delete(self.model).where(self.model.id_turno == id_turno)
         await db.execute(stmt)
         await db.commit()
+        await self._invalidar_referencia()
         return True
 
 
@@ -1,9 +1,10 @@
 from app.crud.base import CRUDBase
 from app.models.catalogo import Catalogo
-from app.schemas.catalogo import CatalogoCreate, CatalogoUpdate
+from app.schemas.catalogo import CatalogoCreate, CatalogoUpdate, CatalogoResponse
+from app.core.referencias import CacheReferencia
 
 class CRUDCatalogo(CRUDBase[Catalogo, CatalogoCreate, CatalogoUpdate]):
-    pass
+    referencia = CacheReferencia("catalogo", CatalogoResponse)
     # Si necesitaras una consulta especial (ej: buscar por codigo), la agregas aquí:
     # async def get_by_codigo(self, db: AsyncSession, codigo: str):
     #     ...
@@ -14,35 +14,31 @@ from sqlalchemy import join
 
 
 class CRUDCurso(CRUDBase[Curso, CursoCreate, CursoUpdate]):
-    pass
+    opciones_listado = (
+        # 1. Cargamos la versión del plan (que ya tenías seguramente)
+        selectinload(Curso.plan_version),
+        # 2. CRÍTICO: Cargar la relación de requisitos para evitar MissingGreenlet
+        selectinload(Curso.requisitos),
+    )
 
-    async def get_multi_by_escuela(
-        self, db: AsyncSession, *, id_escuela: Optional[int], skip: int = 0, limit: int = 100
-    ) -> List[Curso]:
-        """
-        Obtiene cursos filtrados por escuela, cargando PlanVersion y REQUISITOS.
-        """
-        
+    def consulta_por_escuela(self, id_escuela: Optional[int]):
+        """Cursos de la escuela (Curso -> PlanVersion -> PlanEstudio). Base para get_multi / contar."""
         stmt = (
             select(self.model)
             .join(Curso.plan_version)
             .join(PlanVersion.plan_estudio)
-            .options(
-                # 1. Cargamos la versión del plan (que ya tenías seguramente)
-                selectinload(Curso.plan_version),
-                
-                # 2. CRÍTICO: Cargar la relación de requisitos para evitar MissingGreenlet
-                selectinload(Curso.requisitos) 
-            )
-            .offset(skip)
-            .limit(limit)
         )
-        
         if id_escuela is not None:
             stmt = stmt.where(PlanEstudio.id_escuela == id_escuela)
+        return stmt
 
-        result = await db.execute(stmt)
-        return result.scalars().all()
+    async def get_multi_by_escuela(
+        self, db: AsyncSession, *, id_escuela: Optional[int], skip: int = 0, limit: int = 100
+    ) -> List[Curso]:
+        """
+        Obtiene cursos filtrados por escuela, cargando PlanVersion y REQUISITOS.
+        """
+        return await self.get_multi(db, skip=skip, limit=limit, base=self.consulta_por_escuela(id_escuela))
 
     async def create(self, db: AsyncSession, *, obj_in: CursoCreate) -> Curso:
         obj_in_data = obj_in.model_dump()
@@ -14,18 +14,9 @@ class CRUDCursoAperturado(CRUDBase[CursoAperturado, CursoAperturadoCreate, Curso
         result = await db.execute(stmt)
         return result.scalars().all()
 
-    # Guardar múltiples cursos a la vez
+    # Guardar múltiples cursos a la vez (un solo INSERT, ver CRUDBase.create_many)
     async def create_multi(self, db: AsyncSession, *, objs_in: List[CursoAperturadoCreate]) -> int:
-        count = 0
-        for obj_in in objs_in:
-            # Convertimos esquema a dict para guardar
-            obj_in_data = obj_in.dict() if hasattr(obj_in, 'dict') else obj_in.model_dump()
-            db_obj = self.model(**obj_in_data)
-            db.add(db_obj)
-            count += 1
-        
-        await db.commit()
-        return count
+        return len(await self.create_many(db, objs_in=objs_in))
 
 # Instancia exportada para usar en el router
 curso_aperturado = CRUDCursoAperturado(CursoAperturado)
\ No newline at end of file
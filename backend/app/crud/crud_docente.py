@@ -7,30 +7,22 @@ from sqlalchemy.orm import selectinload
 from typing import List, Optional
 
 class CRUDDocente(CRUDBase[Docente, DocenteCreate, DocenteUpdate]):
-    
+    # CRÍTICO: CARGA ANSIOSA (EAGER LOADING) de lo que pide DocenteResponse
+    opciones_listado = (
+        selectinload(Docente.contratos),
+        selectinload(Docente.disponibilidad),
+    )
+
+    def consulta_por_escuela(self, id_escuela: Optional[int]):
+        """Filtro Multi-tenant (misma semántica de antes: None = docentes sin escuela)."""
+        return select(self.model).where(self.model.id_escuela == id_escuela)
 
     # Implementamos el filtro Multi-tenant para listar
     async def get_multi_by_escuela(
         self, db: AsyncSession, *, id_escuela: int, skip: int = 0, limit: int = 100
     ) -> List[Docente]:
         """Obtiene la lista de docentes filtrada por ID de escuela, cargando las relaciones."""
-        stmt = (
-            select(self.model)
-            .where(self.model.id_escuela == id_escuela)
-            .offset(skip)
-            .limit(limit)
-            # CRÍTICO: CARGA ANSIOSA (EAGER LOADING)  se agrea esto de options 
-            .options(
-                selectinload(Docente.contratos),
-                selectinload(Docente.disponibilidad) # Asumiendo que la incluiste en el esquema de respuesta
-            )
-        )
-        # Aplicar el filtro si no es None
-        if id_escuela is not None:
-            stmt = stmt.where(self.model.id_escuela == id_escuela)
-
-        result = await db.execute(stmt)
-        return result.scalars().unique().all()
+        return await self.get_multi(db, skip=skip, limit=limit, base=self.consulta_por_escuela(id_escuela))
     
     async def get_by_dni(self, db: AsyncSession, dni: str) -> Optional[Docente]:
         """Obtiene un docente por su número de DNI."""
@@ -1,8 +1,9 @@
 from app.crud.base import CRUDBase
 from app.models.escuela import Escuela
-from app.schemas.escuela import EscuelaCreate, EscuelaUpdate
+from app.schemas.escuela import EscuelaCreate, EscuelaUpdate, EscuelaResponse
+from app.core.referencias import CacheReferencia
 
 class CRUDEscuela(CRUDBase[Escuela, EscuelaCreate, EscuelaUpdate]):
-    pass
+    referencia = CacheReferencia("escuela", EscuelaResponse)
 
 escuela = CRUDEscuela(Escuela)
\ No newline at end of file
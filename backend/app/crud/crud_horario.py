@@ -1,32 +1,121 @@
+from typing import List, Optional
 from app.crud.base import CRUDBase
 from app.models.horario import Horario
 from app.models.sesion import Sesion
 from app.models.grupo import Grupo
 from app.models.curso_aperturado import CursoAperturado
+from app.models.curso import Curso
+from app.models.docente import Docente
+from app.models.aula import Aula
+from app.models.bloque_horario import BloqueHorario
 from app.schemas.horario import HorarioCreate
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload, joinedload
 
 class CRUDHorario(CRUDBase[Horario, HorarioCreate, HorarioCreate]):
-    async def get_horario_periodo(self, db: AsyncSession, id_periodo: int):
-        """Obtiene todo el horario de un periodo con relaciones cargadas."""
+    def consulta_horario_periodo(self, id_periodo: int, ids: Optional[List[int]] = None):
+        """
+        Horario activo de un periodo con relaciones cargadas (formato HorarioResponse).
+        Sin las casillas vacías del esqueleto: en un delta, vaciar una casilla es 'eliminado'.
+        Con `ids` solo trae esas casillas (para los deltas).
+        Todo son relaciones muchos-a-uno: sirve también para streaming (yield_per).
+        """
         stmt = (
             select(self.model)
-            .where(self.model.id_periodo == id_periodo)
+            .where(self.model.id_periodo == id_periodo, self.model.estado == 1, self.model.id_sesion.isnot(None))
             .options(
                 # Cargamos la sesión y TODA su cadena hasta el curso para saber el ciclo
                 joinedload(Horario.sesion)
                     .joinedload(Sesion.grupo)
                     .joinedload(Grupo.curso_aperturado)
                     .joinedload(CursoAperturado.curso),
-                selectinload(Horario.bloque),
-                selectinload(Horario.aula)
+                joinedload(Horario.sesion).joinedload(Sesion.grupo).joinedload(Grupo.docente),
+                joinedload(Horario.bloque_horario),
+                joinedload(Horario.aula)
             )
         )
-        result = await db.execute(stmt)
-        return result.scalars().all()
+        if ids is not None:
+            stmt = stmt.where(self.model.id.in_(ids))
+        return stmt
 
-    pass
+    async def get_horario_periodo(self, db: AsyncSession, id_periodo: int, ids: Optional[List[int]] = None):
+        # unique() por los joins de la misma cadena
+        result = await db.execute(self.consulta_horario_periodo(id_periodo, ids))
+        return result.unique().scalars().all()
+
+    async def get_grilla_plana(self, db: AsyncSession, id_periodo: int) -> dict:
+        """
+        Horario del periodo para la grilla en UNA consulta plana (sin objetos ORM ni schemas).
+        Formato columnar: catálogos {id: datos} que se repiten poco,
+        y las celdas como listas paralelas (celdas['id_sesion'][i] va con celdas['id_bloque'][i]).
+        """
+        stmt = (
+            select(
+                Horario.id, Horario.id_sesion, Horario.id_bloque, Horario.id_aula,
+                BloqueHorario.dia_semana, BloqueHorario.orden, BloqueHorario.hora_inicio, BloqueHorario.hora_fin,
+                Sesion.tipo_sesion, Sesion.duracion_horas, Sesion.id_grupo,
+                Grupo.nombre, Grupo.id_docente, Grupo.id_turno, CursoAperturado.id_curso,
+                Curso.codigo, Curso.nombre, Curso.ciclo,
+                Docente.nombre, Docente.apellido,
+                Aula.nombre
+            )
+            .select_from(Horario)
+            .join(Sesion, Sesion.id == Horario.id_sesion)
+            .join(Grupo, Grupo.id == Sesion.id_grupo)
+            .join(CursoAperturado, CursoAperturado.id == Grupo.id_curso_aperturado)
+            .join(Curso, Curso.id == CursoAperturado.id_curso)
+            .join(BloqueHorario, BloqueHorario.id == Horario.id_bloque)
+            .outerjoin(Docente, Docente.id == Grupo.id_docente)
+            .outerjoin(Aula, Aula.id == Horario.id_aula)
+            .where(Horario.id_periodo == id_periodo, Horario.estado == 1)
+            .order_by(Horario.id_bloque, Horario.id)
+        )
+        filas = (await db.execute(stmt)).all()
+
+        bloques, sesiones, grupos, cursos, docentes, aulas = {}, {}, {}, {}, {}, {}
+        celdas = {"id": [], "id_sesion": [], "id_bloque": [], "id_aula": []}
+
+        for (id_h, id_sesion, id_bloque, id_aula,
+             dia, orden, hora_inicio, hora_fin,
+             tipo_sesion, duracion, id_grupo,
+             nombre_grupo, id_docente, id_turno, id_curso,
+             codigo_curso, nombre_curso, ciclo,
+             nombre_docente, apellido_docente,
+             nombre_aula) in filas:
+
+            celdas["id"].append(id_h)
+            celdas["id_sesion"].append(id_sesion)
+            celdas["id_bloque"].append(id_bloque)
+            celdas["id_aula"].append(id_aula)
+
+            # Los catálogos se llenan una sola vez por id
+            if id_bloque not in bloques:
+                bloques[id_bloque] = {
+                    "dia": dia, "orden": orden,
+                    "inicio": hora_inicio.strftime("%H:%M") if hora_inicio else None,
+                    "fin": hora_fin.strftime("%H:%M") if hora_fin else None,
+                }
+            if id_sesion not in sesiones:
+                sesiones[id_sesion] = {"tipo": tipo_sesion, "duracion": duracion, "id_grupo": id_grupo}
+            if id_grupo not in grupos:
+                grupos[id_grupo] = {"nombre": nombre_grupo, "id_docente": id_docente, "id_turno": id_turno, "id_curso": id_curso}
+            if id_curso not in cursos:
+                cursos[id_curso] = {"codigo": codigo_curso, "nombre": nombre_curso, "ciclo": ciclo}
+            if id_docente and id_docente not in docentes:
+                docentes[id_docente] = {"nombre": nombre_docente, "apellido": apellido_docente}
+            if id_aula and id_aula not in aulas:
+                aulas[id_aula] = nombre_aula
+
+        return {
+            "id_periodo": id_periodo,
+            "bloques": bloques,
+            "sesiones": sesiones,
+            "grupos": grupos,
+            "cursos": cursos,
+            "docentes": docentes,
+            "aulas": aulas,
+            "celdas": celdas,
+        }
 
 horario = CRUDHorario(Horario)
\ No newline at end of file
@@ -1,13 +1,14 @@
 from app.crud.base import CRUDBase
 from app.models.periodo_academico import PeriodoAcademico
-from app.schemas.periodo import PeriodoCreate, PeriodoUpdate
+from app.schemas.periodo import PeriodoCreate, PeriodoUpdate, PeriodoResponse
+from app.core.referencias import CacheReferencia
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from typing import List, Optional
 
 class CRUDPeriodo (CRUDBase[PeriodoAcademico, PeriodoCreate, PeriodoUpdate]):
-
+    referencia = CacheReferencia("periodo_academico", PeriodoResponse)
 
     async def get_by_codigo(self, db: AsyncSession, codigo: str) -> Optional[PeriodoAcademico]:
         stmt = select(PeriodoAcademico).where(PeriodoAcademico.codigo == codigo)
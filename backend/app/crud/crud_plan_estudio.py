@@ -6,17 +6,13 @@ from sqlalchemy.future import select
 
 class CRUDPlanEstudio(CRUDBase[PlanEstudio, PlanEstudioCreate, PlanEstudioUpdate]):
     
+    def consulta_por_escuela(self, id_escuela: int):
+        return select(self.model).where(self.model.id_escuela == id_escuela)
+
     # Implementamos el filtro Multi-tenant para listar esto es segun el usuario logueado
     async def get_multi_by_escuela(
         self, db: AsyncSession, *, id_escuela: int, skip: int = 0, limit: int = 100
     ):
-        stmt = (
-            select(self.model)
-            .where(self.model.id_escuela == id_escuela)
-            .offset(skip)
-            .limit(limit)
-        )
-        result = await db.execute(stmt)
-        return result.scalars().all()
+        return await self.get_multi(db, skip=skip, limit=limit, base=self.consulta_por_escuela(id_escuela))
 
 plan_estudio = CRUDPlanEstudio(PlanEstudio)
\ No newline at end of file
@@ -8,8 +8,9 @@ from sqlalchemy.orm import selectinload
 from sqlalchemy.future import select
 
 class CRUDPlanVersion(CRUDBase[PlanVersion, PlanVersionCreate, PlanVersionUpdate]):
-    # Por ahora, CRUDBase genérico es suficiente
-    pass
+
+    def consulta_por_plan(self, id_plan_estudio: int):
+        return select(self.model).where(self.model.id_plan_estudio == id_plan_estudio)
 
     async def get_multi_by_escuela(
         self, db: AsyncSession, *, id_escuela: Optional[int], skip: int = 0, limit: int = 100
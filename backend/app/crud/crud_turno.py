@@ -3,10 +3,13 @@ from app.crud.base import CRUDBase
 from app.models.turno import Turno
 from app.schemas.turno import TurnoCreate, TurnoBase, TurnoResponse # Usamos TurnoBase como Update genérico por ahora
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.referencias import CacheReferencia
 
 from sqlalchemy import select
 
 class CRUDTurno(CRUDBase[Turno, TurnoCreate, TurnoBase]):
+    referencia = CacheReferencia("turno", TurnoResponse)
+
     async def get(self, db: AsyncSession, id: int) -> Optional[Turno]:
         result = await db.execute(select(Turno).where(Turno.id == id))
         return result.scalars().first()
@@ -21,6 +24,7 @@ class CRUDTurno(CRUDBase[Turno, TurnoCreate, TurnoBase]):
         db.add(db_obj)
         await db.commit()
         await db.refresh(db_obj)
+        await self._invalidar_referencia()
         return db_obj
 
     async def remove(self, db: AsyncSession, id: int) -> Optional[Turno]:
@@ -28,12 +32,19 @@ class CRUDTurno(CRUDBase[Turno, TurnoCreate, TurnoBase]):
         if obj:
             await db.delete(obj)
             await db.commit()
+            await self._invalidar_referencia()
         return obj
 
     async def get_multi_by_escuela(self, db: AsyncSession, id_escuela: int) -> List[Turno]:
         """Trae todos los turnos de la escuela."""
-        stmt = select(self.model).where(self.model.id_escuela == id_escuela)
+        stmt = select(self.model).where(self.model.id_escuela == id_escuela).order_by(self.model.id)
         result = await db.execute(stmt)
         return result.scalars().all()
+
+    async def get_by_escuela_cache(self, db: AsyncSession, id_escuela: int) -> List[TurnoResponse]:
+        """Igual que get_multi_by_escuela, pero desde el caché de referencia."""
+        async def cargar():
+            return await self.get_multi_by_escuela(db, id_escuela=id_escuela)
+        return await self.referencia.obtener(("escuela", id_escuela), cargar)
     
 turno = CRUDTurno(Turno)
\ No newline at end of file
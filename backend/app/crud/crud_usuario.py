@@ -3,13 +3,15 @@ from typing import Optional, Dict, Any, Union
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, or_
 
-from app.core.security import get_password_hash, verify_password
+from app.core.security import get_password_hash_async, verify_password_async
+from app.core.cache_usuarios import invalidar_usuario
 from app.crud.base import CRUDBase
 from app.models.usuario import Usuario
 from app.schemas.usuario import UsuarioCreate, UsuarioUpdate
 
 
 class CRUDUsuario(CRUDBase[Usuario, UsuarioCreate, UsuarioUpdate]):
+    campos_ocultos = {"password"}
 
     # 1. Búsqueda por Username (Para el Login)
     async def get_by_username(self, db: AsyncSession, username: str) -> Optional[Usuario]:
@@ -27,7 +29,7 @@ class CRUDUsuario(CRUDBase[Usuario, UsuarioCreate, UsuarioUpdate]):
     async def create(self, db: AsyncSession, *, obj_in: UsuarioCreate) -> Usuario:
         obj_in_data = obj_in.model_dump()                           # Convertimos a dict
         password_plano = obj_in_data.pop("password")                # Sacamos el password plano y lo hasheamos
-        hashed_password = get_password_hash(password_plano)    
+        hashed_password = await get_password_hash_async(password_plano)    
         db_obj = Usuario(**obj_in_data, password=hashed_password)   # Creamos el objeto con el hash
         db.add(db_obj)
         await db.commit()
@@ -44,10 +46,14 @@ class CRUDUsuario(CRUDBase[Usuario, UsuarioCreate, UsuarioUpdate]):
             
         # Si envían un nuevo password, lo hasheamos antes de pasar al padre
         if "password" in update_data and update_data["password"]:
-            hashed_password = get_password_hash(update_data["password"])
+            hashed_password = await get_password_hash_async(update_data["password"])
             update_data["password"] = hashed_password
-            
-        return await super().update(db, db_obj=db_obj, obj_in=update_data)
+
+        username_anterior = db_obj.username
+        db_obj = await super().update(db, db_obj=db_obj, obj_in=update_data)
+        # get_current_user tiene cacheado al usuario (por su username viejo y nuevo)
+        await invalidar_usuario(username_anterior, db_obj.username)
+        return db_obj
     
     # 4. Método auxiliar para autenticar (Login)
     async def authenticate(self, db: AsyncSession, username_or_email: str, password: str) -> Optional[Usuario]:
@@ -63,7 +69,7 @@ class CRUDUsuario(CRUDBase[Usuario, UsuarioCreate, UsuarioUpdate]):
         
         if not user:
             return None
-        if not verify_password(password, user.password):
+        if not await verify_password_async(password, user.password):
             return None
         return user
 
@@ -2,20 +2,26 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.api import api_router
-from app.core.database import engine
-from app.models.base import Base
 from app import models
+from app.core.pubsub import pubsub
+from app.core import migraciones, referencias, cache_usuarios, procesos
+from app.services import tiempo_real_service
 from contextlib import asynccontextmanager
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Log para que veas en consola que está intentando crear las tablas
-    print("Iniciando creación de tablas...")
-    async with engine.begin() as conn:
-        # run_sync es obligatorio para motores asíncronos
-        await conn.run_sync(Base.metadata.create_all)
-    print("Tablas creadas con éxito.")
+    # Esquema al día antes de atender: BD vacía -> create_all; existente -> alembic upgrade head
+    print("Preparando la base de datos...")
+    await migraciones.preparar_bd()
+    print("Base de datos al día.")
+    # Pub/Sub entre workers: grilla en vivo (WebSocket de horarios) y caché de referencias
+    await pubsub.iniciar()
+    await tiempo_real_service.iniciar()
+    await referencias.escuchar_invalidaciones()
+    await cache_usuarios.escuchar_invalidaciones()
     yield
+    await pubsub.cerrar()
+    procesos.cerrar()
 
 # 1. Inicializar la aplicación FastAPI
 app = FastAPI(
@@ -47,6 +53,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Para que el front pueda leer la paginación (X-*) y el ETag de las lecturas por periodo
+    expose_headers=["X-Siguiente", "X-Total", "X-Total-Exacto", "ETag"],
 )
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
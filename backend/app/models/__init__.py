@@ -24,4 +24,6 @@ from .grupo import Grupo
 from .horario import Horario
 from .horario_examen import HorarioExamen 
 from .sesion import Sesion 
+from .periodo_version import PeriodoVersion, PeriodoVersionPendiente
+from .horario_cambio import HorarioCambio, HorarioCambioPendiente
 # ... (y así sucesivamente con todos los modelos)
\ No newline at end of file
@@ -1,6 +1,6 @@
 from typing import Any
 from sqlalchemy.ext.declarative import as_declarative, declared_attr
-from sqlalchemy import Column, Integer
+from sqlalchemy import Column, Integer, DDL, event
 
 @as_declarative()
 class Base:
@@ -23,4 +23,17 @@ class BaseMixin:
     Evita repetir id y estado en cada modelo.
     """
     id = Column(Integer, primary_key=True, index=True)
-    estado = Column(Integer, default=1, nullable=False)
\ No newline at end of file
+    estado = Column(Integer, default=1, nullable=False)
+
+
+def registrar_ddl(tabla: str, *sentencias: str) -> None:
+    """
+    Registra SQL crudo (funciones, triggers) que create_all ejecuta
+    cuando crea `tabla` en una BD nueva.
+    La tabla debe estar ya declarada (llamar después de definir el modelo).
+    Las migraciones de Alembic ejecutan las mismas sentencias en BDs existentes.
+    """
+    # after_create de la tabla corre justo después de su CREATE TABLE
+    # (sus FKs ya existen, así que las tablas referenciadas también)
+    for sql in sentencias:
+        event.listen(Base.metadata.tables[tabla], "after_create", DDL(sql))
@@ -10,7 +10,7 @@ class BloqueHorario(Base, BaseMixin):
     hora_fin = Column(Time)
     orden = Column(Integer)
     
-    id_turno = Column(Integer, ForeignKey("turno.id"))
+    id_turno = Column(Integer, ForeignKey("turno.id"), index=True)
     
     # Relaciones
     turno = relationship("Turno", back_populates="bloques")
@@ -9,7 +9,7 @@ class CursoAperturado(Base, BaseMixin):
     __tablename__ = 'curso_aperturado'
     
     id_curso = Column(Integer, ForeignKey('curso.id'), nullable=False)
-    id_periodo = Column(Integer, ForeignKey('periodo_academico.id'), nullable=False)
+    id_periodo = Column(Integer, ForeignKey('periodo_academico.id'), nullable=False, index=True)
     cupos_proyectados = Column(Integer)
     
     # Relaciones
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy import Column, Integer, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 from app.models.base import Base, BaseMixin
 
@@ -13,6 +13,11 @@ class DisponibilidadDocente(Base, BaseMixin):
     docente = relationship("Docente", back_populates="disponibilidad")
     periodo = relationship("PeriodoAcademico", back_populates="disponibilidades")
 
+    __table_args__ = (
+        # Un solo saldo de horas por docente y periodo (su índice sirve también para buscarlo)
+        UniqueConstraint('id_docente', 'id_periodo', name='uq_disponibilidad_docente_periodo'),
+    )
+
 
 """
 # Asume que Docente y PeriodoAcademico ya están definidos y son importables
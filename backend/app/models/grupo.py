@@ -12,8 +12,8 @@ class Grupo(Base, BaseMixin):
     nombre = Column(String(30), nullable=False)
     vacantes = Column(Integer)
     
-    id_curso_aperturado = Column(Integer, ForeignKey('curso_aperturado.id'), nullable=False)
-    id_docente = Column(Integer, ForeignKey('docente.id'), nullable=True) 
+    id_curso_aperturado = Column(Integer, ForeignKey('curso_aperturado.id'), nullable=False, index=True)
+    id_docente = Column(Integer, ForeignKey('docente.id'), nullable=True, index=True)
     id_turno = Column(Integer, ForeignKey('turno.id'), nullable=False) 
     
     # Relaciones
@@ -1,19 +1,30 @@
 # app/models/horario.py
-from sqlalchemy import Column, Integer, ForeignKey, String, UniqueConstraint
+from sqlalchemy import Column, Integer, ForeignKey, String, UniqueConstraint, Index, text
 from sqlalchemy.orm import relationship
-from app.models.base import Base, BaseMixin
+from sqlalchemy.schema import FetchedValue
+from app.models.base import Base, BaseMixin, registrar_ddl
 
 class Horario(Base, BaseMixin):
     __tablename__ = 'horario'
-    
-    id_sesion = Column(Integer, ForeignKey('sesion.id'), nullable=False)
+
+    # NULL = casilla vacía (esqueleto del grupo): así quedan al crear el grupo y al mover una sesión
+    id_sesion = Column(Integer, ForeignKey('sesion.id'), nullable=True)
     id_bloque = Column(Integer, ForeignKey('bloque_horario.id'), nullable=False)
     id_aula = Column(Integer, ForeignKey('aula.id'), nullable=True)
     id_periodo = Column(Integer, ForeignKey('periodo_academico.id'), nullable=False)
-    
+
     ciclo = Column(Integer, nullable=False, default=0)
     grupo = Column(String(50), nullable=False, default='-')
 
+    # Copias de sesion -> grupo (id_grupo, id_docente). Las llena el trigger de abajo,
+    # NO se escriben desde Python. Sirven para que Postgres rechace los cruces.
+    # Sin ForeignKey a propósito: la integridad ya viene de sesion/grupo, y una FK extra
+    # vuelve ambiguos los .join(Grupo) / .outerjoin(Horario) implícitos de las consultas.
+    id_grupo = Column(Integer, nullable=True,
+                      server_default=FetchedValue(), server_onupdate=FetchedValue())
+    id_docente = Column(Integer, nullable=True,
+                        server_default=FetchedValue(), server_onupdate=FetchedValue())
+
     # Relaciones
     sesion = relationship("Sesion", back_populates="horarios")
     bloque_horario = relationship("BloqueHorario", back_populates="horarios")
@@ -23,4 +34,83 @@ class Horario(Base, BaseMixin):
 
     __table_args__ = (
         UniqueConstraint('id_periodo', 'id_bloque', 'ciclo', 'grupo', name='uq_horario_casilla'),
-    )
\ No newline at end of file
+
+        # CRUCES: un grupo, un docente o un aula no pueden estar dos veces en el mismo bloque
+        Index('uq_horario_grupo_bloque', 'id_periodo', 'id_bloque', 'id_grupo', unique=True,
+              postgresql_where=text('estado = 1 AND id_grupo IS NOT NULL')),
+        Index('uq_horario_docente_bloque', 'id_periodo', 'id_bloque', 'id_docente', unique=True,
+              postgresql_where=text('estado = 1 AND id_docente IS NOT NULL')),
+        Index('uq_horario_aula_bloque', 'id_periodo', 'id_bloque', 'id_aula', unique=True,
+              postgresql_where=text('estado = 1 AND id_aula IS NOT NULL')),
+
+        # Consultas de la grilla: "todo lo activo del periodo", ordenado/filtrado por bloque
+        Index('ix_horario_periodo_estado_bloque', 'id_periodo', 'estado', 'id_bloque'),
+        # Borrar / mover todas las casillas de una sesión
+        Index('ix_horario_sesion', 'id_sesion'),
+    )
+
+
+# =====================================================================
+#  TRIGGERS: mantienen horario.id_grupo / horario.id_docente al día
+# =====================================================================
+DDL_CRUCES = (
+    # 1. Al insertar o cambiar la sesión de una casilla, copiamos grupo y docente
+    """
+    CREATE OR REPLACE FUNCTION horario_sync_grupo_docente() RETURNS trigger AS $$
+    BEGIN
+        IF NEW.id_sesion IS NULL THEN
+            NEW.id_grupo := NULL;
+            NEW.id_docente := NULL;
+        ELSE
+            SELECT g.id, g.id_docente INTO NEW.id_grupo, NEW.id_docente
+            FROM sesion s JOIN grupo g ON g.id = s.id_grupo
+            WHERE s.id = NEW.id_sesion;
+        END IF;
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER trg_horario_sync_grupo_docente
+    BEFORE INSERT OR UPDATE OF id_sesion ON horario
+    FOR EACH ROW EXECUTE FUNCTION horario_sync_grupo_docente()
+    """,
+
+    # 2. Si cambia el docente de un grupo, sus casillas cambian de dueño
+    #    (si el nuevo docente ya tiene clase en ese bloque, el UPDATE del grupo falla)
+    """
+    CREATE OR REPLACE FUNCTION grupo_propaga_docente() RETURNS trigger AS $$
+    BEGIN
+        UPDATE horario SET id_docente = NEW.id_docente WHERE id_grupo = NEW.id;
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER trg_grupo_propaga_docente
+    AFTER UPDATE OF id_docente ON grupo
+    FOR EACH ROW WHEN (OLD.id_docente IS DISTINCT FROM NEW.id_docente)
+    EXECUTE FUNCTION grupo_propaga_docente()
+    """,
+
+    # 3. Si una sesión se mueve a otro grupo, sus casillas también
+    """
+    CREATE OR REPLACE FUNCTION sesion_propaga_grupo() RETURNS trigger AS $$
+    BEGIN
+        UPDATE horario
+        SET id_grupo = NEW.id_grupo,
+            id_docente = (SELECT g.id_docente FROM grupo g WHERE g.id = NEW.id_grupo)
+        WHERE id_sesion = NEW.id;
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER trg_sesion_propaga_grupo
+    AFTER UPDATE OF id_grupo ON sesion
+    FOR EACH ROW WHEN (OLD.id_grupo IS DISTINCT FROM NEW.id_grupo)
+    EXECUTE FUNCTION sesion_propaga_grupo()
+    """,
+)
+
+registrar_ddl('horario', *DDL_CRUCES)
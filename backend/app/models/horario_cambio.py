@@ -0,0 +1,103 @@
+# app/models/horario_cambio.py
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Index, func
+from app.models.base import Base, registrar_ddl
+from app.models.horario import Horario
+
+class HorarioCambio(Base):
+    """
+    Bitácora de cambios de horario para la sincronización por deltas.
+    Una fila por casilla insertada (I), actualizada (U) o borrada (D).
+    Las filas llegan al hacer commit (ver horario_cambio_confirmar): `seq` crece en el
+    orden de los commits de cada periodo.
+    """
+    __tablename__ = 'horario_cambio'
+
+    seq = Column(BigInteger, primary_key=True, autoincrement=True)
+    id_periodo = Column(Integer, nullable=False)
+    id_horario = Column(Integer, nullable=False)  # Sin FK: la casilla puede ya no existir
+    operacion = Column(String(1), nullable=False)
+    fecha = Column(DateTime, nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index('ix_horario_cambio_periodo_seq', 'id_periodo', 'seq'),
+    )
+
+
+class HorarioCambioPendiente(Base):
+    """
+    Cambios de la transacción en curso (xid), todavía sin seq. Viven solo hasta el
+    commit: ahí pasan a horario_cambio y se borran.
+    """
+    __tablename__ = 'horario_cambio_pendiente'
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)  # Orden dentro de la transacción
+    xid = Column(BigInteger, nullable=False)
+    id_periodo = Column(Integer, nullable=False)
+    id_horario = Column(Integer, nullable=False)
+    operacion = Column(String(1), nullable=False)
+
+    __table_args__ = (
+        Index('ix_horario_cambio_pendiente_xid', 'xid'),
+    )
+
+
+# =====================================================================
+#  TRIGGER: anota los cambios de horario (uno por evento, por las tablas de transición)
+# =====================================================================
+# El seq no se saca en la sentencia: una transacción con seq=100 podría confirmar DESPUÉS
+# de que un cliente ya leyó seq=101 y ese cambio se perdería. La sentencia solo anota en
+# horario_cambio_pendiente; al commit, periodo_version_aplicar (trigger diferido) bloquea
+# las filas de periodo_version de la transacción y recién ahí llama a
+# horario_cambio_confirmar, que saca los seq. Dos commits del mismo periodo se turnan en
+# ese bloqueo, que solo dura lo que dura el commit.
+# No hace falta anotar el periodo en periodo_version_pendiente: los triggers de versión
+# de horario ya lo hacen para los mismos periodos (nuevas y viejas).
+
+DDL_CAMBIOS = (
+    """
+    CREATE OR REPLACE FUNCTION horario_registra_cambio() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO horario_cambio_pendiente (xid, id_periodo, id_horario, operacion)
+            SELECT txid_current(), id_periodo, id, 'I' FROM nuevas ORDER BY id;
+        ELSIF TG_OP = 'DELETE' THEN
+            INSERT INTO horario_cambio_pendiente (xid, id_periodo, id_horario, operacion)
+            SELECT txid_current(), id_periodo, id, 'D' FROM viejas ORDER BY id;
+        ELSE
+            -- Si la casilla cambió de periodo, para el periodo viejo es un borrado
+            INSERT INTO horario_cambio_pendiente (xid, id_periodo, id_horario, operacion)
+            SELECT txid_current(), n.id_periodo, n.id, 'U' FROM nuevas n
+            UNION ALL
+            SELECT txid_current(), v.id_periodo, v.id, 'D' FROM viejas v JOIN nuevas n ON n.id = v.id
+            WHERE n.id_periodo <> v.id_periodo;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION horario_cambio_confirmar(transaccion bigint) RETURNS void AS $$
+    BEGIN
+        WITH movidos AS (
+            DELETE FROM horario_cambio_pendiente WHERE xid = transaccion
+            RETURNING id, id_periodo, id_horario, operacion
+        )
+        INSERT INTO horario_cambio (id_periodo, id_horario, operacion)
+        SELECT id_periodo, id_horario, operacion FROM movidos ORDER BY id;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+) + tuple(
+    f"""
+    CREATE TRIGGER trg_horario_cambio_{evento.lower()}
+    AFTER {evento} ON horario REFERENCING {referencias}
+    FOR EACH STATEMENT EXECUTE FUNCTION horario_registra_cambio()
+    """
+    for evento, referencias in (
+        ('INSERT', 'NEW TABLE AS nuevas'),
+        ('UPDATE', 'NEW TABLE AS nuevas OLD TABLE AS viejas'),
+        ('DELETE', 'OLD TABLE AS viejas'),
+    )
+)
+
+registrar_ddl('horario', *DDL_CAMBIOS)
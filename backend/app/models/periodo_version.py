@@ -0,0 +1,144 @@
+# app/models/periodo_version.py
+from sqlalchemy import Column, Integer, BigInteger
+from app.models.base import Base, registrar_ddl
+# Los triggers se cuelgan de estas tablas: tienen que estar declaradas antes
+from app.models.curso_aperturado import CursoAperturado
+from app.models.grupo import Grupo
+from app.models.sesion import Sesion
+from app.models.horario import Horario
+
+class PeriodoVersion(Base):
+    """
+    Contador de escrituras por periodo. Cualquier INSERT/UPDATE/DELETE sobre
+    horario, sesion, grupo o curso_aperturado de un periodo sube su versión
+    (y los catálogos curso/docente/aula/bloque_horario la de los periodos que los usan).
+    Sirve como clave de caché: si la versión no cambió, los datos tampoco.
+    Lo mantienen los triggers de abajo, NO se escribe desde Python.
+    """
+    __tablename__ = 'periodo_version'
+
+    id_periodo = Column(Integer, primary_key=True)  # Sin FK: no bloquea el borrado del periodo
+    version = Column(BigInteger, nullable=False, default=0)
+    # Último seq de horario_cambio borrado al compactar: quien pida cambios desde antes recibe todo
+    seq_compactado = Column(BigInteger, nullable=False, default=0, server_default='0')
+
+
+class PeriodoVersionPendiente(Base):
+    """
+    Periodos tocados por la transacción en curso (xid). Las filas viven solo hasta el
+    commit: ahí un trigger diferido sube periodo_version y las borra.
+    """
+    __tablename__ = 'periodo_version_pendiente'
+
+    xid = Column(BigInteger, primary_key=True)
+    id_periodo = Column(Integer, primary_key=True)
+
+
+# =====================================================================
+#  TRIGGERS: cada sentencia ANOTA sus periodos; la versión se sube al hacer commit
+# =====================================================================
+# Subir periodo_version en la misma sentencia dejaba su fila bloqueada hasta el commit:
+# todas las escrituras de un periodo quedaban en fila india. Ahora la sentencia solo
+# inserta (xid, periodo) en la tabla de pendientes (sin choques entre transacciones) y
+# un CONSTRAINT TRIGGER diferido hace el UPDATE al final, justo antes del commit.
+# Lectura y escritura siguen en la misma transacción: nunca se ve una versión nueva
+# con datos viejos ni al revés.
+
+# Cómo llegar al periodo desde las filas tocadas. {t} = tabla de transición (nuevas / viejas)
+PERIODO_DESDE = {
+    'horario': "SELECT t.id_periodo FROM {t} t",
+    'curso_aperturado': "SELECT t.id_periodo FROM {t} t",
+    'grupo': "SELECT ca.id_periodo FROM {t} t JOIN curso_aperturado ca ON ca.id = t.id_curso_aperturado",
+    'sesion': ("SELECT ca.id_periodo FROM {t} t JOIN grupo g ON g.id = t.id_grupo "
+               "JOIN curso_aperturado ca ON ca.id = g.id_curso_aperturado"),
+}
+
+# Catálogos que aparecen dentro de las respuestas de un periodo (nombres de docente, curso,
+# aula, horas del bloque): solo suben los periodos que usan las filas tocadas.
+CATALOGOS = {
+    'curso': "SELECT ca.id_periodo FROM {t} t JOIN curso_aperturado ca ON ca.id_curso = t.id",
+    'docente': ("SELECT ca.id_periodo FROM {t} t JOIN grupo g ON g.id_docente = t.id "
+                "JOIN curso_aperturado ca ON ca.id = g.id_curso_aperturado"),
+    'aula': "SELECT h.id_periodo FROM {t} t JOIN horario h ON h.id_aula = t.id",
+    # Las horas del turno salen en la grilla y en los Excel aunque el bloque no tenga clases
+    'bloque_horario': ("SELECT ca.id_periodo FROM {t} t JOIN grupo g ON g.id_turno = t.id_turno "
+                       "JOIN curso_aperturado ca ON ca.id = g.id_curso_aperturado"),
+}
+
+DDL_PENDIENTES = (
+    # plpgsql (no sql) para que no valide que las tablas existan al crearse
+    """
+    CREATE OR REPLACE FUNCTION periodo_version_subir(periodos integer[]) RETURNS void AS $$
+    BEGIN
+        INSERT INTO periodo_version_pendiente (xid, id_periodo)
+        SELECT DISTINCT txid_current(), p FROM unnest(periodos) p WHERE p IS NOT NULL
+        ON CONFLICT DO NOTHING;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    # Corre al commit, una vez por fila pendiente: la primera sube TODOS los periodos de la
+    # transacción (en orden: sin deadlocks) y las demás ya no encuentran nada.
+    # Con esas filas de periodo_version ya bloqueadas se pasan los cambios de horario a la
+    # bitácora: los seq de un periodo salen en el orden de los commits (ver horario_cambio.py)
+    """
+    CREATE OR REPLACE FUNCTION periodo_version_aplicar() RETURNS trigger AS $$
+    BEGIN
+        WITH hechos AS (
+            DELETE FROM periodo_version_pendiente WHERE xid = NEW.xid RETURNING id_periodo
+        )
+        INSERT INTO periodo_version (id_periodo, version)
+        SELECT id_periodo, 1 FROM hechos ORDER BY 1
+        ON CONFLICT (id_periodo) DO UPDATE SET version = periodo_version.version + 1;
+        PERFORM horario_cambio_confirmar(NEW.xid);
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE CONSTRAINT TRIGGER trg_periodo_version_aplicar
+    AFTER INSERT ON periodo_version_pendiente
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION periodo_version_aplicar()
+    """,
+)
+
+
+def _ddl_por_sentencia(tablas: dict) -> tuple:
+    """Una función {tabla}_sube_version y un trigger por evento (tablas de transición)."""
+    sentencias = []
+    for tabla, consulta in tablas.items():
+        nuevas, viejas = consulta.format(t='nuevas'), consulta.format(t='viejas')
+        sentencias.append(f"""
+        CREATE OR REPLACE FUNCTION {tabla}_sube_version() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                PERFORM periodo_version_subir(ARRAY({nuevas}));
+            ELSIF TG_OP = 'DELETE' THEN
+                PERFORM periodo_version_subir(ARRAY({viejas}));
+            ELSE
+                PERFORM periodo_version_subir(ARRAY({nuevas} UNION {viejas}));
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """)
+        # Postgres no deja tablas de transición en triggers de varios eventos: uno por evento
+        for evento, referencias in (
+            ('INSERT', 'NEW TABLE AS nuevas'),
+            ('UPDATE', 'NEW TABLE AS nuevas OLD TABLE AS viejas'),
+            ('DELETE', 'OLD TABLE AS viejas'),
+        ):
+            sentencias.append(f"""
+            CREATE TRIGGER trg_{tabla}_version_{evento.lower()}
+            AFTER {evento} ON {tabla} REFERENCING {referencias}
+            FOR EACH STATEMENT EXECUTE FUNCTION {tabla}_sube_version()
+            """)
+    return tuple(sentencias)
+
+
+DDL_VERSION = _ddl_por_sentencia(PERIODO_DESDE)
+DDL_VERSION_CATALOGOS = _ddl_por_sentencia(CATALOGOS)
+
+registrar_ddl('periodo_version_pendiente', *DDL_PENDIENTES)
+# horario es la última de las tablas vigiladas en crearse (depende de todas las demás)
+registrar_ddl('horario', *DDL_VERSION, *DDL_VERSION_CATALOGOS)
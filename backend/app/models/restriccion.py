@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from app.models.base import Base, BaseMixin
 
@@ -17,4 +17,9 @@ class Restriccion(Base, BaseMixin):
     peso = Column(Integer, default=100) # 100 = Hard (Error), <100 = Soft (Warning)
     estado = Column(Integer, default=1)
 
-    id_periodo = Column(Integer, ForeignKey('periodo_academico.id'), nullable=True)
\ No newline at end of file
+    id_periodo = Column(Integer, ForeignKey('periodo_academico.id'), nullable=True)
+
+    __table_args__ = (
+        # Búsqueda de reglas de una entidad: (DOCENTE, 5, DISPONIBILIDAD, activas)
+        Index('ix_restriccion_entidad', 'entidad_referencia', 'id_entidad', 'tipo', 'estado'),
+    )
@@ -8,7 +8,7 @@ class Sesion(Base, BaseMixin):
     
     tipo_sesion = Column(String(20)) 
     duracion_horas = Column(Integer)
-    id_grupo = Column(Integer, ForeignKey('grupo.id'), nullable=False)
+    id_grupo = Column(Integer, ForeignKey('grupo.id'), nullable=False, index=True)
     
     # Relaciones
     grupo = relationship("Grupo", back_populates="sesiones")
@@ -0,0 +1,22 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel
+
+
+class ExportacionCreate(BaseModel):
+    tipo: str  # horario_general | horarios_zip | horario_grupo
+    id_periodo: int
+    filtros: Dict[str, Any] = {}  # horarios_zip: {"tipo": "docente"}; horario_grupo: {"id_grupo": 5}
+
+
+class ExportacionResponse(BaseModel):
+    id: str
+    tipo: str
+    id_periodo: int
+    filtros: Dict[str, Any]
+    estado: str  # en_proceso | listo | error
+    error: Optional[str] = None
+    # Solo cuando está listo: enlace de descarga con token corto
+    descarga: Optional[str] = None
+    expira: Optional[datetime] = None
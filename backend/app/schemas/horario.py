@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel
 
 from app.schemas.sesion_completa import SesionFullResponse 
@@ -31,3 +31,27 @@ class HorarioResponse(HorarioBase):
     class Config:
         from_attributes = True
         
+
+
+# --- EDICIÓN EN LOTE (mover / intercambiar varias sesiones en un solo commit) ---
+class MovimientoSesion(BaseModel):
+    id_sesion: int
+    id_bloque: int              # Bloque donde EMPIEZA la sesión en su nueva posición
+    id_aula: Optional[int] = None
+
+class IntercambioSesiones(BaseModel):
+    id_sesion_a: int            # A pasa a la posición (y aula) de B, y B a la de A
+    id_sesion_b: int
+
+class LoteMovimientos(BaseModel):
+    id_periodo: int
+    movimientos: List[MovimientoSesion] = []
+    intercambios: List[IntercambioSesiones] = []
+
+
+# --- SINCRONIZACIÓN POR DELTAS ---
+class CambiosHorarioResponse(BaseModel):
+    modo: str                   # 'delta' o 'completo' (reemplazar toda la grilla)
+    seq: int                    # Enviar como ?desde= en la próxima consulta
+    actualizados: List[HorarioResponse] = []
+    eliminados: List[int] = []  # ids de horario que ya no están en la grilla
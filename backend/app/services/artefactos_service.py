@@ -0,0 +1,194 @@
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import traceback
+from pathlib import Path
+from typing import IO, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services import exportacion_service
+from app.services.version_service import version_periodo
+
+# Exportaciones ya generadas, en disco:
+#   RAIZ/{tipo}-{id_periodo}-{huella de filtros}/v{version}/{nombre de descarga}
+# La versión es la de periodo_version (la suben los triggers de horario, sesion, grupo
+# y curso_aperturado): si el periodo no cambió, el archivo de esa versión sigue sirviendo.
+RAIZ = Path(settings.EXPORT_CACHE_DIR)
+
+# tipo -> (generar(db, id_periodo, filtros) -> (archivo abierto, nombre), media_type)
+Generador = Callable[[AsyncSession, int, dict], Awaitable[Tuple[IO[bytes], str]]]
+_tipos: Dict[str, Tuple[Generador, str]] = {}
+# tipo -> validar(filtros) -> filtros normalizados (HTTPException 400 si no sirven)
+Validador = Callable[[dict], dict]
+_validadores: Dict[str, Validador] = {}
+
+# Generaciones en curso en este worker: N descargas simultáneas esperan la misma
+_en_curso: Dict[tuple, asyncio.Future] = {}
+_tareas = set()
+
+
+def registrar(tipo: str, generar: Generador, media_type: str = exportacion_service.MEDIA_XLSX,
+              validar: Optional[Validador] = None) -> None:
+    _tipos[tipo] = (generar, media_type)
+    if validar is not None:
+        _validadores[tipo] = validar
+
+
+def tipos() -> list:
+    return sorted(_tipos)
+
+
+def normalizar(tipo: str, filtros: Optional[dict] = None) -> dict:
+    """
+    Filtros tal como se guardan (y se usan en la huella): los mismos filtros escritos
+    de otra forma ("5" o 5, claves de más) caen en el mismo artefacto.
+    """
+    if tipo not in _tipos:
+        raise HTTPException(400, f"Tipo de exportación inválido. Use: {', '.join(tipos())}")
+    validar = _validadores.get(tipo)
+    return validar(filtros or {}) if validar else {}
+
+
+def _huella(filtros: dict) -> str:
+    return hashlib.sha1(json.dumps(filtros, sort_keys=True, default=str).encode()).hexdigest()[:12]
+
+
+def _carpeta(tipo: str, id_periodo: int, filtros: dict) -> Path:
+    return RAIZ / f"{tipo}-{id_periodo}-{_huella(filtros)}"
+
+
+def _buscar(carpeta: Path, version: int) -> Optional[Path]:
+    try:
+        return next((carpeta / f"v{version}").iterdir(), None)
+    except FileNotFoundError:
+        return None
+
+
+def _guardar(carpeta: Path, version: int, archivo: IO[bytes], nombre: str, meta: dict) -> Path:
+    """
+    Copia el archivo generado a v{version}/ con un rename atómico: quien lee nunca ve
+    un archivo a medias, y si otro worker llegó primero se descarta esta copia.
+    Deja la versión anterior (una descarga o un enlace de trabajo recién resuelto
+    puede estar usándola) y borra las de antes.
+    """
+    carpeta.mkdir(parents=True, exist_ok=True)
+    (carpeta / "meta.json").write_text(json.dumps(meta, default=str))
+    tmp = Path(tempfile.mkdtemp(dir=carpeta, prefix=".tmp-"))
+    try:
+        with archivo, open(tmp / nombre, "wb") as f:
+            shutil.copyfileobj(archivo, f)
+        try:
+            os.rename(tmp, carpeta / f"v{version}")
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+    except Exception:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+    versiones = sorted((int(v.name[1:]) for v in carpeta.glob("v*") if v.name[1:].isdigit()), reverse=True)
+    for vieja in versiones[2:]:
+        if vieja < version:
+            shutil.rmtree(carpeta / f"v{vieja}", ignore_errors=True)
+    return _buscar(carpeta, version)
+
+
+async def _generar(tipo: str, id_periodo: int, filtros: dict, version: int) -> Path:
+    # Sesión propia: la generación es compartida y no debe morir si se cancela el request que la pidió
+    generar, _ = _tipos[tipo]
+    async with SessionLocal() as db:
+        archivo, nombre = await generar(db, id_periodo, filtros)
+    meta = {"tipo": tipo, "id_periodo": id_periodo, "filtros": filtros}
+    return await run_in_threadpool(_guardar, _carpeta(tipo, id_periodo, filtros), version, archivo, nombre, meta)
+
+
+async def obtener(db: AsyncSession, tipo: str, id_periodo: int, filtros: Optional[dict] = None) -> Path:
+    """
+    Ruta del artefacto para la versión actual del periodo.
+    Acierto = cero regeneración (solo la lectura de la versión). Si falta, se genera
+    una sola vez aunque lleguen varias descargas a la vez.
+    """
+    filtros = filtros or {}
+    version = await version_periodo(db, id_periodo)
+    ruta = _buscar(_carpeta(tipo, id_periodo, filtros), version)
+    if ruta is not None:
+        return ruta
+
+    clave = (tipo, id_periodo, _huella(filtros), version)
+    tarea = _en_curso.get(clave)
+    if tarea is None:
+        tarea = asyncio.ensure_future(_generar(tipo, id_periodo, filtros, version))
+        _en_curso[clave] = tarea
+        tarea.add_done_callback(lambda _: _en_curso.pop(clave, None))
+    return await asyncio.shield(tarea)
+
+
+def respuesta(tipo: str, ruta: Path) -> FileResponse:
+    """Envía el artefacto desde disco (en trozos, con ETag/Last-Modified del archivo)."""
+    return FileResponse(ruta, media_type=_tipos[tipo][1], filename=ruta.name)
+
+
+async def _regenerar(id_periodo: int) -> None:
+    async with SessionLocal() as db:
+        for meta in RAIZ.glob("*/meta.json"):
+            try:
+                datos = json.loads(meta.read_text())
+                if datos["id_periodo"] != id_periodo or datos["tipo"] not in _tipos:
+                    continue
+                await obtener(db, datos["tipo"], id_periodo, datos["filtros"])
+            except Exception:
+                traceback.print_exc()
+
+
+def regenerar_en_segundo_plano(id_periodo: int) -> None:
+    """
+    Llamar después del commit de una escritura masiva (autogenerar, importación):
+    vuelve a generar, sin bloquear la respuesta, los artefactos que ya se habían
+    pedido para ese periodo, para que la próxima descarga sea un acierto.
+    """
+    tarea = asyncio.create_task(_regenerar(id_periodo))
+    _tareas.add(tarea)
+    tarea.add_done_callback(_tareas.discard)
+
+
+async def _horario_general(db: AsyncSession, id_periodo: int, filtros: dict):
+    return await exportacion_service.exportar_horario_general(db, id_periodo)
+
+
+registrar("horario_general", _horario_general)
+
+
+def _filtros_zip(filtros: dict) -> dict:
+    tipo = filtros.get("tipo", "docente")
+    if tipo not in exportacion_service.ENTIDADES:
+        raise HTTPException(400, f"Tipo inválido. Use: {', '.join(exportacion_service.ENTIDADES)}")
+    return {"tipo": tipo}
+
+
+async def _horarios_zip(db: AsyncSession, id_periodo: int, filtros: dict):
+    return await exportacion_service.exportar_zip(db, id_periodo, filtros["tipo"])
+
+
+registrar("horarios_zip", _horarios_zip, "application/zip", validar=_filtros_zip)
+
+
+def _filtros_grupo(filtros: dict) -> dict:
+    try:
+        return {"id_grupo": int(filtros["id_grupo"])}
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(400, "Falta el filtro id_grupo (entero)")
+
+
+async def _horario_grupo(db: AsyncSession, id_periodo: int, filtros: dict):
+    return await exportacion_service.exportar_horario_entidad(db, id_periodo, "grupo", filtros["id_grupo"])
+
+
+registrar("horario_grupo", _horario_grupo, validar=_filtros_grupo)
@@ -0,0 +1,71 @@
+from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, literal
+
+from app.models.horario import Horario
+from app.models.sesion import Sesion
+from app.models.grupo import Grupo
+from app.models.bloque_horario import BloqueHorario
+from app.core.cache import CacheTTL
+from app.services.version_service import version_periodo
+
+# Reportes ya calculados: {(id_periodo, version): [cruces]}
+_cache_auditoria = CacheTTL(max_items=32, ttl=600)
+
+
+async def buscar_cruces_periodo(db: AsyncSession, id_periodo: int) -> List[dict]:
+    """
+    Todos los cruces (docente, grupo, aula) que YA existen en el periodo.
+    Una consulta GROUP BY ... HAVING por tipo; se usa sesion -> grupo (la fuente real)
+    y no las copias de horario, para detectar también filas viejas o importadas.
+    """
+    sesiones = func.array_agg(Horario.id_sesion.distinct())
+    tipos = {
+        "DOCENTE": Grupo.id_docente,
+        "GRUPO": Grupo.id,
+        "AULA": Horario.id_aula,
+    }
+
+    cruces = []
+    for tipo, entidad in tipos.items():
+        stmt = (
+            select(
+                literal(tipo), entidad, Horario.id_bloque,
+                BloqueHorario.dia_semana, BloqueHorario.orden, sesiones
+            )
+            .select_from(Horario)
+            .join(Sesion, Sesion.id == Horario.id_sesion)
+            .join(Grupo, Grupo.id == Sesion.id_grupo)
+            .join(BloqueHorario, BloqueHorario.id == Horario.id_bloque)
+            .where(Horario.id_periodo == id_periodo, Horario.estado == 1, entidad.is_not(None))
+            .group_by(entidad, Horario.id_bloque, BloqueHorario.dia_semana, BloqueHorario.orden)
+            .having(func.count(Horario.id_sesion.distinct()) > 1)
+            .order_by(entidad, BloqueHorario.dia_semana, BloqueHorario.orden)
+        )
+        for tipo_cruce, id_entidad, id_bloque, dia, orden, ids_sesion in (await db.execute(stmt)).all():
+            cruces.append({
+                "tipo": tipo_cruce,
+                "id_entidad": id_entidad,
+                "id_bloque": id_bloque,
+                "dia": dia,
+                "orden": orden,
+                "sesiones": sorted(ids_sesion),
+            })
+    return cruces
+
+
+async def auditar_periodo(db: AsyncSession, id_periodo: int, usar_cache: bool = True) -> dict:
+    """
+    Reporte de cruces del periodo. Se guarda en caché por versión del periodo:
+    mientras nadie escriba en el periodo, se devuelve el mismo reporte sin consultar.
+    """
+    version = await version_periodo(db, id_periodo)
+    clave = (id_periodo, version)
+
+    cruces = _cache_auditoria.get(clave) if usar_cache else None
+    desde_cache = cruces is not None
+    if cruces is None:
+        cruces = await buscar_cruces_periodo(db, id_periodo)
+        _cache_auditoria.set(clave, cruces)
+
+    return {"id_periodo": id_periodo, "version": version, "desde_cache": desde_cache, "cruces": cruces}
@@ -0,0 +1,215 @@
+import hashlib
+from datetime import datetime, time, timedelta, timezone
+from typing import List, Tuple
+from zoneinfo import ZoneInfo
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import CacheTTL
+from app.core.config import settings
+from app.models.aula import Aula
+from app.models.bloque_horario import BloqueHorario
+from app.models.curso import Curso
+from app.models.curso_aperturado import CursoAperturado
+from app.models.docente import Docente
+from app.models.grupo import Grupo
+from app.models.horario import Horario
+from app.models.periodo_academico import PeriodoAcademico
+from app.models.sesion import Sesion
+from app.services.version_service import version_periodo
+
+MEDIA_ICS = "text/calendar; charset=utf-8"
+
+# Feeds ya armados: {(tipo, id, id_periodo): (version del periodo, etag, cuerpo)}
+# Los calendarios consultan cada hora: si la versión del periodo no cambió se responde
+# desde aquí (o 304) con una sola lectura por PK. El TTL solo cubre cambios del propio
+# periodo_academico (fechas), que no suben la versión.
+_feeds = CacheTTL(max_items=4096, ttl=3600)
+
+_DIAS = {
+    "lunes": 0, "martes": 1, "miércoles": 2, "miercoles": 2, "jueves": 3,
+    "viernes": 4, "sábado": 5, "sabado": 5, "domingo": 6,
+}
+
+
+# =====================================================================
+#  1. DATOS
+# =====================================================================
+
+async def _filas(db: AsyncSession, tipo: str, id_entidad: int, id_periodo: int) -> List[tuple]:
+    """Casillas de la entidad en el periodo, ordenadas para unir bloques seguidos."""
+    stmt = (
+        select(Sesion.id, Sesion.tipo_sesion, Curso.nombre, Curso.ciclo, Grupo.nombre,
+               Docente.apellido, Docente.nombre, Aula.nombre,
+               BloqueHorario.dia_semana, BloqueHorario.hora_inicio, BloqueHorario.hora_fin)
+        .select_from(Horario)
+        .join(Sesion, Horario.id_sesion == Sesion.id)
+        .join(Grupo, Sesion.id_grupo == Grupo.id)
+        .join(CursoAperturado, Grupo.id_curso_aperturado == CursoAperturado.id)
+        .join(Curso, CursoAperturado.id_curso == Curso.id)
+        .join(BloqueHorario, Horario.id_bloque == BloqueHorario.id)
+        .outerjoin(Docente, Grupo.id_docente == Docente.id)
+        .outerjoin(Aula, Horario.id_aula == Aula.id)
+        .where(Horario.id_periodo == id_periodo, Horario.estado == 1)
+        .order_by(Sesion.id, BloqueHorario.dia_semana, BloqueHorario.hora_inicio)
+    )
+    if tipo == "docente":
+        stmt = stmt.where(Grupo.id_docente == id_entidad)
+    else:
+        stmt = stmt.where(Sesion.id_grupo == id_entidad)
+    return [tuple(f) for f in (await db.execute(stmt)).all()]
+
+
+async def _nombre_entidad(db: AsyncSession, tipo: str, id_entidad: int) -> str:
+    if tipo == "docente":
+        docente = await db.get(Docente, id_entidad)
+        if not docente:
+            raise HTTPException(status_code=404, detail="Docente no encontrado")
+        return f"{docente.apellido} {docente.nombre}"
+    stmt = (
+        select(Grupo.nombre, Curso.nombre)
+        .join(CursoAperturado, Grupo.id_curso_aperturado == CursoAperturado.id)
+        .join(Curso, CursoAperturado.id_curso == Curso.id)
+        .where(Grupo.id == id_entidad)
+    )
+    grupo = (await db.execute(stmt)).first()
+    if not grupo:
+        raise HTTPException(status_code=404, detail="Grupo no encontrado")
+    return f"{grupo[1]} - GRUPO {grupo[0]}"
+
+
+# =====================================================================
+#  2. RENDER (RFC 5545)
+# =====================================================================
+
+def _texto(valor) -> str:
+    return (str(valor or "").replace("\\", "\\\\").replace(";", "\\;")
+            .replace(",", "\\,").replace("\n", "\\n"))
+
+
+def _plegar(linea: str) -> str:
+    """Líneas de máximo 75 octetos; la continuación empieza con un espacio."""
+    datos = linea.encode("utf-8")
+    if len(datos) <= 75:
+        return linea
+    partes, inicio, limite = [], 0, 75
+    while inicio < len(datos):
+        fin = min(inicio + limite, len(datos))
+        while fin < len(datos) and (datos[fin] & 0xC0) == 0x80:  # no cortar un carácter UTF-8
+            fin -= 1
+        partes.append(datos[inicio:fin].decode("utf-8"))
+        inicio, limite = fin, 74
+    return "\r\n ".join(partes)
+
+
+def _unir_bloques(filas: List[tuple]) -> List[tuple]:
+    """Bloques seguidos de la misma sesión el mismo día -> un solo evento (clase de 2+ horas)."""
+    eventos = []
+    for f in filas:
+        ultimo = eventos[-1] if eventos else None
+        if ultimo and ultimo[0] == f[0] and ultimo[8] == f[8] and ultimo[10] == f[9]:
+            eventos[-1] = ultimo[:10] + (f[10],)
+        else:
+            eventos.append(f)
+    return eventos
+
+
+def _vtimezone(zona: ZoneInfo, referencia: datetime) -> List[str]:
+    # Desplazamiento fijo tomado al inicio del periodo (zonas sin horario de verano, como Lima)
+    desfase = zona.utcoffset(referencia)
+    minutos = int(desfase.total_seconds() // 60)
+    signo = "+" if minutos >= 0 else "-"
+    offset = f"{signo}{abs(minutos) // 60:02d}{abs(minutos) % 60:02d}"
+    return [
+        "BEGIN:VTIMEZONE", f"TZID:{zona.key}",
+        "BEGIN:STANDARD", "DTSTART:19700101T000000",
+        f"TZOFFSETFROM:{offset}", f"TZOFFSETTO:{offset}", f"TZNAME:{zona.tzname(referencia)}",
+        "END:STANDARD", "END:VTIMEZONE",
+    ]
+
+
+def renderizar(nombre: str, periodo: PeriodoAcademico, tipo: str, filas: List[tuple]) -> bytes:
+    """
+    Una serie semanal por clase: desde la primera fecha del periodo que cae en ese día,
+    con RRULE semanal hasta fecha_fin.
+    """
+    zona = ZoneInfo(settings.ZONA_HORARIA)
+    inicio, fin = periodo.fecha_inicio, periodo.fecha_fin
+    hasta = datetime.combine(fin, time(23, 59, 59), zona).astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    ahora = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+    lineas = [
+        "BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//UNU//Sistema Horarios//ES",
+        "CALSCALE:GREGORIAN", "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_texto(f'Horario {periodo.nombre} - {nombre}')}",
+        f"X-WR-TIMEZONE:{zona.key}",
+    ] + _vtimezone(zona, datetime.combine(inicio, time(12), zona))
+
+    for (id_sesion, tipo_sesion, curso, ciclo, grupo, doc_apellido, doc_nombre,
+         aula, dia, hora_inicio, hora_fin) in _unir_bloques(filas):
+        dia_num = _DIAS.get((dia or "").strip().lower())
+        if dia_num is None:
+            continue
+        primera = inicio + timedelta(days=(dia_num - inicio.weekday()) % 7)
+        if primera > fin:
+            continue
+        docente = f"{doc_apellido} {doc_nombre}" if doc_apellido else "Sin Docente"
+        resumen = f"{curso} ({tipo_sesion})" if tipo == "grupo" else f"{curso} - GRUPO {grupo} ({tipo_sesion})"
+        descripcion = f"Docente: {docente}\nGrupo: {grupo} - Ciclo {ciclo}"
+        lineas += [
+            "BEGIN:VEVENT",
+            f"UID:sesion-{id_sesion}-{dia_num}-{hora_inicio.strftime('%H%M')}@sistema-horarios",
+            f"DTSTAMP:{ahora}",
+            f"DTSTART;TZID={zona.key}:{primera.strftime('%Y%m%d')}T{hora_inicio.strftime('%H%M%S')}",
+            f"DTEND;TZID={zona.key}:{primera.strftime('%Y%m%d')}T{hora_fin.strftime('%H%M%S')}",
+            f"RRULE:FREQ=WEEKLY;UNTIL={hasta}",
+            f"SUMMARY:{_texto(resumen)}",
+            f"DESCRIPTION:{_texto(descripcion)}",
+        ]
+        if aula:
+            lineas.append(f"LOCATION:{_texto(aula)}")
+        lineas.append("END:VEVENT")
+
+    lineas.append("END:VCALENDAR")
+    return ("\r\n".join(_plegar(l) for l in lineas) + "\r\n").encode("utf-8")
+
+
+# =====================================================================
+#  3. FEED CON CACHÉ INCREMENTAL
+# =====================================================================
+
+async def feed(db: AsyncSession, tipo: str, id_entidad: int, id_periodo: int) -> Tuple[str, bytes]:
+    """
+    (etag, cuerpo) del feed de un docente o grupo.
+    - Versión del periodo igual a la del caché -> se responde del caché (1 lectura por PK).
+    - Versión distinta -> se leen solo las casillas de ESTA entidad; el ETag es la huella de
+      esas filas, así que si el cambio fue de otro docente/grupo el ETag no se mueve
+      (los clientes siguen recibiendo 304) y no se vuelve a renderizar.
+    """
+    clave = (tipo, id_entidad, id_periodo)
+    version = await version_periodo(db, id_periodo)
+    entrada = _feeds.get(clave)
+    if entrada is not None and entrada[0] == version:
+        return entrada[1], entrada[2]
+
+    periodo = await db.get(PeriodoAcademico, id_periodo)
+    if not periodo:
+        raise HTTPException(status_code=404, detail="Periodo no encontrado")
+    if not periodo.fecha_inicio or not periodo.fecha_fin:
+        raise HTTPException(status_code=409, detail="El periodo no tiene fecha de inicio y fin")
+    nombre = await _nombre_entidad(db, tipo, id_entidad)
+    filas = await _filas(db, tipo, id_entidad, id_periodo)
+
+    huella = hashlib.sha1(repr((
+        nombre, periodo.nombre, periodo.fecha_inicio, periodo.fecha_fin, settings.ZONA_HORARIA, filas
+    )).encode()).hexdigest()[:16]
+    # Se envía como débil (W/): el contenido equivale, pero DTSTAMP depende de cuándo se renderizó
+    etag = f'"ics-{tipo}-{id_entidad}-{huella}"'
+    if entrada is not None and entrada[1] == etag:
+        cuerpo = entrada[2]
+    else:
+        cuerpo = renderizar(nombre, periodo, tipo, filas)
+    _feeds.set(clave, (version, etag, cuerpo))
+    return etag, cuerpo
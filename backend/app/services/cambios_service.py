@@ -0,0 +1,88 @@
+from typing import List, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, func, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.models.horario_cambio import HorarioCambio
+from app.models.periodo_version import PeriodoVersion
+from app.crud.crud_horario import horario as crud_horario
+
+
+async def cambios_desde(
+    db: AsyncSession, id_periodo: int, desde: int, cero_es_completo: bool = True
+) -> Tuple[str, int, List[int]]:
+    """
+    Qué casillas del periodo cambiaron después de `desde` (un seq que el cliente ya tiene).
+    Retorna (modo, seq_actual, ids_horario):
+      - 'delta': ids de las casillas tocadas (insertadas, movidas o borradas).
+      - 'completo': el cliente está muy atrás (bitácora compactada) o es su primera carga;
+        hay que mandarle el periodo entero.
+    cero_es_completo=False: `desde`=0 es un seq real (bitácora vacía cuando se tomó), no una primera carga.
+    """
+    compactado = (await db.execute(
+        select(PeriodoVersion.seq_compactado).where(PeriodoVersion.id_periodo == id_periodo)
+    )).scalar() or 0
+
+    hasta = (await db.execute(
+        select(func.max(HorarioCambio.seq)).where(HorarioCambio.id_periodo == id_periodo)
+    )).scalar() or compactado
+
+    if (desde <= 0 and cero_es_completo) or desde < compactado or desde > hasta:
+        return "completo", hasta, []
+
+    stmt = (
+        select(HorarioCambio.id_horario)
+        .distinct()
+        .where(
+            HorarioCambio.id_periodo == id_periodo,
+            HorarioCambio.seq > desde,
+            HorarioCambio.seq <= hasta
+        )
+    )
+    ids = (await db.execute(stmt)).scalars().all()
+    return "delta", hasta, list(ids)
+
+
+async def armar_cambios(db: AsyncSession, id_periodo: int, desde: int, cero_es_completo: bool = True) -> dict:
+    """
+    Respuesta de sincronización (formato CambiosHorarioResponse): las casillas tocadas
+    desde `desde` que siguen en la grilla van en 'actualizados', el resto en 'eliminados'.
+    """
+    modo, seq, ids = await cambios_desde(db, id_periodo, desde, cero_es_completo)
+
+    if modo == "completo":
+        actualizados = await crud_horario.get_horario_periodo(db, id_periodo)
+        return {"modo": modo, "seq": seq, "actualizados": actualizados, "eliminados": []}
+
+    actualizados = await crud_horario.get_horario_periodo(db, id_periodo, ids) if ids else []
+    vivos = {h.id for h in actualizados}
+    eliminados = [i for i in ids if i not in vivos]
+    return {"modo": modo, "seq": seq, "actualizados": actualizados, "eliminados": eliminados}
+
+
+async def compactar_cambios(db: AsyncSession, id_periodo: int, conservar_horas: int = 24) -> int:
+    """
+    Borra de la bitácora lo más viejo que `conservar_horas` y recuerda hasta dónde se borró.
+    Los clientes con un seq anterior recibirán el periodo completo. Retorna filas borradas.
+    """
+    corte = (await db.execute(
+        select(func.max(HorarioCambio.seq)).where(
+            HorarioCambio.id_periodo == id_periodo,
+            HorarioCambio.fecha < func.now() - text(f"interval '{int(conservar_horas)} hours'")
+        )
+    )).scalar()
+    if corte is None:
+        return 0
+
+    resultado = await db.execute(
+        delete(HorarioCambio).where(HorarioCambio.id_periodo == id_periodo, HorarioCambio.seq <= corte)
+    )
+
+    stmt = pg_insert(PeriodoVersion).values(id_periodo=id_periodo, version=0, seq_compactado=corte)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[PeriodoVersion.id_periodo],
+        set_={"seq_compactado": func.greatest(PeriodoVersion.seq_compactado, stmt.excluded.seq_compactado)}
+    )
+    await db.execute(stmt)
+    await db.commit()
+    return resultado.rowcount
@@ -0,0 +1,72 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from fastapi import HTTPException
+
+from app.models.contrato_docente import ContratoDocente
+from app.models.disponibilidad_docente import DisponibilidadDocente
+
+
+async def asegurar_disponibilidad(db: AsyncSession, id_docente: int, id_periodo: int) -> None:
+    """
+    Crea la fila de disponibilidad (0 horas) si no existe. Si otra transacción la está
+    creando a la vez, espera a que termine y no hace nada: nunca quedan dos filas.
+    """
+    await db.execute(
+        pg_insert(DisponibilidadDocente)
+        .values(id_docente=id_docente, id_periodo=id_periodo, horas_asignadas_actuales=0)
+        .on_conflict_do_nothing(constraint='uq_disponibilidad_docente_periodo')
+    )
+
+
+async def mover_horas_docente(db: AsyncSession, id_docente: int, id_periodo: int, delta: int) -> None:
+    """
+    Suma (delta > 0) o resta (delta < 0) horas a la carga del docente en el periodo,
+    dentro de la MISMA transacción que crea / cambia / borra el grupo.
+
+    La fila de disponibilidad se crea si falta y se bloquea (SELECT ... FOR UPDATE) junto
+    con el tope del contrato en una sola lectura: dos asignaciones simultáneas al mismo
+    docente se esperan una a la otra y no pueden pasarse del tope entre las dos.
+    El commit lo hace el llamador.
+    """
+    if not id_docente or not delta:
+        return
+
+    tope = (
+        select(ContratoDocente.horas_tope_semanales)
+        .where(ContratoDocente.id_docente == id_docente)
+        .limit(1)
+        .scalar_subquery()
+    )
+    await asegurar_disponibilidad(db, id_docente, id_periodo)
+    stmt = (
+        select(DisponibilidadDocente.id, DisponibilidadDocente.horas_asignadas_actuales, tope)
+        .where(
+            DisponibilidadDocente.id_docente == id_docente,
+            DisponibilidadDocente.id_periodo == id_periodo
+        )
+        .with_for_update(of=DisponibilidadDocente)
+    )
+    id_disp, horas_actuales, tope_maximo = (await db.execute(stmt)).one()
+    horas_actuales = horas_actuales or 0
+
+    # Solo se valida al SUMAR: liberar horas siempre está permitido
+    if delta > 0:
+        if tope_maximo is None:
+            # Si no tiene contrato, ¡No debería poder tener grupos!
+            raise HTTPException(400, "El docente seleccionado NO TIENE CONTRATO vigente.")
+
+        nueva_carga = horas_actuales + delta
+        if nueva_carga > tope_maximo:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Límite excedido: El docente tiene {horas_actuales} hrs asignadas. Con estas +{delta} llegaría a {nueva_carga}, superando su contrato de {tope_maximo} hrs."
+            )
+
+    # UPDATE relativo: nunca se pisa lo que otra transacción ya sumó
+    await db.execute(
+        update(DisponibilidadDocente)
+        .where(DisponibilidadDocente.id == id_disp)
+        .values(horas_asignadas_actuales=func.greatest(func.coalesce(DisponibilidadDocente.horas_asignadas_actuales, 0) + delta, 0))
+        .execution_options(synchronize_session=False)
+    )
@@ -0,0 +1,86 @@
+from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
+
+from app.models.horario import Horario
+from app.models.sesion import Sesion
+from app.crud.crud_sesion import sesion as crud_sesion
+
+# Índices únicos parciales de app/models/horario.py -> tipo de cruce
+RESTRICCIONES_CRUCE = {
+    "uq_horario_grupo_bloque": "GRUPO",
+    "uq_horario_docente_bloque": "DOCENTE",
+    "uq_horario_aula_bloque": "AULA",
+}
+
+
+def tipo_cruce(error: IntegrityError) -> Optional[str]:
+    """
+    Devuelve 'GRUPO', 'DOCENTE' o 'AULA' si el IntegrityError viene de un índice de cruces.
+    Para cualquier otra violación (FK, NOT NULL, casilla...) devuelve None.
+    """
+    # asyncpg deja el nombre exacto en la excepción original
+    nombre = getattr(getattr(error.orig, "__cause__", None), "constraint_name", None)
+    if nombre in RESTRICCIONES_CRUCE:
+        return RESTRICCIONES_CRUCE[nombre]
+
+    # Respaldo: buscar el nombre en el texto del error
+    texto = str(error.orig)
+    for restriccion, tipo in RESTRICCIONES_CRUCE.items():
+        if restriccion in texto:
+            return tipo
+    return None
+
+
+async def describir_cruce(
+    db: AsyncSession,
+    error: IntegrityError,
+    id_sesion: int,
+    id_periodo: int,
+    ids_bloque: List[int],
+    id_aula: Optional[int] = None
+) -> Optional[str]:
+    """
+    Traduce la violación de un índice de cruce al mismo mensaje que daban los validadores.
+    Retorna None si el error no es un cruce (el llamador debe relanzarlo).
+    Llamar DESPUÉS del rollback: la fila con la que chocamos ya está confirmada en la BD.
+    """
+    tipo = tipo_cruce(error)
+    if tipo is None:
+        return None
+
+    sesion_actual = await crud_sesion.get_con_detalles(db, id_sesion)
+    grupo = sesion_actual.grupo
+
+    condicion = {
+        "GRUPO": Horario.id_grupo == grupo.id,
+        "DOCENTE": Horario.id_docente == grupo.id_docente,
+        "AULA": Horario.id_aula == id_aula,
+    }[tipo]
+
+    stmt = (
+        select(Horario)
+        .where(
+            Horario.id_periodo == id_periodo,
+            Horario.id_bloque.in_(ids_bloque),
+            Horario.estado == 1,
+            Horario.id_sesion != id_sesion,
+            condicion
+        )
+        .options(joinedload(Horario.sesion).joinedload(Sesion.grupo))
+        .limit(1)
+    )
+    choque = (await db.execute(stmt)).scalars().first()
+
+    if tipo == "GRUPO":
+        tipo_sesion = choque.sesion.tipo_sesion if choque else "otra sesión"
+        return f"El Grupo '{grupo.nombre}' ya tiene clase ({tipo_sesion})."
+
+    if tipo == "DOCENTE":
+        nombre_docente = grupo.docente.nombre if grupo.docente else "Docente"
+        otro_grupo = choque.sesion.grupo.nombre if choque else "?"
+        return f"El docente {nombre_docente} ya dicta en el grupo '{otro_grupo}'."
+
+    return f"El aula ID {id_aula} ya está ocupada."
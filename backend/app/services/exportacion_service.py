@@ -0,0 +1,596 @@
+import asyncio
+import csv
+import os
+import re
+from copy import copy
+from io import BytesIO, FileIO, RawIOBase, StringIO
+from tempfile import SpooledTemporaryFile, mkstemp
+from zipfile import ZIP_STORED, ZipFile
+from typing import IO, Iterator, List, Optional, Tuple
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.utils import get_column_letter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import procesos
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.aula import Aula
+from app.models.bloque_horario import BloqueHorario
+from app.models.curso import Curso
+from app.models.curso_aperturado import CursoAperturado
+from app.models.docente import Docente
+from app.models.grupo import Grupo
+from app.models.horario import Horario
+from app.models.periodo_academico import PeriodoAcademico
+from app.models.sesion import Sesion
+from app.models.turno import Turno
+
+MEDIA_XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+DIAS_SEMANA = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado"]
+
+# Hasta este tamaño el archivo queda en memoria; más grande pasa solo a disco
+_MAX_EN_MEMORIA = 8 * 1024 * 1024
+_TAM_TROZO = 64 * 1024
+
+TITULOS = [
+    "UNIVERSIDAD NACIONAL DE UCAYALI",
+    "FACULTAD DE CIENCIAS ECONOMICAS ADMINISTRATIVAS Y CONTABLES",
+    "ESCUELA PROFESIONAL DE CIENCIAS ADMINISTRATIVAS",
+]
+
+
+def safe_to_roman(n):
+    if not isinstance(n, int) or n < 1: return "0"
+    mapa = ["", "I", "II", "III", "IV", "V", "VI", "VII", "VIII", "IX", "X"]
+    return mapa[n] if n <= 10 else str(n)
+
+
+# =====================================================================
+#  1. DATOS (consultas planas, sin objetos ORM)
+# =====================================================================
+
+def consulta_bloques_grilla():
+    """Un bloque por 'orden' (las filas de la grilla), igual que el reporte original."""
+    return (
+        select(BloqueHorario.orden, BloqueHorario.hora_inicio, BloqueHorario.hora_fin, BloqueHorario.id_turno)
+        .distinct(BloqueHorario.orden)
+        .order_by(BloqueHorario.orden)
+    )
+
+
+def etiqueta_hora(hora_inicio, hora_fin) -> str:
+    return f"{hora_inicio.strftime('%H:%M')} - {hora_fin.strftime('%H:%M')}"
+
+
+async def datos_horario_general(db: AsyncSession, id_periodo: int) -> dict:
+    """
+    Todo lo que necesita el Excel general, en tuplas simples (se puede pasar a otro
+    hilo o proceso). Tres consultas de columnas, sin joinedload ni DataFrame.
+    """
+    periodo = await db.get(PeriodoAcademico, id_periodo)
+
+    stmt_grupos = (
+        select(Grupo.id, Grupo.nombre, Grupo.id_turno, Curso.ciclo)
+        .join(CursoAperturado, Grupo.id_curso_aperturado == CursoAperturado.id)
+        .join(Curso, CursoAperturado.id_curso == Curso.id)
+        .where(CursoAperturado.id_periodo == id_periodo)
+        .order_by(Curso.ciclo, Grupo.nombre, Grupo.id)
+    )
+    stmt_bloques = consulta_bloques_grilla()
+    stmt_asignaciones = (
+        select(Sesion.id_grupo, BloqueHorario.dia_semana, BloqueHorario.orden,
+               Curso.nombre, Docente.apellido, Aula.nombre)
+        .select_from(Horario)
+        .join(Sesion, Horario.id_sesion == Sesion.id)
+        .join(Grupo, Sesion.id_grupo == Grupo.id)
+        .join(CursoAperturado, Grupo.id_curso_aperturado == CursoAperturado.id)
+        .join(Curso, CursoAperturado.id_curso == Curso.id)
+        .join(BloqueHorario, Horario.id_bloque == BloqueHorario.id)
+        .outerjoin(Docente, Grupo.id_docente == Docente.id)
+        .outerjoin(Aula, Horario.id_aula == Aula.id)
+        .where(Horario.id_periodo == id_periodo, Horario.estado == 1)
+    )
+
+    return {
+        "semestre": periodo.nombre if periodo else "202X",
+        "grupos": [tuple(f) for f in (await db.execute(stmt_grupos)).all()],
+        "bloques": [
+            (orden, etiqueta_hora(hi, hf), id_turno)
+            for orden, hi, hf, id_turno in (await db.execute(stmt_bloques)).all()
+        ],
+        "asignaciones": [tuple(f) for f in (await db.execute(stmt_asignaciones)).all()],
+    }
+
+
+def armar_grilla(datos: dict) -> Tuple[List[Tuple[str, str]], List[Tuple[int, str]], dict]:
+    """
+    Grilla del horario general sin pandas:
+    - columnas: (CICLO, GRUPO) en orden de ciclo y nombre; grupos homónimos del mismo
+      ciclo comparten columna (es la misma sección de alumnos).
+    - filas: (día, bloque) por cada bloque que use algún grupo.
+    - celdas: {(fila, columna): texto}, varios cursos en la misma casilla se unen con ' / '.
+    """
+    contenido = {}
+    for id_grupo, dia, orden, curso, docente, aula in datos["asignaciones"]:
+        aula_txt = f"[{aula}]" if aula else ""
+        contenido[(id_grupo, dia, orden)] = f"{curso}\n{docente or '(VACANTE)'} {aula_txt}"
+
+    bloques = datos["bloques"]
+    columnas, indice_col = [], {}
+    grupos_por_col = []
+    ordenes_usados = set()
+    for id_grupo, nombre, id_turno, ciclo in datos["grupos"]:
+        clave = (f"CICLO {safe_to_roman(ciclo)}", f"GRUPO {nombre}")
+        if clave not in indice_col:
+            indice_col[clave] = len(columnas)
+            columnas.append(clave)
+            grupos_por_col.append([])
+        mis_ordenes = [b[0] for b in bloques if b[2] == id_turno] or [b[0] for b in bloques]
+        ordenes_usados.update(mis_ordenes)
+        grupos_por_col[indice_col[clave]].append((id_grupo, set(mis_ordenes)))
+
+    horas = [(orden, hora) for orden, hora, _ in bloques if orden in ordenes_usados]
+    celdas = {}
+    for c, grupos in enumerate(grupos_por_col):
+        for d, dia in enumerate(DIAS_SEMANA):
+            for h, (orden, _) in enumerate(horas):
+                textos = [contenido.get((g, dia, orden), "") for g, ordenes in grupos if orden in ordenes]
+                texto = " / ".join(t for t in textos if t)
+                if texto:
+                    celdas[(d * len(horas) + h, c)] = texto
+    return columnas, horas, celdas
+
+
+# =====================================================================
+#  2. ESCRITURA (openpyxl write-only: memoria constante)
+# =====================================================================
+
+def _estilos(wb: Workbook) -> None:
+    """Estilos con nombre: se guardan una vez en el libro, cada celda solo lo referencia."""
+    thin = Side(style="thin", color="000000")
+    borde = Border(left=thin, right=thin, top=thin, bottom=thin)
+    centro = Alignment(wrap_text=True, vertical="center", horizontal="center")
+    wb.add_named_style(NamedStyle(
+        "titulo", font=Font(name="Arial", size=12, bold=True),
+        alignment=Alignment(horizontal="center", vertical="center")))
+    wb.add_named_style(NamedStyle(
+        "cab_ciclo", font=Font(color="FFFFFF", bold=True), fill=PatternFill("solid", fgColor="366092"),
+        border=borde, alignment=centro))
+    wb.add_named_style(NamedStyle(
+        "cab_grupo", font=Font(color="000000", bold=True), fill=PatternFill("solid", fgColor="B8CCE4"),
+        border=borde, alignment=centro))
+    wb.add_named_style(NamedStyle(
+        "eje", font=Font(color="000000", bold=True), fill=PatternFill("solid", fgColor="F2F2F2"),
+        border=borde, alignment=centro))
+    wb.add_named_style(NamedStyle("celda", border=borde, alignment=centro))
+
+
+def escribir_horario_general(datos: dict, destino: IO[bytes]) -> None:
+    """
+    Escribe el .xlsx en `destino` fila por fila (write-only): openpyxl no guarda
+    las celdas en memoria, así que el costo crece lineal con el tamaño del periodo.
+    Función síncrona y pura: correrla en un hilo (o proceso), nunca en el event loop.
+    """
+    wb = Workbook(write_only=True)
+
+    if not datos["grupos"]:
+        ws = wb.create_sheet("Info")
+        ws.append(["No hay grupos registrados"])
+        wb.save(destino)
+        return
+
+    _estilos(wb)
+    columnas, horas, celdas = armar_grilla(datos)
+    total_cols = len(columnas) + 2
+    ws = wb.create_sheet("Horario General")
+
+    # Anchos antes de la primera fila (en write-only no se pueden cambiar después)
+    ws.column_dimensions["A"].width = 14
+    ws.column_dimensions["B"].width = 15
+    for col in range(3, total_cols + 1):
+        ws.column_dimensions[get_column_letter(col)].width = 25
+
+    # Asignar .style busca el estilo por nombre en cada celda: se resuelve una vez
+    # por estilo y luego solo se copia el índice (lo mismo que hace openpyxl al copiar celdas)
+    indices = {}
+
+    def celda(valor, estilo):
+        c = WriteOnlyCell(ws, value=valor)
+        if estilo not in indices:
+            c.style = estilo
+            indices[estilo] = c._style
+        c._style = copy(indices[estilo])
+        return c
+
+    # Títulos (filas 1-4) + 2 filas en blanco
+    for i, txt in enumerate(TITULOS + [f"SEMESTRE ACADÉMICO {datos['semestre']} - HORARIO GENERAL"], start=1):
+        ws.append([celda(txt, "titulo")])
+        ws.merged_cells.add(f"A{i}:{get_column_letter(total_cols)}{i}")
+    ws.append([])
+    ws.append([])
+
+    # Cabeceras (filas 7-8): ciclo combinado sobre sus grupos, debajo el grupo
+    ws.append([celda("DÍA", "eje"), celda("HORA", "eje")] + [celda(ciclo, "cab_ciclo") for ciclo, _ in columnas])
+    ws.append([celda(None, "eje"), celda(None, "eje")] + [celda(grupo, "cab_grupo") for _, grupo in columnas])
+    ws.merged_cells.add("A7:A8")
+    ws.merged_cells.add("B7:B8")
+    inicio = 0
+    for c in range(1, len(columnas) + 1):
+        if c == len(columnas) or columnas[c][0] != columnas[inicio][0]:
+            if c - inicio > 1:
+                ws.merged_cells.add(f"{get_column_letter(inicio + 3)}7:{get_column_letter(c + 2)}7")
+            inicio = c
+
+    # Datos (desde la fila 9): el día combinado verticalmente sobre sus horas
+    fila = 9
+    for d, dia in enumerate(DIAS_SEMANA):
+        for h, (_, hora) in enumerate(horas):
+            i = d * len(horas) + h
+            ws.append(
+                [celda(dia if h == 0 else None, "eje"), celda(hora, "eje")]
+                + [celda(celdas.get((i, c)), "celda") for c in range(len(columnas))]
+            )
+        if len(horas) > 1:
+            ws.merged_cells.add(f"A{fila}:A{fila + len(horas) - 1}")
+        fila += len(horas)
+
+    wb.save(destino)
+
+
+# =====================================================================
+#  3. ENTREGA
+# =====================================================================
+
+class ArchivoTemporal(FileIO):
+    """Archivo de disco que se borra al cerrarlo (cerrar primero: así también vale en Windows)."""
+
+    def close(self):
+        if self.closed:
+            return
+        super().close()
+        _borrar(self.name)
+
+
+def _borrar(ruta: str) -> None:
+    try:
+        os.unlink(ruta)
+    except OSError:
+        pass
+
+
+def renderizar_horario_general(datos: dict, ruta: str) -> None:
+    """Se corre en el pool de procesos: datos simples -> xlsx en la ruta (no vuelve por el pipe)."""
+    with open(ruta, "wb") as destino:
+        escribir_horario_general(datos, destino)
+
+
+async def exportar_horario_general(db: AsyncSession, id_periodo: int) -> Tuple[IO[bytes], str]:
+    """
+    Genera el Excel general. Devuelve (archivo al inicio, nombre); al cerrarlo se borra.
+    El render (CPU puro) va al pool de procesos: no frena el event loop ni los hilos del worker.
+    El proceso escribe directo a un temporal: el libro no pasa por memoria en ningún lado.
+    """
+    datos = await datos_horario_general(db, id_periodo)
+    fd, ruta = mkstemp(suffix=".xlsx", prefix="horario-")
+    os.close(fd)
+    try:
+        await procesos.en_proceso(renderizar_horario_general, datos, ruta)
+    except BaseException:
+        _borrar(ruta)
+        raise
+    nombre = f"Horario_General_{id_periodo}.xlsx" if datos["grupos"] else "Vacio.xlsx"
+    return ArchivoTemporal(ruta), nombre
+
+
+def _trozos(archivo: IO[bytes]) -> Iterator[bytes]:
+    try:
+        while trozo := archivo.read(_TAM_TROZO):
+            yield trozo
+    finally:
+        archivo.close()
+
+
+def respuesta_archivo(archivo: IO[bytes], nombre: str, media_type: str = MEDIA_XLSX) -> StreamingResponse:
+    """Envía el archivo en trozos de 64 KB y lo cierra (borra) al terminar."""
+    return StreamingResponse(
+        _trozos(archivo),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{nombre}"'}
+    )
+
+
+# =====================================================================
+#  4. EXPORTACIÓN MASIVA: UN LIBRO POR DOCENTE / GRUPO / AULA (ZIP)
+# =====================================================================
+
+ENTIDADES = ("docente", "grupo", "aula")
+
+
+def _nombre_archivo(*partes) -> str:
+    return re.sub(r"[^\w\-]+", "_", "_".join(str(p) for p in partes if p)).strip("_") + ".xlsx"
+
+
+async def datos_por_entidad(db: AsyncSession, id_periodo: int, tipo: str,
+                            id_entidad: Optional[int] = None) -> List[dict]:
+    """
+    Carga el periodo UNA vez (consultas planas) y lo reparte en un payload por
+    docente, grupo o aula: {"archivo", "titulo", "horas", "celdas": {(dia, hora): texto}}.
+    Con id_entidad devuelve solo esa (lista vacía si no está en el periodo).
+    Los payloads son datos simples: se pueden mandar a otro proceso.
+    """
+    stmt_bloques = (
+        select(BloqueHorario.id_turno, BloqueHorario.hora_inicio, BloqueHorario.hora_fin)
+        .where(BloqueHorario.estado == 1)
+        .distinct()
+    )
+    horas_turno = {}
+    for id_turno, hi, hf in (await db.execute(stmt_bloques)).all():
+        horas_turno.setdefault(id_turno, []).append((hi, etiqueta_hora(hi, hf)))
+
+    stmt_grupos = (
+        select(Grupo.id, Grupo.nombre, Grupo.id_turno, Curso.nombre, Curso.ciclo,
+               Grupo.id_docente, Docente.nombre, Docente.apellido)
+        .join(CursoAperturado, Grupo.id_curso_aperturado == CursoAperturado.id)
+        .join(Curso, CursoAperturado.id_curso == Curso.id)
+        .outerjoin(Docente, Grupo.id_docente == Docente.id)
+        .where(CursoAperturado.id_periodo == id_periodo)
+        .order_by(Curso.ciclo, Curso.nombre, Grupo.nombre)
+    )
+
+    stmt_asignaciones = (
+        select(Sesion.id_grupo, Sesion.tipo_sesion, Horario.id_aula, Aula.nombre,
+               BloqueHorario.dia_semana, BloqueHorario.hora_inicio, BloqueHorario.hora_fin, BloqueHorario.id_turno)
+        .select_from(Horario)
+        .join(Sesion, Horario.id_sesion == Sesion.id)
+        .join(BloqueHorario, Horario.id_bloque == BloqueHorario.id)
+        .outerjoin(Aula, Horario.id_aula == Aula.id)
+        .where(Horario.id_periodo == id_periodo, Horario.estado == 1)
+    )
+    if id_entidad is not None:
+        # Una sola entidad: se filtra en la base y no se arma el resto del periodo
+        if tipo == "grupo":
+            stmt_grupos = stmt_grupos.where(Grupo.id == id_entidad)
+            stmt_asignaciones = stmt_asignaciones.where(Sesion.id_grupo == id_entidad)
+        elif tipo == "docente":
+            stmt_grupos = stmt_grupos.where(Grupo.id_docente == id_entidad)
+        else:
+            stmt_asignaciones = stmt_asignaciones.where(Horario.id_aula == id_entidad)
+    grupos = {f[0]: f for f in (await db.execute(stmt_grupos)).all()}
+
+    entidades = {}
+
+    def entidad(clave, archivo, titulo):
+        if clave not in entidades:
+            entidades[clave] = {"archivo": archivo, "titulo": titulo, "turnos": set(), "celdas": {}}
+        return entidades[clave]
+
+    def de_grupo(g):
+        id_g, nombre, id_turno, curso, ciclo, id_doc, doc_nombre, doc_apellido = g
+        if tipo == "grupo":
+            return entidad(id_g, _nombre_archivo("ciclo", ciclo, curso, "grupo", nombre, id_g),
+                           f"HORARIO DE CLASES - {curso} - GRUPO {nombre} (CICLO {safe_to_roman(ciclo)})")
+        if tipo == "docente" and id_doc:
+            return entidad(id_doc, _nombre_archivo(doc_apellido, doc_nombre, id_doc),
+                           f"HORARIO DEL DOCENTE - {doc_apellido} {doc_nombre}")
+        return None
+
+    # Docentes y grupos aparecen aunque todavía no tengan horas asignadas
+    for g in grupos.values():
+        e = de_grupo(g)
+        if e is not None:
+            e["turnos"].add(g[2])
+
+    for id_grupo, tipo_sesion, id_aula, aula, dia, hi, hf, id_turno in (await db.execute(stmt_asignaciones)).all():
+        g = grupos.get(id_grupo)
+        if g is None:
+            continue
+        _, nombre, _, curso, _, _, doc_nombre, doc_apellido = g
+        docente = f"{doc_apellido} {doc_nombre}" if doc_apellido else "Sin Docente"
+        if tipo == "grupo":
+            e, texto = de_grupo(g), f"{curso}\n({tipo_sesion})\n{docente}\n{aula or 'Aula Pendiente'}"
+        elif tipo == "docente":
+            e, texto = de_grupo(g), f"{curso} - GRUPO {nombre}\n({tipo_sesion})\n{aula or 'Aula Pendiente'}"
+        else:
+            if not id_aula:
+                continue
+            e = entidad(id_aula, _nombre_archivo(aula, id_aula), f"OCUPACIÓN DEL AULA - {aula}")
+            texto = f"{curso} - GRUPO {nombre}\n{docente}"
+        if e is None:
+            continue
+        e["turnos"].add(id_turno)
+        clave = (dia.capitalize(), etiqueta_hora(hi, hf))
+        e["celdas"][clave] = f"{e['celdas'][clave]} / {texto}" if clave in e["celdas"] else texto
+
+    resultado = []
+    for id_e, e in entidades.items():
+        if id_entidad is not None and id_e != id_entidad:
+            continue
+        horas = sorted({h for t in e.pop("turnos") for h in horas_turno.get(t, [])})
+        e["horas"] = [etiqueta for _, etiqueta in horas]
+        resultado.append(e)
+    return resultado
+
+
+def escribir_horario_entidad(entidad: dict, destino: IO[bytes]) -> None:
+    """Horario semanal de una entidad: filas = horas, columnas = días (write-only)."""
+    wb = Workbook(write_only=True)
+    _estilos(wb)
+    ws = wb.create_sheet("Horario")
+    ws.column_dimensions["A"].width = 15
+    for col in range(2, len(DIAS_SEMANA) + 2):
+        ws.column_dimensions[get_column_letter(col)].width = 25
+
+    def celda(valor, estilo):
+        c = WriteOnlyCell(ws, value=valor)
+        c.style = estilo
+        return c
+
+    ws.append([celda(entidad["titulo"], "titulo")])
+    ws.merged_cells.add(f"A1:{get_column_letter(len(DIAS_SEMANA) + 1)}1")
+    ws.append([celda("HORA", "cab_ciclo")] + [celda(d.upper(), "cab_ciclo") for d in DIAS_SEMANA])
+    for hora in entidad["horas"]:
+        ws.append([celda(hora, "eje")] + [celda(entidad["celdas"].get((d, hora), "-"), "celda") for d in DIAS_SEMANA])
+    wb.save(destino)
+
+
+def renderizar_entidades(entidades: List[dict]) -> List[Tuple[str, bytes]]:
+    """Se corre en el pool de procesos: un lote de entidades -> [(nombre, xlsx)]."""
+    archivos = []
+    for e in entidades:
+        buffer = BytesIO()
+        escribir_horario_entidad(e, buffer)
+        archivos.append((e["archivo"], buffer.getvalue()))
+    return archivos
+
+
+class Tubo(RawIOBase):
+    """Destino no 'seekable' para ZipFile: lo escrito se entrega al cliente y se suelta."""
+
+    def __init__(self):
+        self._partes = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._partes.append(bytes(b))
+        return len(b)
+
+    def vaciar(self) -> bytes:
+        datos = b"".join(self._partes)
+        self._partes.clear()
+        return datos
+
+
+def _repartir(entidades: List[dict]) -> List["asyncio.Future"]:
+    """Unos pocos lotes por proceso: cada proceso renderiza varios libros por viaje."""
+    n_lotes = max(1, min(len(entidades), settings.EXPORT_PROCESOS * 4))
+    lotes = [entidades[i::n_lotes] for i in range(n_lotes)]
+    return [procesos.en_proceso(renderizar_entidades, lote) for lote in lotes if lote]
+
+
+def respuesta_zip(entidades: List[dict], nombre: str, carpeta: str = "") -> StreamingResponse:
+    """
+    Reparte el render de los libros en el pool de procesos y arma el ZIP a medida que
+    llegan los lotes: el cliente recibe bytes desde el primer lote terminado y en
+    memoria solo hay los lotes pendientes de escribir.
+    """
+    async def contenido():
+        tareas = _repartir(entidades)
+        tubo = Tubo()
+        # Los .xlsx ya vienen comprimidos: ZIP_STORED no gasta CPU en volver a comprimir
+        zf = ZipFile(tubo, "w", compression=ZIP_STORED)
+        try:
+            for siguiente in asyncio.as_completed(tareas):
+                for archivo, datos in await siguiente:
+                    zf.writestr(f"{carpeta}{archivo}", datos)
+                yield tubo.vaciar()
+            zf.close()
+            yield tubo.vaciar()
+        finally:
+            # Cliente desconectado: no seguir renderizando lo que nadie va a recibir
+            for t in tareas:
+                t.cancel()
+            zf.close()
+
+    return StreamingResponse(
+        contenido(),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{nombre}"'}
+    )
+
+
+async def exportar_zip(db: AsyncSession, id_periodo: int, tipo: str) -> Tuple[IO[bytes], str]:
+    """Mismo ZIP que respuesta_zip, pero a un archivo temporal (para artefactos y trabajos)."""
+    entidades = await datos_por_entidad(db, id_periodo, tipo)
+    if not entidades:
+        raise HTTPException(404, f"No hay horarios por {tipo} en este periodo")
+    archivo = SpooledTemporaryFile(max_size=_MAX_EN_MEMORIA)
+    tareas = _repartir(entidades)
+    try:
+        with ZipFile(archivo, "w", compression=ZIP_STORED) as zf:
+            for siguiente in asyncio.as_completed(tareas):
+                for nombre, datos in await siguiente:
+                    zf.writestr(nombre, datos)
+    except BaseException:
+        for t in tareas:
+            t.cancel()
+        archivo.close()
+        raise
+    archivo.seek(0)
+    return archivo, f"Horarios_{tipo}_{id_periodo}.zip"
+
+
+async def exportar_horario_entidad(db: AsyncSession, id_periodo: int, tipo: str, id_entidad: int) -> Tuple[IO[bytes], str]:
+    """El libro de un solo docente / grupo / aula (render en el pool de procesos)."""
+    entidades = await datos_por_entidad(db, id_periodo, tipo, id_entidad)
+    if not entidades:
+        raise HTTPException(404, f"No se encontró el {tipo} en este periodo")
+    [(nombre, contenido)] = await procesos.en_proceso(renderizar_entidades, entidades)
+    return BytesIO(contenido), nombre
+
+
+# =====================================================================
+#  5. PLANTILLA CSV (streaming desde un cursor del servidor)
+# =====================================================================
+
+COLUMNAS_PLANTILLA = [
+    # Referencia (no editar en Excel); ID_SESION es la clave del importador
+    "ID_SESION", "CODIGO_CURSO", "CURSO", "GRUPO", "TURNO_GRUPO", "TIPO", "DURACION_HORAS", "DOCENTE",
+    # Trabajo: aquí rellena el algoritmo o el usuario (Ej: Lunes / 1, 2, 3 / ID del aula)
+    "DIA", "BLOQUE_ORDEN", "ID_AULA",
+]
+
+
+def consulta_plantilla(id_periodo: int):
+    """Sesiones del periodo como filas planas (solo columnas): se pueden leer con yield_per."""
+    return (
+        select(Sesion.id, Curso.codigo, Curso.nombre, Grupo.nombre, Turno.nombre,
+               Sesion.tipo_sesion, Sesion.duracion_horas, Docente.apellido, Docente.nombre)
+        .select_from(Sesion)
+        .join(Grupo, Sesion.id_grupo == Grupo.id)
+        .join(CursoAperturado, Grupo.id_curso_aperturado == CursoAperturado.id)
+        .join(Curso, CursoAperturado.id_curso == Curso.id)
+        .outerjoin(Turno, Grupo.id_turno == Turno.id)
+        .outerjoin(Docente, Grupo.id_docente == Docente.id)
+        .where(CursoAperturado.id_periodo == id_periodo)
+        .order_by(Sesion.id)
+    )
+
+
+def respuesta_plantilla_csv(id_periodo: int, nombre: str, lote: int = 1000) -> StreamingResponse:
+    """
+    CSV de la plantilla escrito con el módulo csv a medida que llegan los lotes del cursor:
+    el primer byte sale con el primer lote y en memoria solo hay `lote` filas.
+    Sesión propia, como en respuesta_ndjson: la del request puede cerrarse antes de terminar.
+    """
+    async def contenido():
+        buffer = StringIO()
+        escritor = csv.writer(buffer)
+        escritor.writerow(COLUMNAS_PLANTILLA)
+        # BOM (utf-8-sig) para que Excel abra bien las tildes
+        yield "\ufeff" + buffer.getvalue()
+        async with SessionLocal() as db:
+            result = await db.stream(consulta_plantilla(id_periodo).execution_options(yield_per=lote))
+            async for filas in result.partitions():
+                buffer.seek(0)
+                buffer.truncate()
+                escritor.writerows(
+                    (id_sesion, codigo, curso, grupo, turno or "Sin Turno", tipo, duracion,
+                     f"{apellido} {nombre_doc}" if apellido else "VACANTE", "", "", "")
+                    for id_sesion, codigo, curso, grupo, turno, tipo, duracion, apellido, nombre_doc in filas
+                )
+                yield buffer.getvalue()
+
+    return StreamingResponse(
+        contenido(),
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{nombre}"'}
+    )
+
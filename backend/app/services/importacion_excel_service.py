@@ -0,0 +1,371 @@
+import re
+from typing import Dict, IO, List, Optional, Tuple
+from zipfile import BadZipFile
+
+from fastapi.concurrency import run_in_threadpool
+from openpyxl import load_workbook
+from openpyxl.utils import get_column_letter
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.aula import Aula
+from app.models.bloque_horario import BloqueHorario
+from app.models.curso import Curso
+from app.models.curso_aperturado import CursoAperturado
+from app.models.grupo import Grupo
+from app.models.horario import Horario
+from app.models.sesion import Sesion
+from app.services.cruce_service import tipo_cruce
+from app.services.exportacion_service import DIAS_SEMANA, consulta_bloques_grilla, etiqueta_hora, safe_to_roman
+from app.services.importacion_service import MAX_DETALLES
+
+# "Docente [Aula]" -> Aula (segunda línea de la celda, ver exportacion_service.armar_grilla)
+_AULA = re.compile(r"\[([^\]]*)\]\s*$")
+
+
+# =====================================================================
+#  1. LECTURA DEL LIBRO (openpyxl read-only, en un hilo)
+# =====================================================================
+
+def leer_libro(archivo: IO[bytes]) -> dict:
+    """
+    Recorre el libro del horario general fila por fila (read-only: no arma el árbol de celdas).
+    Devuelve columnas [(ciclo, grupo)], filas [(nº de fila en Excel, día, hora)] y las celdas
+    no vacías {(i_fila, i_columna): [(curso, aula o None)]}. Las celdas combinadas (ciclo, día)
+    solo traen valor en la primera: se arrastra hacia la derecha / abajo.
+    """
+    wb = load_workbook(archivo, read_only=True, data_only=True)
+    try:
+        ws = wb["Horario General"] if "Horario General" in wb.sheetnames else wb.active
+        filas_iter = enumerate(ws.iter_rows(values_only=True), start=1)
+
+        for _, cabecera in filas_iter:
+            if cabecera and str(cabecera[0] or "").strip().upper() == "DÍA":
+                break
+        else:
+            raise ValueError("No se encontró la cabecera DÍA / HORA del horario general.")
+        _, grupos = next(filas_iter, (0, ()))
+
+        columnas, ciclo = [], ""
+        for valor_ciclo, valor_grupo in zip(cabecera[2:], grupos[2:]):
+            ciclo = str(valor_ciclo).strip() if valor_ciclo else ciclo
+            if not valor_grupo:
+                break
+            columnas.append((ciclo.upper(), str(valor_grupo).strip().upper()))
+
+        filas, celdas, dia = [], {}, ""
+        for n_fila, valores in filas_iter:
+            if not valores or len(valores) < 2 or not valores[1]:
+                break
+            dia = str(valores[0]).strip().capitalize() if valores[0] else dia
+            i = len(filas)
+            filas.append((n_fila, dia, str(valores[1]).strip()))
+            for c, valor in enumerate(valores[2:2 + len(columnas)]):
+                if valor is None or not str(valor).strip():
+                    continue
+                entradas = []
+                for texto in str(valor).split(" / "):
+                    lineas = texto.strip().splitlines()
+                    if not lineas:
+                        continue
+                    aula = _AULA.search(lineas[-1]) if len(lineas) > 1 else None
+                    entradas.append((lineas[0].strip(), (aula.group(1).strip() or None) if aula else None))
+                celdas[(i, c)] = entradas
+        return {"columnas": columnas, "filas": filas, "celdas": celdas}
+    finally:
+        wb.close()
+
+
+# =====================================================================
+#  2. ESTADO ACTUAL DEL PERIODO (consultas planas)
+# =====================================================================
+
+async def _referencias(db: AsyncSession, id_periodo: int) -> dict:
+    grupos = (await db.execute(
+        select(Grupo.id, Grupo.nombre, Grupo.id_turno, Grupo.id_docente, Curso.ciclo, Curso.nombre.label("curso"))
+        .join(CursoAperturado, Grupo.id_curso_aperturado == CursoAperturado.id)
+        .join(Curso, CursoAperturado.id_curso == Curso.id)
+        .where(CursoAperturado.id_periodo == id_periodo)
+        .order_by(Grupo.id)
+    )).all()
+    bloques = (await db.execute(
+        select(BloqueHorario.id, BloqueHorario.dia_semana, BloqueHorario.orden, BloqueHorario.id_turno,
+               BloqueHorario.hora_inicio, BloqueHorario.hora_fin)
+        .order_by(BloqueHorario.id)
+    )).all()
+    horas = (await db.execute(consulta_bloques_grilla())).all()
+    aulas = (await db.execute(select(Aula.id, Aula.nombre).order_by(Aula.id))).all()
+    sesiones = (await db.execute(
+        select(Sesion.id, Sesion.id_grupo, Sesion.duracion_horas)
+        .join(Grupo, Sesion.id_grupo == Grupo.id)
+        .join(CursoAperturado, Grupo.id_curso_aperturado == CursoAperturado.id)
+        .where(CursoAperturado.id_periodo == id_periodo)
+        .order_by(Sesion.id)
+    )).all()
+    horario = (await db.execute(
+        select(Horario.id, Horario.id_sesion, Horario.id_bloque, Horario.id_aula, Horario.ciclo, Horario.grupo,
+               Horario.id_grupo, Horario.id_docente)
+        .where(Horario.id_periodo == id_periodo, Horario.estado == 1)
+    )).all()
+
+    por_columna: Dict[tuple, list] = {}
+    for g in grupos:
+        clave = (f"CICLO {safe_to_roman(g.ciclo)}", f"GRUPO {g.nombre}".upper())
+        por_columna.setdefault(clave, []).append(g)
+
+    # (día, orden, turno) -> bloque; (día, orden) -> primer bloque para grupos sin turno
+    bloque_turno, bloque_libre, ordenes_turno = {}, {}, {}
+    for b in bloques:
+        dia = (b.dia_semana or "").strip().capitalize()
+        bloque_turno[(dia, b.orden, b.id_turno)] = b
+        bloque_libre.setdefault((dia, b.orden), b)
+        ordenes_turno.setdefault(b.id_turno, set()).add(b.orden)
+
+    # Etiqueta de la fila -> orden: primero la que eligió la exportación, luego cualquier bloque con esa hora
+    orden_por_hora = {}
+    for b in bloques:
+        orden_por_hora.setdefault(etiqueta_hora(b.hora_inicio, b.hora_fin), b.orden)
+    orden_por_hora.update({etiqueta_hora(hi, hf): orden for orden, hi, hf, _ in horas})
+
+    aula_por_nombre = {}
+    for id_aula, nombre in aulas:
+        aula_por_nombre.setdefault((nombre or "").strip().upper(), id_aula)
+
+    return {
+        "por_columna": por_columna, "bloque_turno": bloque_turno, "bloque_libre": bloque_libre,
+        "ordenes_turno": ordenes_turno, "orden_por_hora": orden_por_hora, "aula_por_nombre": aula_por_nombre,
+        "sesiones": sesiones, "horario": horario,
+        "bloques": {b.id: b for b in bloques},
+    }
+
+
+# =====================================================================
+#  3. DIFERENCIAS Y VALIDACIÓN (en memoria)
+# =====================================================================
+
+def _bloque(ref: dict, grupo, dia: str, orden: int):
+    if grupo.id_turno is not None and grupo.id_turno in ref["ordenes_turno"]:
+        return ref["bloque_turno"].get((dia, orden, grupo.id_turno))
+    return ref["bloque_libre"].get((dia, orden))
+
+
+def comparar(libro: dict, ref: dict) -> Tuple[List[dict], List[int], List[dict], List[dict]]:
+    """
+    Devuelve (errores, ids de horario a borrar, filas a insertar, cambios para mostrar).
+    Solo se comparan las casillas que el libro muestra (grupo de una columna del libro, día y
+    hora de una fila del libro, dentro del turno del grupo): lo demás queda como está.
+    Un cambio de aula es baja + alta de la misma sesión; una casilla nueva toma una sesión
+    del grupo con horas libres (de preferencia la que ya está en la hora contigua).
+    """
+    errores, cambios = [], []
+
+    def error(celda: Optional[str], mensaje: str) -> None:
+        errores.append({"celda": celda, "error": mensaje})
+
+    # 3.1 Columnas y filas del libro -> grupos y (día, orden)
+    grupos_col = []
+    for c, clave in enumerate(libro["columnas"]):
+        grupos = ref["por_columna"].get(clave)
+        if grupos is None:
+            error(f"{get_column_letter(c + 3)}8", f"La columna {clave[0]} / {clave[1]} no existe en el periodo.")
+        grupos_col.append(grupos or [])
+    filas = []
+    for n_fila, dia, hora in libro["filas"]:
+        orden = ref["orden_por_hora"].get(hora.replace(" ", "").replace("-", " - "))
+        if dia not in DIAS_SEMANA:
+            if not filas or filas[-1][1] != dia:  # un error por día (la celda está combinada)
+                error(f"A{n_fila}", f"Día inválido: '{dia}'.")
+        elif orden is None:
+            error(f"B{n_fila}", f"Hora inválida: '{hora}'.")
+        filas.append((n_fila, dia, orden))
+    if errores:
+        return errores, [], [], []
+
+    # 3.2 Casillas del libro: {(id_grupo, día, orden): (id_aula, celda)} y el alcance de la comparación
+    libro_casillas, alcance = {}, {}
+    for i, (n_fila, dia, orden) in enumerate(filas):
+        for c, grupos in enumerate(grupos_col):
+            celda = f"{get_column_letter(c + 3)}{n_fila}"
+            for g in grupos:
+                if _bloque(ref, g, dia, orden) is not None:
+                    alcance[(g.id, dia, orden)] = celda
+            for curso, aula in libro["celdas"].get((i, c), []):
+                grupo = next((g for g in grupos if (g.curso or "").strip().upper() == curso.upper()), None)
+                if grupo is None:
+                    error(celda, f"El curso '{curso}' no tiene grupo en {libro['columnas'][c][0]} / {libro['columnas'][c][1]}.")
+                    continue
+                if _bloque(ref, grupo, dia, orden) is None:
+                    error(celda, f"'{curso}': {dia} {orden} no es un bloque del turno del grupo.")
+                    continue
+                id_aula = None
+                if aula:
+                    id_aula = ref["aula_por_nombre"].get(aula.upper())
+                    if id_aula is None:
+                        error(celda, f"Aula '{aula}' no existe.")
+                        continue
+                if (grupo.id, dia, orden) in libro_casillas:
+                    error(celda, f"'{curso}' aparece dos veces en la misma casilla.")
+                    continue
+                libro_casillas[(grupo.id, dia, orden)] = (id_aula, celda)
+    if errores:
+        return errores, [], [], []
+
+    # 3.3 Diferencias contra lo guardado
+    grupos_por_id = {g.id: (g, clave) for clave, gs in ref["por_columna"].items() for g in gs}
+    actuales = {}
+    for h in ref["horario"]:
+        b = ref["bloques"].get(h.id_bloque)
+        if b is None or h.id_grupo is None:
+            continue
+        clave = (h.id_grupo, (b.dia_semana or "").strip().capitalize(), b.orden)
+        if clave in alcance:
+            actuales[clave] = h
+
+    def describir(clave, accion):
+        g, columna = grupos_por_id[clave[0]]
+        return {"celda": alcance.get(clave), "accion": accion, "columna": " / ".join(columna),
+                "curso": g.curso, "dia": clave[1], "orden": clave[2]}
+
+    bajas: List[int] = []
+    altas: List[dict] = []
+    nuevas: List[tuple] = []
+    for clave, h in actuales.items():
+        en_libro = libro_casillas.get(clave)
+        if en_libro is None:
+            bajas.append(h.id)
+            cambios.append(describir(clave, "baja"))
+        elif en_libro[0] != h.id_aula:
+            bajas.append(h.id)
+            altas.append({"clave": clave, "id_sesion": h.id_sesion, "id_aula": en_libro[0], "celda": en_libro[1]})
+            cambios.append(describir(clave, "aula"))
+    for clave, (id_aula, celda) in libro_casillas.items():
+        if clave not in actuales:
+            nuevas.append((clave, id_aula, celda))
+            cambios.append(describir(clave, "alta"))
+
+    # 3.4 Sesión para cada casilla nueva: la que tenga horas libres, contigua si se puede
+    borrar = set(bajas)
+    sesiones_grupo: Dict[int, list] = {}
+    for s in ref["sesiones"]:
+        sesiones_grupo.setdefault(s.id_grupo, []).append(s)
+    ocupa: Dict[int, set] = {}  # id_sesion -> {(día, orden)} en el estado final
+    for h in ref["horario"]:
+        b = ref["bloques"].get(h.id_bloque)
+        if h.id not in borrar and b is not None:
+            ocupa.setdefault(h.id_sesion, set()).add(((b.dia_semana or "").strip().capitalize(), b.orden))
+    for a in altas:
+        ocupa.setdefault(a["id_sesion"], set()).add(a["clave"][1:])
+
+    dia_pos = {d: i for i, d in enumerate(DIAS_SEMANA)}
+    for clave, id_aula, celda in sorted(nuevas, key=lambda n: (n[0][0], dia_pos[n[0][1]], n[0][2])):
+        id_grupo, dia, orden = clave
+        libres = [s for s in sesiones_grupo.get(id_grupo, []) if len(ocupa.get(s.id, ())) < (s.duracion_horas or 0)]
+        if not libres:
+            g, _ = grupos_por_id[id_grupo]
+            error(celda, f"'{g.curso}' (grupo {g.nombre}) ya tiene todas las horas de sus sesiones asignadas.")
+            continue
+        sesion = max(libres, key=lambda s: (
+            bool(ocupa.get(s.id, set()) & {(dia, orden - 1), (dia, orden + 1)}),
+            (s.duracion_horas or 0) - len(ocupa.get(s.id, ())),
+            -s.id,
+        ))
+        ocupa.setdefault(sesion.id, set()).add((dia, orden))
+        altas.append({"clave": clave, "id_sesion": sesion.id, "id_aula": id_aula, "celda": celda})
+    if errores:
+        return errores, [], [], cambios
+
+    # 3.5 Cruces del estado final: mismas reglas que los índices de horario
+    ocupado: Dict[tuple, str] = {}
+
+    def claves(id_bloque, ciclo, nombre_grupo, id_grupo, id_docente, id_aula):
+        yield ("casilla", id_bloque, ciclo, nombre_grupo), f"La casilla (ciclo {ciclo}, grupo '{nombre_grupo}') ya está ocupada"
+        yield ("grupo", id_bloque, id_grupo), f"El grupo '{nombre_grupo}' ya tiene clase"
+        if id_docente:
+            yield ("docente", id_bloque, id_docente), "El docente del grupo ya dicta"
+        if id_aula:
+            yield ("aula", id_bloque, id_aula), f"El aula ID {id_aula} ya está ocupada"
+
+    for h in ref["horario"]:
+        # Las casillas del esqueleto (sin sesión) están libres
+        if h.id not in borrar and h.id_sesion is not None:
+            for k, _ in claves(h.id_bloque, h.ciclo, h.grupo, h.id_grupo, h.id_docente, h.id_aula):
+                ocupado[k] = "(sin cambios)"
+
+    filas_insertar = []
+    for a in altas:
+        id_grupo, dia, orden = a["clave"]
+        g, _ = grupos_por_id[id_grupo]
+        bloque = _bloque(ref, g, dia, orden)
+        for k, mensaje in claves(bloque.id, g.ciclo, g.nombre, g.id, g.id_docente, a["id_aula"]):
+            if k in ocupado:
+                error(a["celda"], f"{mensaje} en {dia} (bloque {orden}).")
+                break
+            ocupado[k] = a["celda"]
+        filas_insertar.append({
+            "id_sesion": a["id_sesion"], "id_bloque": bloque.id, "id_aula": a["id_aula"],
+            "ciclo": g.ciclo, "grupo": g.nombre, "estado": 1,
+        })
+    return errores, bajas, filas_insertar, cambios
+
+
+# =====================================================================
+#  4. PIPELINE
+# =====================================================================
+
+async def importar_horario_excel(db: AsyncSession, id_periodo: int, archivo: IO[bytes], confirmar_guardado: bool) -> dict:
+    """
+    Importa el libro del horario general (el de exportar-excel) editado por el coordinador.
+    1. Lee el libro en modo read-only (en un hilo) y ubica columnas (ciclo/grupo) y filas (día/hora).
+    2. Compara en memoria contra el horario guardado y valida el estado final (sesiones con horas
+       libres, turno, aulas, cruces de grupo/docente/aula/casilla).
+    3. Si se confirma, aplica solo las casillas cambiadas en una transacción: las bajas se
+       vacían (queda el esqueleto, como en guardar-asignacion) y las altas van en un solo
+       upsert sobre la casilla, que llena las vacías y nunca pisa una ocupada.
+    Respuestas como importar-csv (status error / valid / success) más la lista de cambios.
+    """
+    try:
+        libro = await run_in_threadpool(leer_libro, archivo)
+    except (ValueError, KeyError, BadZipFile) as e:
+        return {"status": "error", "total_errores": 1,
+                "detalles": [{"celda": None, "error": f"No se pudo leer el libro: {e}"}]}
+
+    ref = await _referencias(db, id_periodo)
+    errores, bajas, filas, cambios = comparar(libro, ref)
+    if errores:
+        return {"status": "error", "total_errores": len(errores), "detalles": errores[:MAX_DETALLES]}
+
+    altas = sum(1 for c in cambios if c["accion"] == "alta")
+    aulas = sum(1 for c in cambios if c["accion"] == "aula")
+    resumen = f"{altas} altas, {len(cambios) - altas - aulas} bajas, {aulas} cambios de aula"
+    if not confirmar_guardado or not cambios:
+        estado = "valid" if not confirmar_guardado else "success"
+        return {"status": estado, "message": "Sin cambios." if not cambios else f"Validación exitosa ({resumen}).",
+                "cambios": cambios[:MAX_DETALLES]}
+
+    try:
+        if bajas:
+            await db.execute(update(Horario).where(Horario.id.in_(bajas)).values(id_sesion=None, id_aula=None))
+        if filas:
+            stmt = pg_insert(Horario).values([dict(f, id_periodo=id_periodo) for f in filas])
+            stmt = stmt.on_conflict_do_update(
+                constraint='uq_horario_casilla',
+                set_={"id_sesion": stmt.excluded.id_sesion, "id_aula": stmt.excluded.id_aula, "estado": 1},
+                where=Horario.id_sesion.is_(None),
+            ).returning(Horario.id)
+            if len((await db.execute(stmt)).all()) < len(filas):
+                # Una casilla que se comparó vacía ya tiene sesión (guardada mientras tanto o inactiva)
+                await db.rollback()
+                return {"status": "error", "total_errores": 1,
+                        "detalles": [{"celda": None, "error": "CRUCE de casilla al guardar. Nada fue guardado."}]}
+        await db.commit()
+    except IntegrityError as e:
+        # Algo guardado por otro usuario mientras se comparaba
+        await db.rollback()
+        tipo = tipo_cruce(e)
+        if tipo is None:
+            raise
+        return {"status": "error", "total_errores": 1,
+                "detalles": [{"celda": None, "error": f"CRUCE de {tipo} al guardar. Nada fue guardado."}]}
+    return {"status": "success", "message": f"Guardado: {resumen}.", "cambios": cambios[:MAX_DETALLES]}
@@ -0,0 +1,230 @@
+import re
+from zipfile import BadZipFile
+from typing import Dict, IO, List, Optional, Set
+
+import pandas as pd
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.curso import Curso, curso_requisito_assoc
+from app.services.importacion_service import MAX_DETALLES
+
+STAGING = "tmp_importar_curso"
+
+# Columnas obligatorias; REQUISITOS es opcional (códigos de otros cursos)
+COLUMNAS = ("CODIGO", "NOMBRE", "CICLO", "PARIDAD", "CREDITOS", "HORAS_TEORICAS", "HORAS_PRACTICAS", "TIPO_CURSO")
+NUMERICAS = ("CICLO", "CREDITOS", "HORAS_TEORICAS", "HORAS_PRACTICAS")
+PARIDADES = ("PAR", "IMPAR", "AMBOS")
+# Largo máximo de los textos, el de las columnas de curso: así el COPY no falla a mitad de carga
+LONGITUDES = {col.upper(): Curso.__table__.c[col].type.length for col in ("codigo", "nombre", "tipo_curso")}
+# Códigos de requisito separados por ; , o |  (Ej: "MAT101; FIS101")
+_SEPARADOR = re.compile(r"[;,|]")
+
+
+# =====================================================================
+#  1. LECTURA Y VALIDACIÓN (en memoria: un plan son decenas de cursos)
+# =====================================================================
+
+def leer_archivo(archivo: IO[bytes], nombre: str) -> pd.DataFrame:
+    """CSV o Excel (primera hoja), todo como texto."""
+    if (nombre or "").lower().endswith((".xlsx", ".xlsm")):
+        df = pd.read_excel(archivo, dtype=str, keep_default_na=False)
+    else:
+        df = pd.read_csv(archivo, dtype=str, keep_default_na=False, encoding="utf-8-sig")
+    df.columns = [str(c).strip().upper() for c in df.columns]
+    return df
+
+
+def buscar_ciclo(grafo: Dict[str, Set[str]]) -> Optional[List[str]]:
+    """
+    DFS iterativo sobre curso -> requisitos. Devuelve el primer ciclo encontrado
+    como lista de códigos (el primero se repite al final) o None si es un DAG.
+    """
+    estado: Dict[str, int] = {}  # 1 = en la pila, 2 = terminado
+    for raiz in sorted(grafo):
+        if estado.get(raiz):
+            continue
+        pila = [(raiz, iter(sorted(grafo.get(raiz, ()))))]
+        camino = [raiz]
+        estado[raiz] = 1
+        while pila:
+            nodo, hijos = pila[-1]
+            hijo = next(hijos, None)
+            if hijo is None:
+                estado[nodo] = 2
+                pila.pop()
+                camino.pop()
+            elif estado.get(hijo) == 1:
+                return camino[camino.index(hijo):] + [hijo]
+            elif not estado.get(hijo):
+                estado[hijo] = 1
+                pila.append((hijo, iter(sorted(grafo.get(hijo, ())))))
+                camino.append(hijo)
+    return None
+
+
+def validar(df: pd.DataFrame, existentes: Dict[str, int], aristas_existentes: Dict[str, Set[str]]):
+    """
+    Devuelve (errores, cursos, requisitos):
+    - cursos: filas listas para COPY (codigo, nombre, ciclo, ...).
+    - requisitos: {codigo: {codigos requisito}} de los cursos del archivo.
+    Los requisitos pueden ser cursos del archivo o cursos ya existentes en la versión.
+    """
+    faltan = [c for c in COLUMNAS if c not in df.columns]
+    if faltan:
+        return [{"fila": None, "error": f"Faltan columnas: {', '.join(faltan)}"}], [], {}
+    if "REQUISITOS" not in df.columns:
+        df["REQUISITOS"] = ""
+
+    errores, cursos, requisitos = [], [], {}
+    filas_por_codigo: Dict[str, int] = {}
+    for fila, r in enumerate(df.itertuples(index=False), start=2):
+        r = r._asdict()
+        codigo = r["CODIGO"].strip().upper()
+        if not codigo and not r["NOMBRE"].strip():
+            continue  # fila vacía
+        if not codigo:
+            errores.append({"fila": fila, "error": "CODIGO vacío."})
+            continue
+        if codigo in filas_por_codigo:
+            errores.append({"fila": fila, "error": f"Código {codigo} repetido (fila {filas_por_codigo[codigo]})."})
+            continue
+        filas_por_codigo[codigo] = fila
+
+        no_numericas = [c for c in NUMERICAS if not r[c].strip().isdigit()]
+        if no_numericas:
+            errores.append({"fila": fila, "error": f"{', '.join(no_numericas)} deben ser enteros."})
+            continue
+        paridad = r["PARIDAD"].strip().upper()
+        if paridad not in PARIDADES:
+            errores.append({"fila": fila, "error": "El campo 'paridad' debe ser 'PAR', 'IMPAR' o 'AMBOS'."})
+            continue
+        largos = [f"{c} (máx. {n})" for c, n in LONGITUDES.items() if len(r[c].strip()) > n]
+        if largos:
+            errores.append({"fila": fila, "error": f"Texto demasiado largo: {', '.join(largos)}."})
+            continue
+
+        cursos.append((fila, codigo, r["NOMBRE"].strip(), int(r["CICLO"]), paridad, int(r["CREDITOS"]),
+                       int(r["HORAS_TEORICAS"]), int(r["HORAS_PRACTICAS"]), r["TIPO_CURSO"].strip()))
+        requisitos[codigo] = {c.strip().upper() for c in _SEPARADOR.split(r["REQUISITOS"]) if c.strip()}
+
+    # Referencias: se validan cuando ya se conocen todos los códigos del archivo
+    conocidos = set(requisitos) | set(existentes)
+    for codigo, reqs in requisitos.items():
+        fila = filas_por_codigo[codigo]
+        if codigo in reqs:
+            errores.append({"fila": fila, "error": f"El curso {codigo} no puede ser requisito de sí mismo."})
+        for req in sorted(reqs - conocidos):
+            errores.append({"fila": fila, "error": f"Requisito {req} no existe en el archivo ni en la versión del plan."})
+
+    if not errores:
+        # Grafo final: aristas del archivo + las de cursos de la versión que el archivo no toca
+        grafo = {c: set(r) for c, r in aristas_existentes.items() if c not in requisitos}
+        grafo.update(requisitos)
+        ciclo = buscar_ciclo(grafo)
+        if ciclo:
+            fila = next((filas_por_codigo[c] for c in ciclo if c in filas_por_codigo), None)
+            errores.append({"fila": fila, "error": f"Requisitos circulares: {' -> '.join(ciclo)}"})
+    return errores, cursos, requisitos
+
+
+# =====================================================================
+#  2. CARGA (una transacción)
+# =====================================================================
+
+async def _estado_version(db: AsyncSession, id_plan_version: int):
+    """(codigo -> id, codigo -> {códigos requisito}) de los cursos ya guardados en la versión."""
+    filas = (await db.execute(
+        select(Curso.id, Curso.codigo).where(Curso.id_plan_version == id_plan_version).order_by(Curso.id)
+    )).all()
+    existentes: Dict[str, int] = {}
+    for id_curso, codigo in filas:
+        existentes.setdefault((codigo or "").strip().upper(), id_curso)
+    por_id = {id_curso: (codigo or "").strip().upper() for id_curso, codigo in filas}
+
+    aristas: Dict[str, Set[str]] = {}
+    t = curso_requisito_assoc.c
+    for id_curso, id_req in (await db.execute(
+        select(t.id_curso, t.id_curso_requisito).where(t.id_curso.in_(list(por_id)))
+    )).all():
+        if id_req in por_id:
+            aristas.setdefault(por_id[id_curso], set()).add(por_id[id_req])
+    return existentes, aristas
+
+
+async def importar_plan(db: AsyncSession, id_plan_version: int, archivo: IO[bytes], nombre: str,
+                        confirmar_guardado: bool) -> dict:
+    """
+    Importa los cursos de una versión de plan con sus requisitos (columna REQUISITOS).
+    - Valida todo en memoria: columnas, códigos repetidos, números, paridad, que cada
+      requisito exista (en el archivo o en la versión) y que no haya ciclos.
+    - Si se confirma: COPY de los cursos a una tabla temporal; un UPDATE ... FROM para los
+      códigos que ya existen en la versión, un INSERT ... SELECT para los nuevos; los
+      requisitos de los cursos del archivo se reemplazan con un insert masivo.
+    Mismas respuestas que importar-csv: status error / valid / success.
+    """
+    try:
+        df = await run_in_threadpool(leer_archivo, archivo, nombre)
+    except (ValueError, BadZipFile):
+        return {"status": "error", "total_errores": 1,
+                "detalles": [{"fila": None, "error": "No se pudo leer el archivo (use CSV UTF-8 o .xlsx)."}]}
+    existentes, aristas = await _estado_version(db, id_plan_version)
+    errores, cursos, requisitos = validar(df, existentes, aristas)
+
+    if errores:
+        return {"status": "error", "total_errores": len(errores), "detalles": errores[:MAX_DETALLES]}
+    if not cursos:
+        return {"status": "error", "total_errores": 1, "detalles": [{"fila": None, "error": "El archivo no tiene cursos."}]}
+
+    nuevos = sum(1 for c in cursos if c[1] not in existentes)
+    n_requisitos = sum(len(r) for r in requisitos.values())
+    resumen = f"{nuevos} cursos nuevos, {len(cursos) - nuevos} actualizados, {n_requisitos} requisitos"
+    if not confirmar_guardado:
+        return {"status": "valid", "message": f"Validación exitosa ({resumen})."}
+
+    await db.execute(text(
+        f"CREATE TEMP TABLE {STAGING} (fila integer, codigo varchar(20), nombre varchar(150), ciclo integer, "
+        f"paridad varchar(10), creditos integer, horas_teoricas integer, horas_practicas integer, "
+        f"tipo_curso varchar(20)) ON COMMIT DROP"
+    ))
+    conexion = await (await db.connection()).get_raw_connection()
+    await conexion.driver_connection.copy_records_to_table(
+        STAGING, records=cursos,
+        columns=["fila", "codigo", "nombre", "ciclo", "paridad", "creditos", "horas_teoricas", "horas_practicas", "tipo_curso"]
+    )
+
+    # Se compara por código normalizado (mayúsculas, sin espacios), igual que en la validación;
+    # si la versión tuviera códigos repetidos, se actualiza el de menor id
+    await db.execute(text(f"""
+        UPDATE curso c SET codigo = s.codigo, nombre = s.nombre, ciclo = s.ciclo, paridad = s.paridad,
+               creditos = s.creditos, horas_teoricas = s.horas_teoricas, horas_practicas = s.horas_practicas,
+               tipo_curso = s.tipo_curso
+        FROM {STAGING} s
+        WHERE c.id = (SELECT min(x.id) FROM curso x
+                      WHERE x.id_plan_version = :v AND upper(trim(x.codigo)) = s.codigo)
+    """), {"v": id_plan_version})
+    filas = await db.execute(text(f"""
+        INSERT INTO curso (codigo, nombre, ciclo, paridad, creditos, horas_teoricas, horas_practicas,
+                           tipo_curso, id_plan_version, estado)
+        SELECT s.codigo, s.nombre, s.ciclo, s.paridad, s.creditos, s.horas_teoricas, s.horas_practicas,
+               s.tipo_curso, :v, 1
+        FROM {STAGING} s
+        WHERE NOT EXISTS (SELECT 1 FROM curso x WHERE x.id_plan_version = :v AND upper(trim(x.codigo)) = s.codigo)
+        ORDER BY s.fila
+        RETURNING id, codigo
+    """), {"v": id_plan_version})
+    ids = dict(existentes)
+    ids.update({codigo: id_curso for id_curso, codigo in filas.all()})
+
+    ids_archivo = [ids[c] for c in requisitos]
+    t = curso_requisito_assoc.c
+    await db.execute(curso_requisito_assoc.delete().where(t.id_curso.in_(ids_archivo)))
+    aristas_nuevas = [
+        {"id_curso": ids[codigo], "id_curso_requisito": ids[req], "id_plan_version": id_plan_version}
+        for codigo, reqs in requisitos.items() for req in sorted(reqs)
+    ]
+    if aristas_nuevas:
+        await db.execute(insert(curso_requisito_assoc), aristas_nuevas)
+    await db.commit()
+    return {"status": "success", "message": f"Importados: {resumen}."}
@@ -0,0 +1,279 @@
+from typing import IO, List, Optional, Set
+
+import pandas as pd
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.aula import Aula
+from app.models.bloque_horario import BloqueHorario
+from app.models.curso import Curso
+from app.models.curso_aperturado import CursoAperturado
+from app.models.grupo import Grupo
+from app.models.horario import Horario
+from app.models.restriccion import Restriccion
+from app.models.sesion import Sesion
+from app.services.cruce_service import tipo_cruce
+
+# Filas del CSV que se procesan a la vez: la memoria depende de esto, no del tamaño del archivo
+FILAS_POR_LOTE = 5000
+# Tope de errores que se devuelven en detalle (se cuentan todos)
+MAX_DETALLES = 1000
+
+STAGING = "tmp_importar_horario"
+
+# Cada fila reporta solo su primer error. Orden: formato, sesión, bloque, aula,
+# día bloqueado del docente, cruces (abajo) y al final el tope de horas de la sesión
+CRUCES = (
+    ("grupo", ["id_bloque", "id_grupo"], "El grupo '{grupo}' ya tiene clase en ese bloque."),
+    ("docente", ["id_bloque", "id_docente"], "El docente del grupo '{grupo}' ya dicta en ese bloque."),
+    ("aula", ["id_bloque", "id_aula"], "El aula ID {id_aula} ya está ocupada en ese bloque."),
+    ("casilla", ["id_bloque", "ciclo", "grupo"], "La casilla (ciclo {ciclo}, grupo '{grupo}') ya está ocupada en ese bloque."),
+)
+
+
+# =====================================================================
+#  1. REFERENCIAS (una consulta cada una, al inicio)
+# =====================================================================
+
+async def _sesiones(db: AsyncSession, id_periodo: int) -> pd.DataFrame:
+    stmt = (
+        select(Sesion.id, Sesion.duracion_horas, Grupo.id, Grupo.id_docente, Grupo.id_turno, Curso.ciclo, Grupo.nombre)
+        .join(Grupo, Sesion.id_grupo == Grupo.id)
+        .join(CursoAperturado, Grupo.id_curso_aperturado == CursoAperturado.id)
+        .join(Curso, CursoAperturado.id_curso == Curso.id)
+        .where(CursoAperturado.id_periodo == id_periodo)
+    )
+    filas = (await db.execute(stmt)).all()
+    df = pd.DataFrame(filas, columns=["id_sesion", "duracion_horas", "id_grupo", "id_docente", "id_turno", "ciclo", "grupo"])
+    # float64 en las claves: los merge no fallan por tipos aunque haya nulos o la tabla esté vacía
+    return df.astype({"id_sesion": "float64", "id_turno": "float64", "duracion_horas": "float64"})
+
+
+async def _bloques(db: AsyncSession) -> pd.DataFrame:
+    stmt = select(BloqueHorario.dia_semana, BloqueHorario.orden, BloqueHorario.id_turno, BloqueHorario.id)
+    df = pd.DataFrame((await db.execute(stmt)).all(), columns=["dia", "orden", "id_turno", "id_bloque"])
+    df["dia"] = df["dia"].astype(str).str.strip().str.capitalize()
+    return df.astype({"orden": "float64", "id_turno": "float64"})
+
+
+async def _ocupados(db: AsyncSession, id_periodo: int) -> dict:
+    """
+    Lo ya guardado en el periodo, como conjuntos por regla de cruce, más las horas
+    ya asignadas a cada sesión ('horas': id_sesion -> bloques).
+    Las casillas del esqueleto (sin sesión) no ocupan nada: el import las llena.
+    """
+    stmt = (
+        select(Horario.id_sesion, Horario.id_bloque, Horario.id_grupo, Horario.id_docente,
+               Horario.id_aula, Horario.ciclo, Horario.grupo)
+        .where(Horario.id_periodo == id_periodo, Horario.estado == 1, Horario.id_sesion.isnot(None))
+    )
+    df = pd.DataFrame((await db.execute(stmt)).all(),
+                      columns=["id_sesion", "id_bloque", "id_grupo", "id_docente", "id_aula", "ciclo", "grupo"])
+    ocupados = {nombre: _claves(df, columnas) for nombre, columnas, _ in CRUCES}
+    ocupados["horas"] = df["id_sesion"].astype("float64").value_counts()
+    return ocupados
+
+
+async def _dias_bloqueados(db: AsyncSession) -> Set[tuple]:
+    """(id_docente, día) de las restricciones BLOQUEO_DIA activas, las mismas que valida horarios.py."""
+    stmt = select(Restriccion.id_entidad, Restriccion.regla_json).where(
+        Restriccion.entidad_referencia == 'DOCENTE',
+        Restriccion.tipo == 'BLOQUEO_DIA',
+        Restriccion.estado == 1,
+    )
+    return {
+        (float(id_docente), str(regla["dia"]).strip().capitalize())
+        for id_docente, regla in (await db.execute(stmt)).all()
+        if regla and regla.get("dia")
+    }
+
+
+def _claves(df: pd.DataFrame, columnas: List[str]) -> Set[tuple]:
+    sub = df[columnas].dropna()
+    return set(zip(*(sub[c].tolist() for c in columnas)))
+
+
+# =====================================================================
+#  2. VALIDACIÓN VECTORIZADA DE UN LOTE
+# =====================================================================
+
+def _numero(serie: pd.Series) -> pd.Series:
+    return pd.to_numeric(serie.str.strip(), errors="coerce").astype("float64")
+
+
+def _entero(valor):
+    return valor if pd.isna(valor) else int(valor)
+
+
+def _resolver_lote(df: pd.DataFrame, sesiones: pd.DataFrame, bloques: pd.DataFrame,
+                   aulas: Set[int], ocupados: dict, bloqueados: Set[tuple]) -> pd.DataFrame:
+    """
+    Devuelve el lote con id_bloque, grupo/docente/ciclo y una columna 'error'
+    ('' = fila válida). Todo por columnas: merge contra los mapas, reglas con isin.
+    Las filas válidas pasan a 'ocupados' (y suman a sus horas) para que el resto
+    del archivo choque con ellas.
+    """
+    for col in ("ID_SESION", "DIA", "BLOQUE_ORDEN", "ID_AULA"):
+        if col not in df.columns:
+            df[col] = ""
+    # Filas sin día ni bloque = sesión que no se programa en este archivo
+    df = df[(df["DIA"].str.strip() != "") | (df["BLOQUE_ORDEN"].str.strip() != "")].copy()
+
+    df["id_sesion"] = _numero(df["ID_SESION"])
+    df["orden"] = _numero(df["BLOQUE_ORDEN"])
+    df["id_aula"] = _numero(df["ID_AULA"])
+    df["dia"] = df["DIA"].str.strip().str.capitalize()
+    df["error"] = ""
+
+    def marcar(mascara: pd.Series, mensaje) -> None:
+        mascara = mascara & (df["error"] == "")
+        if mascara.any():
+            df.loc[mascara, "error"] = mensaje(df[mascara]) if callable(mensaje) else mensaje
+
+    aula_mal = (df["ID_AULA"].str.strip() != "") & df["id_aula"].isna()
+    marcar(df["id_sesion"].isna() | df["orden"].isna() | aula_mal,
+           "Error de formato: ID_SESION, BLOQUE_ORDEN e ID_AULA deben ser números")
+
+    df = df.merge(sesiones, on="id_sesion", how="left")
+    marcar(df["id_grupo"].isna(), lambda d: "Sesión " + d["ID_SESION"].str.strip() + " no encontrada en el periodo.")
+
+    # (día, orden) -> bloque del turno del grupo; si el grupo no tiene turno, cualquier bloque
+    df = df.merge(bloques, on=["dia", "orden", "id_turno"], how="left")
+    sin_turno = df["id_turno"].isna() & df["id_bloque"].isna()
+    if sin_turno.any():
+        libres = bloques.sort_values("id_bloque").drop_duplicates(["dia", "orden"]).set_index(["dia", "orden"])["id_bloque"]
+        claves = pd.MultiIndex.from_frame(df.loc[sin_turno, ["dia", "orden"]])
+        df.loc[sin_turno, "id_bloque"] = libres.reindex(claves).to_numpy()
+    marcar(df["id_bloque"].isna(),
+           lambda d: "Bloque inválido: " + d["DIA"].str.strip() + " - " + d["BLOQUE_ORDEN"].str.strip())
+
+    marcar(df["id_aula"].notna() & ~df["id_aula"].isin(list(aulas)),
+           lambda d: "Aula " + d["ID_AULA"].str.strip() + " no existe.")
+
+    dia_docente = pd.Series(list(zip(df["id_docente"], df["dia"])), index=df.index, dtype=object)
+    marcar(df["id_docente"].notna() & dia_docente.isin(bloqueados),
+           lambda d: "El docente tiene restricción el " + d["dia"] + ".")
+
+    for nombre, columnas, plantilla in CRUCES:
+        vivas = df[columnas].notna().all(axis=1) & (df["error"] == "")
+        claves = pd.Series(list(zip(*(df.loc[vivas, c].tolist() for c in columnas))), index=df.index[vivas], dtype=object)
+        # Choca con lo guardado, o con una fila anterior (válida) del mismo archivo
+        choque = (claves.isin(ocupados[nombre]) | claves.duplicated()).reindex(df.index, fill_value=False)
+        marcar(choque, lambda d, p=plantilla: [p.format(grupo=g, id_aula=_entero(a), ciclo=_entero(c))
+                                               for g, a, c in zip(d["grupo"], d["id_aula"], d["ciclo"])])
+
+    # Tope de horas: lo guardado + las filas válidas anteriores de la misma sesión (en orden de archivo);
+    # pasado el tope las filas siguientes ya no suman, de ahí el clip
+    vivas = df["error"] == ""
+    df["asignadas"] = (df.loc[vivas, "id_sesion"].map(ocupados["horas"]).fillna(0)
+                       + df[vivas].groupby("id_sesion").cumcount()).clip(upper=df["duracion_horas"])
+    marcar(vivas & df["duracion_horas"].notna() & (df["asignadas"] >= df["duracion_horas"]),
+           lambda d: [f"La sesión ya está completa ({int(n)}/{int(h)} horas)."
+                      for n, h in zip(d["asignadas"], d["duracion_horas"])])
+
+    validas = df[df["error"] == ""]
+    for nombre, columnas, _ in CRUCES:
+        ocupados[nombre] |= _claves(validas, columnas)
+    ocupados["horas"] = ocupados["horas"].add(validas["id_sesion"].value_counts(), fill_value=0)
+    return df
+
+
+# =====================================================================
+#  3. PIPELINE
+# =====================================================================
+
+async def _copiar_a_staging(db: AsyncSession, validas: pd.DataFrame) -> None:
+    """COPY binario de asyncpg: un viaje por lote, sin objetos ORM."""
+    registros = [
+        (int(f), int(s), int(b), None if pd.isna(a) else int(a), int(c), str(g))
+        for f, s, b, a, c, g in zip(validas["fila"], validas["id_sesion"], validas["id_bloque"],
+                                     validas["id_aula"], validas["ciclo"], validas["grupo"])
+    ]
+    conexion = await (await db.connection()).get_raw_connection()
+    await conexion.driver_connection.copy_records_to_table(
+        STAGING, records=registros, columns=["fila", "id_sesion", "id_bloque", "id_aula", "ciclo", "grupo"]
+    )
+
+
+async def importar_horarios_csv(db: AsyncSession, id_periodo: int, archivo: IO[bytes], confirmar_guardado: bool) -> dict:
+    """
+    Importa el CSV de la plantilla (ID_SESION, DIA, BLOQUE_ORDEN, ID_AULA) por lotes:
+    1. Lee FILAS_POR_LOTE filas (en un hilo) y las resuelve contra los mapas con merge.
+    2. Valida por conjuntos: sesión del periodo, bloque, aula, día bloqueado del docente,
+       cruces de grupo/docente/aula/casilla y horas de la sesión, contra lo guardado y
+       contra las filas anteriores del archivo.
+    3. Si se confirma, las filas válidas van por COPY a una tabla temporal y al final un solo
+       INSERT ... SELECT las pasa a horario (una transacción: todo o nada). Las casillas
+       vacías del esqueleto se llenan (upsert sobre la casilla), las ocupadas no se pisan.
+    Mismas respuestas que antes: status error / valid / success.
+    """
+    sesiones = await _sesiones(db, id_periodo)
+    bloques = await _bloques(db)
+    aulas = set((await db.execute(select(Aula.id))).scalars().all())
+    ocupados = await _ocupados(db, id_periodo)
+    bloqueados = await _dias_bloqueados(db)
+
+    if confirmar_guardado:
+        await db.execute(text(
+            f"CREATE TEMP TABLE {STAGING} (fila integer, id_sesion integer, id_bloque integer, "
+            f"id_aula integer, ciclo integer, grupo varchar(50)) ON COMMIT DROP"
+        ))
+
+    lector = pd.read_csv(archivo, dtype=str, keep_default_na=False, chunksize=FILAS_POR_LOTE, encoding="utf-8-sig")
+    errores, total_errores, total_validas, fila_inicio = [], 0, 0, 2
+    while True:
+        lote: Optional[pd.DataFrame] = await run_in_threadpool(next, lector, None)
+        if lote is None:
+            break
+        lote["fila"] = range(fila_inicio, fila_inicio + len(lote))
+        fila_inicio += len(lote)
+
+        df = _resolver_lote(lote, sesiones, bloques, aulas, ocupados, bloqueados)
+        malas = df[df["error"] != ""]
+        total_errores += len(malas)
+        for fila, error in zip(malas["fila"], malas["error"]):
+            if len(errores) < MAX_DETALLES:
+                errores.append({"fila": int(fila), "error": error})
+
+        validas = df[df["error"] == ""]
+        total_validas += len(validas)
+        # Con errores ya no se guarda nada: solo se sigue validando para reportarlos todos
+        if confirmar_guardado and not total_errores and len(validas):
+            await _copiar_a_staging(db, validas)
+
+    if total_errores:
+        await db.rollback()
+        return {"status": "error", "total_errores": total_errores, "detalles": errores}
+
+    if not confirmar_guardado:
+        await db.rollback()
+        return {"status": "valid", "message": f"Validación exitosa ({total_validas} horarios)."}
+
+    try:
+        guardadas = (await db.execute(text(f"""
+            WITH guardadas AS (
+                INSERT INTO horario (id_sesion, id_bloque, id_aula, id_periodo, ciclo, grupo, estado)
+                SELECT id_sesion, id_bloque, id_aula, :id_periodo, ciclo, grupo, 1
+                FROM {STAGING} ORDER BY fila
+                ON CONFLICT ON CONSTRAINT uq_horario_casilla DO UPDATE
+                SET id_sesion = EXCLUDED.id_sesion, id_aula = EXCLUDED.id_aula, estado = 1
+                WHERE horario.id_sesion IS NULL
+                RETURNING 1
+            )
+            SELECT count(*) FROM guardadas
+        """), {"id_periodo": id_periodo})).scalar()
+        if guardadas < total_validas:
+            # Una casilla que se validó vacía ya tiene sesión (otro usuario o una fila inactiva)
+            await db.rollback()
+            return {"status": "error", "detalles": [{"fila": None, "error": "CRUCE de casilla al guardar el lote. Nada fue guardado."}]}
+        await db.commit()
+    except IntegrityError as e:
+        # Algo guardado por otro usuario mientras se validaba
+        await db.rollback()
+        tipo = tipo_cruce(e)
+        if tipo is None:
+            raise
+        return {"status": "error", "detalles": [{"fila": None, "error": f"CRUCE de {tipo} al guardar el lote. Nada fue guardado."}]}
+    return {"status": "success", "message": f"Guardados {total_validas} horarios."}
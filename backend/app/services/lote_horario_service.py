@@ -0,0 +1,190 @@
+from typing import Dict, List, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update
+from sqlalchemy.orm import joinedload
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from fastapi import HTTPException
+
+from app.models.horario import Horario
+from app.models.sesion import Sesion
+from app.models.grupo import Grupo
+from app.models.curso_aperturado import CursoAperturado
+from app.models.bloque_horario import BloqueHorario
+from app.schemas.horario import LoteMovimientos
+
+
+async def planificar_lote(db: AsyncSession, lote: LoteMovimientos) -> Tuple[List[dict], List[str]]:
+    """
+    Calcula cómo queda el horario DESPUÉS de aplicar todos los movimientos e intercambios
+    y lo valida de una sola vez (contra sí mismo y contra el resto del periodo).
+    Las sesiones que se mueven no chocan con su posición anterior: esa posición se libera.
+    Retorna (filas_a_guardar, errores de cruce). Si hay errores no se debe guardar nada.
+    Un lote mal armado no es un cruce: sesión, bloque o casilla inexistente -> 404;
+    sesión repetida o sin espacio en el día -> 422.
+    """
+    errores: List[str] = []
+
+    # 1. DESTINOS: {id_sesion: (id_bloque_inicio, id_aula)}
+    destinos: Dict[int, Tuple[int, int]] = {}
+    repetidas: List[str] = []
+    for m in lote.movimientos:
+        if m.id_sesion in destinos:
+            repetidas.append(f"La sesión {m.id_sesion} aparece más de una vez en el lote.")
+        destinos[m.id_sesion] = (m.id_bloque, m.id_aula)
+
+    # Los intercambios necesitan la posición actual de ambas sesiones
+    ids_intercambio = {i.id_sesion_a for i in lote.intercambios} | {i.id_sesion_b for i in lote.intercambios}
+    actuales: Dict[int, Tuple[int, int]] = {}
+    if ids_intercambio:
+        stmt_actual = (
+            select(Horario.id_sesion, Horario.id_bloque, Horario.id_aula)
+            .join(BloqueHorario, BloqueHorario.id == Horario.id_bloque)
+            .where(
+                Horario.id_periodo == lote.id_periodo,
+                Horario.estado == 1,
+                Horario.id_sesion.in_(ids_intercambio)
+            )
+            .order_by(Horario.id_sesion, BloqueHorario.orden)
+        )
+        for id_sesion, id_bloque, id_aula in (await db.execute(stmt_actual)).all():
+            # Nos quedamos con el primer bloque (el de menor orden) de cada sesión
+            actuales.setdefault(id_sesion, (id_bloque, id_aula))
+
+    sin_horario: List[str] = []
+    for i in lote.intercambios:
+        faltan = [s for s in (i.id_sesion_a, i.id_sesion_b) if s not in actuales]
+        if faltan:
+            sin_horario.append(f"No se puede intercambiar: la sesión {faltan[0]} no está en el horario.")
+            continue
+        for origen, destino in ((i.id_sesion_a, i.id_sesion_b), (i.id_sesion_b, i.id_sesion_a)):
+            if origen in destinos:
+                repetidas.append(f"La sesión {origen} aparece más de una vez en el lote.")
+            destinos[origen] = actuales[destino]
+
+    if repetidas:
+        raise HTTPException(422, " | ".join(repetidas))
+    if sin_horario:
+        raise HTTPException(404, " | ".join(sin_horario))
+    if not destinos:
+        return [], errores
+
+    # 2. SESIONES del periodo (ciclo, nombre de grupo, docente) en una sola consulta
+    stmt_sesiones = (
+        select(Sesion)
+        .join(Grupo, Sesion.id_grupo == Grupo.id)
+        .join(CursoAperturado, Grupo.id_curso_aperturado == CursoAperturado.id)
+        .options(
+            joinedload(Sesion.grupo).joinedload(Grupo.curso_aperturado).joinedload(CursoAperturado.curso),
+            joinedload(Sesion.grupo).joinedload(Grupo.docente)
+        )
+        .where(Sesion.id.in_(destinos.keys()), CursoAperturado.id_periodo == lote.id_periodo)
+    )
+    sesiones = {s.id: s for s in (await db.execute(stmt_sesiones)).scalars().all()}
+    no_encontradas = [f"Sesión {id_sesion} no encontrada en el periodo." for id_sesion in destinos if id_sesion not in sesiones]
+    if no_encontradas:
+        raise HTTPException(404, " | ".join(no_encontradas))
+
+    # 3. BLOQUES de los turnos involucrados: {(id_turno, dia): [bloques por orden]}
+    ids_inicio = {id_bloque for id_bloque, _ in destinos.values()}
+    turnos = select(BloqueHorario.id_turno).where(BloqueHorario.id.in_(ids_inicio)).scalar_subquery()
+    stmt_bloques = select(BloqueHorario).where(BloqueHorario.id_turno.in_(turnos)).order_by(BloqueHorario.orden)
+    bloques = {b.id: b for b in (await db.execute(stmt_bloques)).scalars().all()}
+    por_dia: Dict[tuple, List[BloqueHorario]] = {}
+    for b in bloques.values():
+        por_dia.setdefault((b.id_turno, b.dia_semana), []).append(b)
+
+    def nombre_bloque(id_bloque: int) -> str:
+        b = bloques[id_bloque]
+        return f"{b.dia_semana} (bloque {b.orden})"
+
+    # 4. ESTADO FINAL de las sesiones movidas (igual que guardar-asignacion: bloques seguidos desde el inicio)
+    filas: List[dict] = []
+    sin_bloque: List[str] = []
+    sin_espacio: List[str] = []
+    for id_sesion, (id_bloque, id_aula) in destinos.items():
+        sesion = sesiones[id_sesion]
+        inicio = bloques.get(id_bloque)
+        if not inicio:
+            sin_bloque.append(f"Bloque {id_bloque} no encontrado.")
+            continue
+        siguientes = [b for b in por_dia[(inicio.id_turno, inicio.dia_semana)] if b.orden >= inicio.orden]
+        siguientes = siguientes[:sesion.duracion_horas]
+        if len(siguientes) < sesion.duracion_horas:
+            sin_espacio.append(f"Sesión {id_sesion}: espacio insuficiente desde {nombre_bloque(id_bloque)}.")
+            continue
+
+        for b in siguientes:
+            filas.append({
+                "id_periodo": lote.id_periodo,
+                "id_bloque": b.id,
+                "id_sesion": id_sesion,
+                "id_aula": id_aula,
+                "ciclo": sesion.grupo.curso_aperturado.curso.ciclo,
+                "grupo": sesion.grupo.nombre,
+                "estado": 1,
+            })
+    if sin_bloque:
+        raise HTTPException(404, " | ".join(sin_bloque))
+    if sin_espacio:
+        raise HTTPException(422, " | ".join(sin_espacio))
+
+    # 5. VALIDAR: mismas reglas que los índices de horario (casilla, grupo, docente, aula)
+    def claves(id_bloque, ciclo, nombre_grupo, id_grupo, id_docente, id_aula, nombre_docente=None):
+        yield ("CASILLA", id_bloque, ciclo, nombre_grupo), f"El ciclo {ciclo} grupo '{nombre_grupo}' ya tiene clase"
+        yield ("GRUPO", id_bloque, id_grupo), f"El grupo '{nombre_grupo}' ya tiene clase"
+        if id_docente:
+            yield ("DOCENTE", id_bloque, id_docente), f"El docente {nombre_docente or id_docente} ya dicta"
+        if id_aula:
+            yield ("AULA", id_bloque, id_aula), f"El aula ID {id_aula} ya está ocupada"
+
+    ocupado: Dict[tuple, int] = {}
+
+    # 5a. Lo que NO se mueve sigue en su lugar
+    stmt_fijos = select(
+        Horario.id_sesion, Horario.id_bloque, Horario.ciclo, Horario.grupo,
+        Horario.id_grupo, Horario.id_docente, Horario.id_aula
+    ).where(
+        Horario.id_periodo == lote.id_periodo,
+        Horario.estado == 1,
+        Horario.id_bloque.in_({f["id_bloque"] for f in filas}),
+        Horario.id_sesion.is_not(None),
+        Horario.id_sesion.notin_(destinos.keys())
+    )
+    for id_sesion, id_bloque, ciclo, nombre_grupo, id_grupo, id_docente, id_aula in (await db.execute(stmt_fijos)).all():
+        for clave, _ in claves(id_bloque, ciclo, nombre_grupo, id_grupo, id_docente, id_aula):
+            ocupado[clave] = id_sesion
+
+    # 5b. Las sesiones movidas contra lo fijo y entre ellas
+    for f in filas:
+        grupo = sesiones[f["id_sesion"]].grupo
+        nombre_docente = grupo.docente.nombre if grupo.docente else None
+        for clave, mensaje in claves(f["id_bloque"], f["ciclo"], f["grupo"], grupo.id, grupo.id_docente, f["id_aula"], nombre_docente):
+            otra = ocupado.get(clave)
+            if otra is not None and otra != f["id_sesion"]:
+                # Un solo mensaje por casilla (el primero que choque)
+                errores.append(f"Sesión {f['id_sesion']}: {mensaje} en {nombre_bloque(f['id_bloque'])} (sesión {otra}).")
+                break
+            ocupado[clave] = f["id_sesion"]
+
+    return filas, errores
+
+
+async def guardar_lote(db: AsyncSession, id_periodo: int, filas: List[dict]) -> None:
+    """
+    Aplica un lote ya validado: vacía la posición anterior de las sesiones movidas
+    (queda el esqueleto, igual que en guardar-asignacion) y las pone en la nueva con
+    un solo upsert sobre la casilla. El commit lo hace el llamador.
+    """
+    ids_sesion = {f["id_sesion"] for f in filas}
+    await db.execute(
+        update(Horario)
+        .where(Horario.id_periodo == id_periodo, Horario.id_sesion.in_(ids_sesion))
+        .values(id_sesion=None, id_aula=None)
+    )
+
+    stmt = pg_insert(Horario).values(filas)
+    stmt = stmt.on_conflict_do_update(
+        constraint='uq_horario_casilla',
+        set_={"id_sesion": stmt.excluded.id_sesion, "id_aula": stmt.excluded.id_aula, "estado": 1}
+    )
+    await db.execute(stmt)
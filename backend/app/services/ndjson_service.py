@@ -0,0 +1,37 @@
+import json
+from typing import Any, Callable
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+
+from app.core.database import SessionLocal
+
+MEDIA_NDJSON = "application/x-ndjson"
+
+
+def pide_ndjson(request: Request) -> bool:
+    """El cliente pidió streaming con `Accept: application/x-ndjson` (opt-in)."""
+    return MEDIA_NDJSON in request.headers.get("accept", "")
+
+
+def a_linea(obj: Any) -> str:
+    """Serialización por defecto: la misma que jsonable_encoder usa para la respuesta JSON."""
+    return json.dumps(jsonable_encoder(obj), ensure_ascii=False)
+
+
+def respuesta_ndjson(stmt, serializar: Callable[[Any], str] = a_linea, lote: int = 500, headers: dict = None) -> StreamingResponse:
+    """
+    Una línea JSON por fila, enviada mientras se lee.
+    - Cursor del lado del servidor (stream + yield_per): en memoria solo hay `lote` filas a la vez,
+      sin importar el tamaño del periodo; el primer byte sale con el primer lote.
+    - Sesión propia: la del request (get_db) puede cerrarse antes de terminar el streaming.
+    - `stmt` no debe usar joinedload de colecciones (no es compatible con yield_per): usar selectinload.
+    """
+    async def lineas():
+        async with SessionLocal() as db:
+            result = await db.stream_scalars(stmt.execution_options(yield_per=lote))
+            async for filas in result.partitions():
+                yield "".join(serializar(f) + "\n" for f in filas)
+
+    return StreamingResponse(lineas(), media_type=MEDIA_NDJSON, headers=headers)
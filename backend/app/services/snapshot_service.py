@@ -0,0 +1,138 @@
+from pathlib import Path
+from typing import AsyncIterator, IO, Union
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import SessionLocal
+from app.models.aula import Aula
+from app.models.bloque_horario import BloqueHorario
+from app.models.curso import Curso
+from app.models.curso_aperturado import CursoAperturado
+from app.models.docente import Docente
+from app.models.grupo import Grupo
+from app.models.horario import Horario
+from app.models.periodo_academico import PeriodoAcademico
+from app.models.sesion import Sesion
+from app.models.turno import Turno
+from app.services.exportacion_service import Tubo
+
+MEDIA_PARQUET = "application/vnd.apache.parquet"
+
+# Filas por row group: es lo que hay en memoria a la vez (y la unidad de lectura en pandas)
+FILAS_POR_GRUPO = 50_000
+
+_TEXTO = pa.dictionary(pa.int32(), pa.string())
+
+# Snapshot desnormalizado: una fila por casilla asignada (horario) de cada sesión del
+# periodo; las sesiones sin asignar salen una vez, con bloque y aula nulos.
+# Los textos van como diccionario: en pandas se leen como category.
+ESQUEMA = pa.schema([
+    ("id_periodo", pa.int32()), ("periodo", _TEXTO),
+    ("id_sesion", pa.int32()), ("tipo_sesion", _TEXTO), ("duracion_horas", pa.int16()),
+    ("id_grupo", pa.int32()), ("grupo", _TEXTO), ("vacantes", pa.int32()),
+    ("id_curso", pa.int32()), ("codigo_curso", _TEXTO), ("curso", _TEXTO), ("ciclo", pa.int16()),
+    ("creditos", pa.int16()), ("tipo_curso", _TEXTO),
+    ("id_turno", pa.int32()), ("turno", _TEXTO),
+    ("id_docente", pa.int32()), ("docente", _TEXTO), ("tipo_docente", _TEXTO),
+    ("id_horario", pa.int32()), ("id_bloque", pa.int32()), ("dia_semana", _TEXTO),
+    ("orden", pa.int16()), ("hora_inicio", pa.time32("s")), ("hora_fin", pa.time32("s")),
+    ("id_aula", pa.int32()), ("aula", _TEXTO), ("pabellon", _TEXTO), ("aforo", pa.int32()),
+    ("tipo_aula", _TEXTO),
+])
+
+
+def consulta_snapshot(id_periodo: int):
+    """Consulta plana (solo columnas, en el orden de ESQUEMA): se lee por lotes con yield_per."""
+    return (
+        select(
+            CursoAperturado.id_periodo, PeriodoAcademico.codigo,
+            Sesion.id, Sesion.tipo_sesion, Sesion.duracion_horas,
+            Grupo.id, Grupo.nombre, Grupo.vacantes,
+            Curso.id, Curso.codigo, Curso.nombre, Curso.ciclo, Curso.creditos, Curso.tipo_curso,
+            Turno.id, Turno.nombre,
+            Docente.id, (Docente.apellido + " " + Docente.nombre), Docente.tipo_docente,
+            Horario.id, BloqueHorario.id, BloqueHorario.dia_semana,
+            BloqueHorario.orden, BloqueHorario.hora_inicio, BloqueHorario.hora_fin,
+            Aula.id, Aula.nombre, Aula.pabellon, Aula.aforo, Aula.tipo_aula,
+        )
+        .select_from(Sesion)
+        .join(Grupo, Sesion.id_grupo == Grupo.id)
+        .join(CursoAperturado, Grupo.id_curso_aperturado == CursoAperturado.id)
+        .join(PeriodoAcademico, CursoAperturado.id_periodo == PeriodoAcademico.id)
+        .join(Curso, CursoAperturado.id_curso == Curso.id)
+        .outerjoin(Turno, Grupo.id_turno == Turno.id)
+        .outerjoin(Docente, Grupo.id_docente == Docente.id)
+        .outerjoin(Horario, and_(Horario.id_sesion == Sesion.id, Horario.id_periodo == id_periodo,
+                                 Horario.estado == 1))
+        .outerjoin(BloqueHorario, Horario.id_bloque == BloqueHorario.id)
+        .outerjoin(Aula, Horario.id_aula == Aula.id)
+        .where(CursoAperturado.id_periodo == id_periodo)
+        .order_by(Sesion.id, Horario.id)
+    )
+
+
+def _a_lote(filas) -> pa.RecordBatch:
+    """Filas -> RecordBatch por columnas; los textos se codifican como diccionario."""
+    columnas = list(zip(*filas)) if filas else [()] * len(ESQUEMA)
+    arrays = []
+    for campo, valores in zip(ESQUEMA, columnas):
+        if pa.types.is_dictionary(campo.type):
+            arrays.append(pa.array(valores, type=pa.string()).dictionary_encode())
+        else:
+            arrays.append(pa.array(valores, type=campo.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=ESQUEMA)
+
+
+async def _lotes(db: AsyncSession, id_periodo: int, filas_por_grupo: int) -> AsyncIterator[pa.RecordBatch]:
+    result = await db.stream(consulta_snapshot(id_periodo).execution_options(yield_per=filas_por_grupo))
+    async for filas in result.partitions():
+        yield await run_in_threadpool(_a_lote, filas)
+
+
+def _escritor(destino: Union[str, Path, IO[bytes]]) -> pq.ParquetWriter:
+    return pq.ParquetWriter(destino, ESQUEMA, compression="zstd", use_dictionary=True)
+
+
+async def escribir_snapshot(db: AsyncSession, id_periodo: int, destino: Union[str, Path, IO[bytes]],
+                            filas_por_grupo: int = FILAS_POR_GRUPO) -> int:
+    """Escribe el snapshot del periodo en `destino` (un row group por lote). Devuelve las filas escritas."""
+    total = 0
+    escritor = _escritor(destino)
+    try:
+        async for lote in _lotes(db, id_periodo, filas_por_grupo):
+            await run_in_threadpool(escritor.write_batch, lote)
+            total += lote.num_rows
+    finally:
+        escritor.close()
+    return total
+
+
+def respuesta_snapshot(id_periodo: int, nombre: str, filas_por_grupo: int = FILAS_POR_GRUPO) -> StreamingResponse:
+    """
+    Envía el Parquet mientras se lee: cada lote del cursor se escribe como row group y sus
+    bytes salen enseguida; el pie del archivo va al final. Sesión propia, como en respuesta_ndjson.
+    """
+    async def contenido():
+        tubo = Tubo()
+        escritor = _escritor(tubo)
+        try:
+            async with SessionLocal() as db:
+                async for lote in _lotes(db, id_periodo, filas_por_grupo):
+                    await run_in_threadpool(escritor.write_batch, lote)
+                    yield tubo.vaciar()
+            escritor.close()
+            yield tubo.vaciar()
+        finally:
+            if escritor.is_open:
+                escritor.close()
+
+    return StreamingResponse(
+        contenido(),
+        media_type=MEDIA_PARQUET,
+        headers={"Content-Disposition": f'attachment; filename="{nombre}"'}
+    )
@@ -0,0 +1,96 @@
+import asyncio
+import json
+import traceback
+from typing import Dict, Set
+
+from fastapi import WebSocket
+from fastapi.encoders import jsonable_encoder
+
+from app.core.database import SessionLocal
+from app.core.pubsub import pubsub
+from app.schemas.horario import CambiosHorarioResponse
+from app.services.cambios_service import armar_cambios, cambios_desde
+
+# Canal compartido por todos los workers: el mensaje es solo el id del periodo
+CANAL = "horario_cambios"
+
+# Editores conectados a ESTE worker: {id_periodo: {websockets}}
+_conexiones: Dict[int, Set[WebSocket]] = {}
+# Último seq de horario_cambio ya enviado por periodo (los deltas salen desde ahí)
+_ultimo_seq: Dict[int, int] = {}
+# Un aviso a la vez por periodo: dos avisos seguidos no mandan el mismo delta dos veces
+_candados: Dict[int, asyncio.Lock] = {}
+
+
+async def iniciar() -> None:
+    """Se llama en el arranque, con el pubsub ya iniciado."""
+    await pubsub.suscribir(CANAL, _al_recibir)
+
+
+async def conectar(websocket: WebSocket, id_periodo: int) -> None:
+    await websocket.accept()
+    if id_periodo not in _conexiones:
+        # Primer editor del periodo en este worker: el delta arranca desde el seq actual
+        async with SessionLocal() as db:
+            _, seq, _ = await cambios_desde(db, id_periodo, 0)
+        _ultimo_seq[id_periodo] = seq
+    _conexiones.setdefault(id_periodo, set()).add(websocket)
+    await websocket.send_text(json.dumps({"tipo": "conectado", "id_periodo": id_periodo, "seq": _ultimo_seq[id_periodo]}))
+
+
+def desconectar(websocket: WebSocket, id_periodo: int) -> None:
+    sockets = _conexiones.get(id_periodo)
+    if not sockets:
+        return
+    sockets.discard(websocket)
+    if not sockets:
+        _conexiones.pop(id_periodo, None)
+        _ultimo_seq.pop(id_periodo, None)
+        _candados.pop(id_periodo, None)
+
+
+async def avisar(id_periodo: int) -> None:
+    """
+    Llamar DESPUÉS del commit de una escritura en la grilla del periodo.
+    Solo publica el id: cada worker arma el delta para sus propios editores.
+    Nunca hace fallar la petición que lo llama (el guardado ya está hecho).
+    """
+    try:
+        await pubsub.publicar(CANAL, str(id_periodo))
+    except Exception:
+        traceback.print_exc()
+
+
+async def _al_recibir(mensaje: str) -> None:
+    id_periodo = int(mensaje)
+    if id_periodo not in _conexiones:
+        return  # Nadie mira ese periodo en este worker
+
+    candado = _candados.setdefault(id_periodo, asyncio.Lock())
+    async with candado:
+        try:
+            desde = _ultimo_seq.get(id_periodo, 0)
+            async with SessionLocal() as db:
+                cambios = await armar_cambios(db, id_periodo, desde, cero_es_completo=False)
+
+            if cambios["seq"] == desde and cambios["modo"] == "delta":
+                return  # Otro aviso ya mandó estos cambios
+            _ultimo_seq[id_periodo] = cambios["seq"]
+
+            if cambios["modo"] == "completo":
+                # Bitácora compactada o desfasada: que el cliente recargue con GET /periodo/{id}
+                mensaje_ws = {"tipo": "recargar", "id_periodo": id_periodo, "seq": cambios["seq"]}
+            else:
+                cuerpo = CambiosHorarioResponse.model_validate(cambios, from_attributes=True)
+                mensaje_ws = {"tipo": "cambios", "id_periodo": id_periodo, "desde": desde, **jsonable_encoder(cuerpo)}
+            texto = json.dumps(mensaje_ws)
+        except Exception:
+            traceback.print_exc()
+            return
+
+        for websocket in list(_conexiones.get(id_periodo, ())):
+            try:
+                await websocket.send_text(texto)
+            except Exception:
+                # Socket muerto: se limpia aquí, el endpoint se enterará al leer
+                desconectar(websocket, id_periodo)
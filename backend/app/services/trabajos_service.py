@@ -0,0 +1,212 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+import traceback
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from jose import JWTError, jwt
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.periodo_academico import PeriodoAcademico
+from app.services import artefactos_service
+from app.services.version_service import version_periodo
+
+# Trabajos de exportación en segundo plano, un JSON por trabajo:
+#   RAIZ/{id}.json -> {"id", "tipo", "id_periodo", "filtros", "version", "estado", "ruta", "error", ...}
+# El id sale de (tipo, periodo, filtros, versión): pedir lo mismo a la vez da el mismo trabajo.
+# En disco y no en memoria: cualquier worker contesta el estado y la descarga.
+# El archivo en sí lo genera y guarda artefactos_service (render en el pool de procesos).
+RAIZ = Path(settings.EXPORT_CACHE_DIR) / "trabajos"
+
+EN_PROCESO, LISTO, ERROR = "en_proceso", "listo", "error"
+
+# Registros de trabajos terminados que se conservan (los archivos los limpia artefactos)
+_RETENER = 24 * 3600
+_ID = re.compile(r"[0-9a-f]{20}")
+
+_tareas = set()
+_ultima_limpieza = 0.0
+
+
+# =====================================================================
+#  1. REGISTRO EN DISCO
+# =====================================================================
+
+def _id(tipo: str, id_periodo: int, filtros: dict, version: int) -> str:
+    clave = json.dumps([tipo, id_periodo, filtros, version], sort_keys=True, default=str)
+    return hashlib.sha1(clave.encode()).hexdigest()[:20]
+
+
+def _ruta(id_trabajo: str) -> Path:
+    return RAIZ / f"{id_trabajo}.json"
+
+
+def _leer(id_trabajo: str) -> Optional[dict]:
+    if not _ID.fullmatch(id_trabajo):
+        return None
+    try:
+        return json.loads(_ruta(id_trabajo).read_text())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _temporal(trabajo: dict) -> Path:
+    trabajo["actualizado"] = time.time()
+    RAIZ.mkdir(parents=True, exist_ok=True)
+    tmp = RAIZ / f".{trabajo['id']}-{os.getpid()}-{id(trabajo)}.tmp"
+    tmp.write_text(json.dumps(trabajo, default=str))
+    return tmp
+
+
+def _crear(trabajo: dict) -> bool:
+    """Alta atómica: si otro worker creó el mismo trabajo un instante antes, gana el suyo."""
+    tmp = _temporal(trabajo)
+    try:
+        os.link(tmp, _ruta(trabajo["id"]))
+        return True
+    except FileExistsError:
+        return False
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def _relevar(anterior: dict, nuevo: dict) -> bool:
+    """
+    Toma un trabajo vencido o con error. Como en _crear, gana un solo worker: el testigo
+    lleva la marca del registro viejo y os.link falla para los demás que vieron el mismo.
+    """
+    testigo = RAIZ / f".{anterior['id']}-{anterior['actualizado']!r}.relevo"
+    tmp = _temporal(nuevo)
+    try:
+        os.link(tmp, testigo)
+    except FileExistsError:
+        tmp.unlink(missing_ok=True)
+        return False
+    os.replace(tmp, _ruta(nuevo["id"]))
+    return True
+
+
+def _escribir(trabajo: dict) -> None:
+    os.replace(_temporal(trabajo), _ruta(trabajo["id"]))
+
+
+def _limpiar() -> None:
+    limite = time.time() - _RETENER
+    for archivo in [*RAIZ.glob("*.json"), *RAIZ.glob(".*.relevo")]:
+        try:
+            if archivo.stat().st_mtime < limite:
+                archivo.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _vigente(trabajo: Optional[dict]) -> bool:
+    """¿Sirve el trabajo existente o hay que lanzarlo otra vez?"""
+    if trabajo is None or trabajo["estado"] == ERROR:
+        return False
+    if trabajo["estado"] == EN_PROCESO:
+        # El worker que lo corría pudo morir: pasado el plazo se reintenta
+        return time.time() - trabajo["actualizado"] < settings.EXPORT_TRABAJO_TIMEOUT
+    return Path(trabajo["ruta"]).is_file()
+
+
+# =====================================================================
+#  2. EJECUCIÓN
+# =====================================================================
+
+async def _ejecutar(trabajo: dict) -> None:
+    try:
+        # Sesión propia: el request que lo pidió ya respondió 202
+        async with SessionLocal() as db:
+            ruta = await artefactos_service.obtener(db, trabajo["tipo"], trabajo["id_periodo"], trabajo["filtros"])
+        trabajo.update(estado=LISTO, ruta=str(ruta), error=None)
+    except HTTPException as e:
+        trabajo.update(estado=ERROR, error=e.detail)
+    except Exception as e:
+        traceback.print_exc()
+        trabajo.update(estado=ERROR, error=str(e) or type(e).__name__)
+    await run_in_threadpool(_escribir, trabajo)
+
+
+def _lanzar(trabajo: dict) -> None:
+    tarea = asyncio.create_task(_ejecutar(trabajo))
+    _tareas.add(tarea)
+    tarea.add_done_callback(_tareas.discard)
+
+
+async def enviar(db: AsyncSession, tipo: str, id_periodo: int, filtros: Optional[dict] = None) -> dict:
+    """
+    Pide una exportación y devuelve el trabajo enseguida (sin esperar el archivo).
+    Mismo tipo + periodo + filtros sobre la misma versión del periodo = mismo trabajo:
+    las peticiones repetidas se suman al que ya corre o reciben el que ya terminó.
+    """
+    global _ultima_limpieza
+    filtros = artefactos_service.normalizar(tipo, filtros)
+    if not await db.get(PeriodoAcademico, id_periodo):
+        raise HTTPException(404, "Periodo no encontrado")
+    version = await version_periodo(db, id_periodo)
+    id_trabajo = _id(tipo, id_periodo, filtros, version)
+
+    if time.time() - _ultima_limpieza > 3600:
+        _ultima_limpieza = time.time()
+        await run_in_threadpool(_limpiar)
+
+    trabajo = await run_in_threadpool(_leer, id_trabajo)
+    if _vigente(trabajo):
+        return trabajo
+
+    nuevo = {"id": id_trabajo, "tipo": tipo, "id_periodo": id_periodo, "filtros": filtros, "version": version,
+             "estado": EN_PROCESO, "ruta": None, "error": None, "creado": time.time()}
+    if trabajo is None:
+        tomado = await run_in_threadpool(_crear, nuevo)
+    else:
+        tomado = await run_in_threadpool(_relevar, trabajo, nuevo)
+    if not tomado:
+        return await run_in_threadpool(_leer, id_trabajo)
+    _lanzar(nuevo)
+    return nuevo
+
+
+async def consultar(id_trabajo: str) -> dict:
+    trabajo = await run_in_threadpool(_leer, id_trabajo)
+    if trabajo is None:
+        raise HTTPException(404, "Trabajo no encontrado")
+    return trabajo
+
+
+# =====================================================================
+#  3. TOKEN DE DESCARGA
+# =====================================================================
+
+def emitir_token(id_trabajo: str) -> tuple:
+    """
+    JWT corto que solo sirve para bajar el archivo de ese trabajo: se puede pasar en un
+    enlace sin exponer el token de sesión. Sin 'sub': get_current_user no lo acepta.
+    Devuelve (token, expira).
+    """
+    expira = datetime.now(timezone.utc) + timedelta(minutes=settings.EXPORT_TOKEN_MINUTOS)
+    token = jwt.encode({"descarga": id_trabajo, "exp": expira}, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    return token, expira
+
+
+async def trabajo_del_token(token: str) -> dict:
+    """Trabajo terminado al que apunta el token (401 si no vale, 410 si el archivo ya no está)."""
+    try:
+        id_trabajo = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]).get("descarga")
+    except JWTError:
+        id_trabajo = None
+    if not id_trabajo:
+        raise HTTPException(401, "Token de descarga inválido o expirado")
+    trabajo = await run_in_threadpool(_leer, id_trabajo)
+    if trabajo is None or trabajo["estado"] != LISTO or not Path(trabajo["ruta"]).is_file():
+        raise HTTPException(410, "El archivo ya no está disponible. Vuelva a solicitar la exportación.")
+    return trabajo
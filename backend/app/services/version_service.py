@@ -0,0 +1,70 @@
+from typing import Awaitable, Callable, Optional
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from app.core.cache import CacheTTL
+from app.models.periodo_version import PeriodoVersion
+from app.services.ndjson_service import pide_ndjson
+
+# Respuestas ya serializadas: {(recurso, id_periodo, version): bytes}
+_cache_respuestas = CacheTTL(max_items=256, ttl=600)
+
+
+async def version_periodo(db: AsyncSession, id_periodo: int) -> int:
+    """
+    Versión de escritura del periodo (la suben los triggers de periodo_version).
+    0 si el periodo nunca se ha tocado.
+    """
+    stmt = select(PeriodoVersion.version).where(PeriodoVersion.id_periodo == id_periodo)
+    return (await db.execute(stmt)).scalar() or 0
+
+
+def etag_coincide(request: Request, etag: str) -> bool:
+    cabecera = request.headers.get("if-none-match")
+    if not cabecera:
+        return False
+    candidatos = [c.strip().removeprefix("W/") for c in cabecera.split(",")]
+    return "*" in candidatos or etag in candidatos
+
+
+async def respuesta_versionada(
+    request: Request,
+    db: AsyncSession,
+    recurso: str,
+    id_periodo: int,
+    generar: Callable[[], Awaitable[bytes]],
+    flujo: Optional[Callable[[], Response]] = None
+) -> Response:
+    """
+    GET condicional para lecturas de un periodo.
+    - ETag = recurso + periodo + versión. Si el cliente ya lo tiene -> 304 sin cuerpo.
+    - Si no, el cuerpo sale del caché (recurso, periodo, versión) y solo se llama
+      a `generar` (la consulta pesada) cuando esa versión aún no se ha servido.
+    La única consulta fija es la lectura de la versión (una fila por PK).
+    Con `flujo` y `Accept: application/x-ndjson` el cuerpo no se cachea: se transmite
+    fila por fila (ver ndjson_service), con su propio ETag.
+    """
+    version = await version_periodo(db, id_periodo)
+    ndjson = flujo is not None and pide_ndjson(request)
+    if ndjson:
+        recurso = f"{recurso}-ndjson"
+    etag = f'"{recurso}-{id_periodo}-v{version}"'
+    # no-cache = el navegador guarda la respuesta pero siempre revalida con If-None-Match
+    cabeceras = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if etag_coincide(request, etag):
+        return Response(status_code=304, headers=cabeceras)
+
+    if ndjson:
+        respuesta = flujo()
+        respuesta.headers.update(cabeceras)
+        return respuesta
+
+    clave = (recurso, id_periodo, version)
+    cuerpo = _cache_respuestas.get(clave)
+    if cuerpo is None:
+        cuerpo = await generar()
+        _cache_respuestas.set(clave, cuerpo)
+
+    return Response(content=cuerpo, media_type="application/json", headers=cabeceras)
@@ -0,0 +1,70 @@
+"""
+Benchmark: ráfaga de logins (bcrypt) vs. el resto de peticiones del mismo worker.
+
+Simula N logins simultáneos (como al inicio del semestre) y, mientras tanto, una
+petición liviana cada 10 ms (como las de la grilla). Mide cuánto se atrasan las livianas:
+  - 'sync'  : bcrypt dentro del event loop (como antes)
+  - 'pool'  : verify_password_async (hilos dedicados, BCRYPT_WORKERS)
+
+Uso (desde backend/):
+    python bench_bcrypt.py --logins 30 --rounds 12
+No necesita base de datos.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--logins", type=int, default=30)
+parser.add_argument("--rounds", type=int, default=12)
+parser.add_argument("--workers", type=int, default=2)
+args = parser.parse_args()
+
+# La configuración se lee al importar app.core
+os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+os.environ["BCRYPT_WORKERS"] = str(args.workers)
+from app.core.security import get_password_hash, verify_password, verify_password_async  # noqa: E402
+
+HASH = get_password_hash("clave-de-prueba")
+
+
+async def login_sync():
+    verify_password("clave-de-prueba", HASH)
+
+
+async def login_pool():
+    await verify_password_async("clave-de-prueba", HASH)
+
+
+async def peticiones_livianas(fin: asyncio.Event, atrasos: list):
+    """Cada 10 ms una petición que debería responder al instante; guarda su atraso."""
+    while not fin.is_set():
+        inicio = time.perf_counter()
+        await asyncio.sleep(0.01)
+        atrasos.append((time.perf_counter() - inicio - 0.01) * 1000)
+
+
+async def medir(nombre: str, login):
+    fin, atrasos = asyncio.Event(), []
+    livianas = asyncio.create_task(peticiones_livianas(fin, atrasos))
+    inicio = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(args.logins)))
+    total = time.perf_counter() - inicio
+    fin.set()
+    await livianas
+
+    atrasos.sort()
+    p95 = atrasos[int(len(atrasos) * 0.95) - 1] if len(atrasos) > 1 else atrasos[0]
+    print(f"{nombre:5} | ráfaga {total:6.2f} s | livianas atendidas {len(atrasos):4} | "
+          f"atraso mediana {statistics.median(atrasos):8.1f} ms | p95 {p95:8.1f} ms | máx {atrasos[-1]:8.1f} ms")
+
+
+async def main():
+    print(f"{args.logins} logins, bcrypt rounds={args.rounds}, hilos={args.workers}")
+    await medir("sync", login_sync)
+    await medir("pool", login_pool)
+
+
+asyncio.run(main())
@@ -0,0 +1,57 @@
+"""
+Exporta snapshots en Parquet de uno o varios periodos (mismo contenido que
+GET /horarios/snapshot/{id_periodo}), un archivo por periodo:
+    {salida}/snapshot_{codigo}.parquet
+
+Uso (desde backend/):
+    python exportar_snapshot.py --periodo 3 --periodo 4 --salida snapshots/
+    python exportar_snapshot.py --todos --salida snapshots/
+
+Todos los archivos tienen el mismo esquema, así que la carpeta se lee de una vez:
+    pd.read_parquet("snapshots/")
+"""
+import argparse
+import asyncio
+import re
+import time
+from pathlib import Path
+
+from sqlalchemy import select
+
+from app.core.database import SessionLocal, engine
+from app.models.periodo_academico import PeriodoAcademico
+from app.services.snapshot_service import FILAS_POR_GRUPO, escribir_snapshot
+
+def leer_argumentos(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Snapshot Parquet de periodos académicos")
+    grupo = parser.add_mutually_exclusive_group(required=True)
+    grupo.add_argument("--periodo", type=int, action="append", help="ID del periodo (se puede repetir)")
+    grupo.add_argument("--todos", action="store_true", help="Todos los periodos")
+    parser.add_argument("--salida", default="snapshots", help="Carpeta destino")
+    parser.add_argument("--filas-por-grupo", type=int, default=FILAS_POR_GRUPO)
+    return parser.parse_args(argv)
+
+
+async def main(args: argparse.Namespace):
+    salida = Path(args.salida)
+    salida.mkdir(parents=True, exist_ok=True)
+    async with SessionLocal() as db:
+        stmt = select(PeriodoAcademico.id, PeriodoAcademico.codigo).order_by(PeriodoAcademico.id)
+        if not args.todos:
+            stmt = stmt.where(PeriodoAcademico.id.in_(args.periodo))
+        periodos = (await db.execute(stmt)).all()
+        faltan = set(args.periodo or []) - {p.id for p in periodos}
+        if faltan:
+            print(f"Periodos no encontrados: {sorted(faltan)}")
+
+        for id_periodo, codigo in periodos:
+            nombre = re.sub(r"[^\w.-]+", "_", codigo or str(id_periodo))
+            destino = salida / f"snapshot_{nombre}.parquet"
+            inicio = time.perf_counter()
+            filas = await escribir_snapshot(db, id_periodo, destino, args.filas_por_grupo)
+            print(f"{destino}: {filas} filas en {time.perf_counter() - inicio:.2f}s")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(leer_argumentos()))
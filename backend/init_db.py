@@ -6,8 +6,8 @@ import logging
 # if sys.platform == 'win32':
 #     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
-from app.core.database import engine, SessionLocal
-from app.models.base import Base
+from app.core.database import SessionLocal
+from app.core.migraciones import preparar_bd
 
 # Importamos SOLO lo que existe
 from app.models import Usuario, Escuela, Catalogo 
@@ -18,9 +18,8 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 async def init_db():
-    async with engine.begin() as conn:
-        # 1. Crear Tablas
-        await conn.run_sync(Base.metadata.create_all)
+    # 1. Crear Tablas (BD nueva) o aplicar las migraciones pendientes
+    await preparar_bd()
     
     async with SessionLocal() as db:
         # 2. Crear SuperAdmin
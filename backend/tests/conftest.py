@@ -0,0 +1,53 @@
+"""
+Utilidades comunes de los tests que necesitan Postgres.
+
+El fixture base_temporal da crear_base_temporal(): una base vacía junto a la de
+DATABASE_URL (o TEST_DATABASE_URL), con todas las tablas y triggers, que se borra
+al salir. Sin servidor, el test se salta.
+"""
+import os
+import uuid
+from contextlib import asynccontextmanager
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+
+
+@asynccontextmanager
+async def crear_base_temporal(semilla: str = ""):
+    """Engine sobre una base nueva (create_all + `semilla`, sentencias separadas por ';\\n')."""
+    from app import models  # noqa: F401  (registra tablas y DDL de triggers)
+    from app.models.base import Base
+
+    url = make_url(os.getenv("TEST_DATABASE_URL", settings.DATABASE_URL))
+    nombre = f"test_{uuid.uuid4().hex[:8]}"
+    admin = create_async_engine(url.set(database="postgres"), isolation_level="AUTOCOMMIT")
+    try:
+        async with admin.connect() as conn:
+            await conn.execute(text(f'CREATE DATABASE "{nombre}"'))
+    except Exception as e:
+        await admin.dispose()
+        pytest.skip(f"Postgres no disponible: {e}")
+
+    engine = create_async_engine(url.set(database=nombre))
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            for sentencia in semilla.split(";\n"):
+                if sentencia.strip():
+                    await conn.execute(text(sentencia))
+        yield engine
+    finally:
+        await engine.dispose()
+        async with admin.connect() as conn:
+            await conn.execute(text(f'DROP DATABASE IF EXISTS "{nombre}" WITH (FORCE)'))
+        await admin.dispose()
+
+
+@pytest.fixture(scope="session")
+def base_temporal():
+    return crear_base_temporal
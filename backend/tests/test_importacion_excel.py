@@ -0,0 +1,128 @@
+"""
+Comparación del libro del horario general contra lo guardado (comparar), sin base de
+datos ni Excel: el libro y las referencias se arman a mano con la forma que devuelven
+leer_libro y _referencias.
+
+    cd backend && python -m pytest -q tests/
+"""
+from datetime import time
+from types import SimpleNamespace as Fila
+
+from app.services.exportacion_service import etiqueta_hora
+from app.services.importacion_excel_service import comparar
+
+# Turno 1: Lunes y Martes, bloques 1 (07-08) y 2 (08-09)
+BLOQUES = [
+    Fila(id=1, dia_semana="Lunes", orden=1, id_turno=1, hora_inicio=time(7), hora_fin=time(8)),
+    Fila(id=2, dia_semana="Lunes", orden=2, id_turno=1, hora_inicio=time(8), hora_fin=time(9)),
+    Fila(id=3, dia_semana="Martes", orden=1, id_turno=1, hora_inicio=time(7), hora_fin=time(8)),
+    Fila(id=4, dia_semana="Martes", orden=2, id_turno=1, hora_inicio=time(8), hora_fin=time(9)),
+]
+# MATE y FISICA comparten la sección A del ciclo I; MATE también tiene grupo B con el mismo docente
+GRUPOS = [
+    Fila(id=10, nombre="A", id_turno=1, id_docente=100, ciclo=1, curso="MATE"),
+    Fila(id=11, nombre="A", id_turno=1, id_docente=200, ciclo=1, curso="FISICA"),
+    Fila(id=12, nombre="B", id_turno=1, id_docente=100, ciclo=1, curso="MATE"),
+]
+SESIONES = [
+    Fila(id=1, id_grupo=10, duracion_horas=2),
+    Fila(id=2, id_grupo=11, duracion_horas=1),
+    Fila(id=3, id_grupo=12, duracion_horas=1),
+]
+HORARIO = [
+    Fila(id=101, id_sesion=1, id_bloque=1, id_aula=5, ciclo=1, grupo="A", id_grupo=10, id_docente=100),
+    Fila(id=102, id_sesion=2, id_bloque=2, id_aula=None, ciclo=1, grupo="A", id_grupo=11, id_docente=200),
+    # Casilla vacía del esqueleto: no ocupa nada
+    Fila(id=103, id_sesion=None, id_bloque=3, id_aula=None, ciclo=1, grupo="A", id_grupo=None, id_docente=None),
+]
+REF = {
+    "por_columna": {("CICLO I", "GRUPO A"): GRUPOS[:2], ("CICLO I", "GRUPO B"): GRUPOS[2:]},
+    "bloque_turno": {(b.dia_semana, b.orden, b.id_turno): b for b in BLOQUES},
+    "bloque_libre": {(b.dia_semana, b.orden): b for b in BLOQUES},
+    "ordenes_turno": {1: {1, 2}},
+    "orden_por_hora": {etiqueta_hora(b.hora_inicio, b.hora_fin): b.orden for b in BLOQUES},
+    "aula_por_nombre": {"A101": 5, "A102": 6},
+    "sesiones": SESIONES,
+    "horario": HORARIO,
+    "bloques": {b.id: b for b in BLOQUES},
+}
+COLUMNAS = [("CICLO I", "GRUPO A"), ("CICLO I", "GRUPO B")]
+FILAS = [(9, "Lunes", "07:00 - 08:00"), (10, "Lunes", "08:00 - 09:00"),
+         (11, "Martes", "07:00 - 08:00"), (12, "Martes", "08:00-09:00")]
+# Lo guardado, tal como lo exporta el libro: (i_fila, i_columna) -> [(curso, aula)]
+GUARDADO = {(0, 0): [("MATE", "A101")], (1, 0): [("FISICA", None)]}
+
+
+def _comparar(celdas=None, columnas=COLUMNAS, filas=FILAS):
+    libro = {"columnas": columnas, "filas": filas, "celdas": GUARDADO if celdas is None else celdas}
+    return comparar(libro, REF)
+
+
+def _acciones(cambios):
+    return sorted((c["celda"], c["accion"], c["curso"]) for c in cambios)
+
+
+def test_libro_sin_cambios():
+    assert _comparar() == ([], [], [], [])
+
+
+def test_mover_a_una_casilla_del_esqueleto():
+    # MATE pasa de Lunes 07:00 a Martes 07:00 (casilla vacía del esqueleto): baja + alta de la misma sesión
+    errores, bajas, filas, cambios = _comparar({(2, 0): [("MATE", "A101")], (1, 0): [("FISICA", None)]})
+    assert errores == []
+    assert bajas == [101]
+    assert filas == [{"id_sesion": 1, "id_bloque": 3, "id_aula": 5, "ciclo": 1, "grupo": "A", "estado": 1}]
+    assert _acciones(cambios) == [("C11", "alta", "MATE"), ("C9", "baja", "MATE")]
+
+
+def test_cambio_de_aula():
+    errores, bajas, filas, cambios = _comparar({(0, 0): [("MATE", "A102")], (1, 0): [("FISICA", None)]})
+    assert errores == []
+    assert bajas == [101]
+    assert filas == [{"id_sesion": 1, "id_bloque": 1, "id_aula": 6, "ciclo": 1, "grupo": "A", "estado": 1}]
+    assert _acciones(cambios) == [("C9", "aula", "MATE")]
+
+
+def test_alta_toma_la_sesion_con_horas_libres():
+    # MATE dura 2 horas y tiene 1 puesta: la segunda va a la misma sesión
+    errores, bajas, filas, _ = _comparar({**GUARDADO, (2, 0): [("MATE", None)]})
+    assert errores == [] and bajas == []
+    assert [(f["id_sesion"], f["id_bloque"]) for f in filas] == [(1, 3)]
+
+
+def test_sesion_sin_horas_libres():
+    errores, _, _, _ = _comparar({**GUARDADO, (3, 0): [("FISICA", None)]})
+    assert errores == [{"celda": "C12", "error": "'FISICA' (grupo A) ya tiene todas las horas de sus sesiones asignadas."}]
+
+
+def test_cruce_de_docente_en_el_estado_final():
+    # MATE del grupo B a la misma hora que MATE del grupo A: mismo docente
+    errores, _, _, _ = _comparar({**GUARDADO, (0, 1): [("MATE", None)]})
+    assert errores == [{"celda": "D9", "error": "El docente del grupo ya dicta en Lunes (bloque 1)."}]
+
+
+def test_cruce_de_casilla_entre_cursos_de_la_misma_seccion():
+    # FISICA a Lunes 07:00, donde ya está MATE de la misma sección (ciclo I, grupo A)
+    errores, _, _, _ = _comparar({(0, 0): [("MATE", "A101"), ("FISICA", None)]})
+    assert errores == [{"celda": "C9", "error": "La casilla (ciclo 1, grupo 'A') ya está ocupada en Lunes (bloque 1)."}]
+
+
+def test_errores_de_referencia():
+    errores, _, _, _ = _comparar({(0, 0): [("MATE", "Z999")], (1, 0): [("QUIMICA", None)]})
+    assert errores == [
+        {"celda": "C9", "error": "Aula 'Z999' no existe."},
+        {"celda": "C10", "error": "El curso 'QUIMICA' no tiene grupo en CICLO I / GRUPO A."},
+    ]
+
+
+def test_columnas_y_filas_desconocidas():
+    errores, _, _, _ = _comparar(
+        {},
+        columnas=COLUMNAS + [("CICLO II", "GRUPO A")],
+        filas=FILAS + [(13, "Domingo", "07:00 - 08:00"), (14, "Martes", "20:00 - 21:00")],
+    )
+    assert errores == [
+        {"celda": "E8", "error": "La columna CICLO II / GRUPO A no existe en el periodo."},
+        {"celda": "A13", "error": "Día inválido: 'Domingo'."},
+        {"celda": "B14", "error": "Hora inválida: '20:00 - 21:00'."},
+    ]
@@ -0,0 +1,65 @@
+"""
+Requisitos circulares del importador de planes: buscar_ciclo sobre el grafo
+curso -> requisitos, y validar() cuando el ciclo pasa por cursos ya guardados.
+
+    cd backend && python -m pytest -q tests/
+"""
+import pandas as pd
+import pytest
+
+from app.services.importacion_plan_service import buscar_ciclo, validar
+
+
+@pytest.mark.parametrize("grafo", [
+    {},
+    {"A": set()},
+    {"A": {"B", "C"}, "B": {"C"}, "C": set()},
+    # Requisito que no es clave del grafo (curso sin requisitos propios)
+    {"A": {"B"}, "B": {"X"}},
+    # Diamante: D se alcanza por dos caminos y no es un ciclo
+    {"A": {"B", "C"}, "B": {"D"}, "C": {"D"}, "D": set()},
+], ids=["vacio", "suelto", "dag", "hoja_sin_clave", "diamante"])
+def test_sin_ciclo(grafo):
+    assert buscar_ciclo(grafo) is None
+
+
+@pytest.mark.parametrize("grafo, esperado", [
+    ({"A": {"A"}}, ["A", "A"]),
+    ({"A": {"B"}, "B": {"A"}}, ["A", "B", "A"]),
+    ({"A": {"B"}, "B": {"C"}, "C": {"A"}}, ["A", "B", "C", "A"]),
+    # El ciclo no incluye la raíz desde la que se llegó
+    ({"A": {"B"}, "B": {"C"}, "C": {"D"}, "D": {"B"}}, ["B", "C", "D", "B"]),
+], ids=["propio", "dos", "tres", "cola"])
+def test_ciclo(grafo, esperado):
+    assert buscar_ciclo(grafo) == esperado
+
+
+def test_cadena_larga_no_desborda_la_pila():
+    # Iterativo: una cadena más larga que el límite de recursión de Python
+    n = 5000
+    grafo = {f"C{i}": {f"C{i + 1}"} for i in range(n)}
+    assert buscar_ciclo(grafo) is None
+    grafo[f"C{n}"] = {"C0"}
+    ciclo = buscar_ciclo(grafo)
+    assert ciclo[0] == ciclo[-1] and len(ciclo) == n + 2
+
+
+def _plan(*filas):
+    columnas = ["CODIGO", "NOMBRE", "CICLO", "PARIDAD", "CREDITOS", "HORAS_TEORICAS", "HORAS_PRACTICAS",
+                "TIPO_CURSO", "REQUISITOS"]
+    return pd.DataFrame([[codigo, f"Curso {codigo}", "1", "IMPAR", "3", "2", "2", "O", reqs]
+                         for codigo, reqs in filas], columns=columnas)
+
+
+def test_validar_ciclo_con_cursos_de_la_version():
+    # MAT2 (archivo) pide MAT3, y MAT3 (ya guardado) pide MAT2
+    errores, _, _ = validar(_plan(("MAT2", "MAT3")), {"MAT3": 10}, {"MAT3": {"MAT2"}})
+    assert errores == [{"fila": 2, "error": "Requisitos circulares: MAT2 -> MAT3 -> MAT2"}]
+
+
+def test_validar_el_archivo_reemplaza_las_aristas_guardadas():
+    # Guardado: MAT3 pide MAT2. El archivo cambia MAT3 para que ya no lo pida: sin ciclo
+    errores, cursos, requisitos = validar(_plan(("MAT2", "MAT3"), ("MAT3", "")), {"MAT3": 10}, {"MAT3": {"MAT2"}})
+    assert errores == []
+    assert [c[1] for c in cursos] == ["MAT2", "MAT3"]
+    assert requisitos == {"MAT2": {"MAT3"}, "MAT3": set()}
@@ -0,0 +1,133 @@
+"""
+Validación por conjuntos del import CSV (_resolver_lote), sin base de datos: los mapas
+de sesiones y bloques se arman a mano con las mismas columnas que _sesiones / _bloques.
+
+    cd backend && python -m pytest -q tests/
+"""
+import pandas as pd
+import pytest
+
+from app.services.importacion_service import CRUCES, _resolver_lote
+
+# Turno 1: Lunes y Martes, bloques 1-3. Turno 2: Lunes bloque 1 (id 7, mismo orden que el id 1)
+BLOQUES = pd.DataFrame(
+    [("Lunes", 1, 1, 1), ("Lunes", 2, 1, 2), ("Lunes", 3, 1, 3),
+     ("Martes", 1, 1, 4), ("Martes", 2, 1, 5), ("Martes", 3, 1, 6),
+     ("Lunes", 1, 2, 7)],
+    columns=["dia", "orden", "id_turno", "id_bloque"],
+).astype({"orden": "float64", "id_turno": "float64"})
+
+# Sesiones 1 y 2 con el mismo docente; la 3 de un grupo sin turno y un docente que no viene los martes
+SESIONES = pd.DataFrame(
+    [(1, 2, 10, 100, 1, 1, "A"), (2, 1, 11, 100, 1, 2, "B"), (3, 1, 12, 200, None, 3, "C")],
+    columns=["id_sesion", "duracion_horas", "id_grupo", "id_docente", "id_turno", "ciclo", "grupo"],
+).astype({"id_sesion": "float64", "id_turno": "float64", "duracion_horas": "float64"})
+
+AULAS = {5, 6}
+BLOQUEADOS = {(200.0, "Martes")}
+
+
+def _ocupados(horas=None, **claves):
+    ocupados = {nombre: set(claves.get(nombre, ())) for nombre, _, _ in CRUCES}
+    ocupados["horas"] = pd.Series(horas or {}, dtype="float64")
+    return ocupados
+
+
+def _csv(*filas, inicio=2):
+    df = pd.DataFrame(list(filas), columns=["ID_SESION", "DIA", "BLOQUE_ORDEN", "ID_AULA"])
+    df["fila"] = range(inicio, inicio + len(df))
+    return df
+
+
+def _resolver(df, ocupados=None):
+    ocupados = _ocupados() if ocupados is None else ocupados
+    resultado = _resolver_lote(df, SESIONES, BLOQUES, AULAS, ocupados, BLOQUEADOS)
+    return dict(zip(resultado["fila"], resultado["error"])), resultado
+
+
+def test_filas_validas_se_resuelven():
+    errores, df = _resolver(_csv(("1", " lunes ", "2", "5"), ("3", "Lunes", "1", "")))
+    assert errores == {2: "", 3: ""}
+    # La sesión 3 no tiene turno: toma el primer bloque (menor id) de ese día y orden
+    assert df["id_bloque"].tolist() == [2, 1]
+    assert df["grupo"].tolist() == ["A", "C"]
+
+
+def test_filas_sin_dia_ni_bloque_se_ignoran():
+    errores, _ = _resolver(_csv(("1", "", "", ""), ("2", "Lunes", "1", "")))
+    assert errores == {3: ""}
+
+
+def test_cada_fila_reporta_su_primer_error():
+    errores, _ = _resolver(_csv(
+        ("x", "Lunes", "1", ""),
+        ("99", "Lunes", "1", ""),
+        ("1", "Domingo", "1", ""),
+        ("1", "Lunes", "1", "77"),
+        ("3", "martes", "1", "77"),
+    ))
+    assert errores == {
+        2: "Error de formato: ID_SESION, BLOQUE_ORDEN e ID_AULA deben ser números",
+        3: "Sesión 99 no encontrada en el periodo.",
+        4: "Bloque inválido: Domingo - 1",
+        5: "Aula 77 no existe.",
+        6: "Aula 77 no existe.",
+    }
+
+
+def test_dia_bloqueado_del_docente():
+    errores, _ = _resolver(_csv(("3", "Martes", "1", ""), ("3", "Lunes", "2", "")))
+    assert errores == {2: "El docente tiene restricción el Martes.", 3: ""}
+
+
+@pytest.mark.parametrize("ocupados, esperado", [
+    (_ocupados(grupo={(1, 10)}), "El grupo 'A' ya tiene clase en ese bloque."),
+    (_ocupados(docente={(1, 100)}), "El docente del grupo 'A' ya dicta en ese bloque."),
+    (_ocupados(aula={(1, 5)}), "El aula ID 5 ya está ocupada en ese bloque."),
+    (_ocupados(casilla={(1, 1, "A")}), "La casilla (ciclo 1, grupo 'A') ya está ocupada en ese bloque."),
+], ids=["grupo", "docente", "aula", "casilla"])
+def test_cruce_con_lo_guardado(ocupados, esperado):
+    errores, _ = _resolver(_csv(("1", "Lunes", "1", "5")), ocupados)
+    assert errores == {2: esperado}
+
+
+def test_cruce_entre_filas_del_archivo():
+    # Sesiones 1 y 2 comparten docente: la segunda fila en el mismo bloque choca con la primera
+    errores, _ = _resolver(_csv(("1", "Lunes", "1", ""), ("2", "Lunes", "1", ""), ("2", "Lunes", "2", "")))
+    assert errores == {2: "", 3: "El docente del grupo 'B' ya dicta en ese bloque.", 4: ""}
+
+
+def test_tope_de_horas_cuenta_lo_guardado_y_el_archivo():
+    # La sesión 1 dura 2 horas y ya tiene 1 guardada
+    errores, _ = _resolver(
+        _csv(("1", "Lunes", "1", ""), ("1", "Lunes", "2", ""), ("1", "Lunes", "3", "")),
+        _ocupados(horas={1.0: 1}),
+    )
+    assert errores == {
+        2: "",
+        3: "La sesión ya está completa (2/2 horas).",
+        4: "La sesión ya está completa (2/2 horas).",
+    }
+
+
+def test_una_fila_con_cruce_no_gasta_horas():
+    # La primera fila de la sesión 1 choca: la hora sigue libre para las siguientes
+    errores, _ = _resolver(
+        _csv(("1", "Lunes", "1", ""), ("1", "Lunes", "2", ""), ("1", "Lunes", "3", "")),
+        _ocupados(grupo={(1, 10)}),
+    )
+    assert errores == {2: "El grupo 'A' ya tiene clase en ese bloque.", 3: "", 4: ""}
+
+
+def test_los_lotes_siguientes_ven_lo_validado_antes():
+    ocupados = _ocupados()
+    primero, _ = _resolver(_csv(("1", "Lunes", "1", "5"), ("1", "Lunes", "2", "")), ocupados)
+    segundo, _ = _resolver(_csv(("2", "Martes", "1", "5"), ("2", "Lunes", "1", ""), ("1", "Martes", "2", ""),
+                                inicio=4), ocupados)
+    assert primero == {2: "", 3: ""}
+    assert segundo == {
+        4: "",
+        5: "El docente del grupo 'B' ya dicta en ese bloque.",
+        6: "La sesión ya está completa (2/2 horas).",
+    }
+    assert ocupados["horas"].to_dict() == {1.0: 2, 2.0: 1}
@@ -0,0 +1,153 @@
+"""
+Regresión de índices (revisión 0002): con un periodo grande sembrado, las consultas
+que arman los endpoints calientes tienen que usar sus índices (Index / Bitmap scan),
+no Seq Scan.
+
+Necesita un Postgres (fixture base_temporal de conftest.py). Sin servidor, se salta.
+
+    cd backend && python -m pytest -q tests/
+"""
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.endpoints import grupos, horarios
+from app.crud.crud_horario import horario as crud_horario
+from app.services import auditoria_service, carga_docente_service, exportacion_service
+
+PERIODOS = 40
+CURSOS = 300            # aperturas (y grupos) por periodo
+DOCENTES = 600
+TURNOS = 20
+BLOQUES_POR_TURNO = 30
+
+ESCANEOS_CON_INDICE = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+SEMILLA = f"""
+INSERT INTO escuela (nombre, facultad, estado) VALUES ('E1', 'F1', 1);
+INSERT INTO turno (nombre, hora_inicio, hora_fin, id_escuela, estado)
+  SELECT 'T' || t, '07:00', '13:00', 1, 1 FROM generate_series(1, {TURNOS}) t;
+INSERT INTO bloque_horario (dia_semana, hora_inicio, hora_fin, orden, id_turno, estado)
+  SELECT 'Lunes', '07:00', '08:00', b, t, 1
+  FROM generate_series(1, {TURNOS}) t, generate_series(1, {BLOQUES_POR_TURNO}) b ORDER BY t, b;
+INSERT INTO periodo_academico (codigo, nombre, fecha_inicio, fecha_fin, estado)
+  SELECT 'P' || p, 'P' || p, '2026-03-02', '2026-07-10', 1 FROM generate_series(1, {PERIODOS}) p;
+INSERT INTO plan_estudio (codigo, nombre, anio_inicio, id_escuela, estado) VALUES ('P1', 'Plan', 2020, 1, 1);
+INSERT INTO plan_version (codigo_version, id_plan_estudio, estado) VALUES ('V1', 1, 1);
+INSERT INTO curso (codigo, nombre, ciclo, paridad, creditos, horas_teoricas, horas_practicas, tipo_curso, id_plan_version, estado)
+  SELECT 'C' || c, 'Curso ' || c, c % 10 + 1, 'AMBOS', 3, 2, 2, 'O', 1, 1 FROM generate_series(1, {CURSOS}) c;
+INSERT INTO docente (dni, nombre, apellido, tipo_docente, horas_maximas_semanales, id_escuela, estado)
+  SELECT d::text, 'N' || d, 'A' || d, 'N', 20, 1, 1 FROM generate_series(1, {DOCENTES}) d;
+
+INSERT INTO curso_aperturado (id_curso, id_periodo, cupos_proyectados, estado)
+  SELECT c, p, 40, 1 FROM generate_series(1, {PERIODOS}) p, generate_series(1, {CURSOS}) c ORDER BY p, c;
+-- Un grupo por apertura: dentro de un periodo cada grupo tiene otro docente
+INSERT INTO grupo (nombre, vacantes, id_curso_aperturado, id_docente, id_turno, estado)
+  SELECT 'G' || ca.id, 40, ca.id, (ca.id - 1) % {CURSOS} + 1 + (ca.id_periodo % 2) * {CURSOS},
+         ca.id % {TURNOS} + 1, 1
+  FROM curso_aperturado ca ORDER BY ca.id;
+INSERT INTO sesion (tipo_sesion, duracion_horas, id_grupo, estado)
+  SELECT CASE k WHEN 0 THEN 'TEORIA' ELSE 'PRACTICA' END, 2, g.id, 1
+  FROM grupo g, generate_series(0, 1) k ORDER BY g.id, k;
+-- Una casilla por sesión (bloques distintos para las dos sesiones del grupo), 10% inactivas
+INSERT INTO horario (id_sesion, id_bloque, id_periodo, ciclo, grupo, estado)
+  SELECT s.id, (g.id_turno - 1) * {BLOQUES_POR_TURNO} + (s.id % 2) + 1, ca.id_periodo, 1, g.nombre,
+         CASE WHEN s.id % 10 = 0 THEN 0 ELSE 1 END
+  FROM sesion s JOIN grupo g ON g.id = s.id_grupo JOIN curso_aperturado ca ON ca.id = g.id_curso_aperturado
+  ORDER BY s.id;
+
+INSERT INTO restriccion (tipo, entidad_referencia, id_entidad, peso, estado)
+  SELECT t, 'DOCENTE', d, 100, 1
+  FROM generate_series(1, {DOCENTES}) d, unnest(ARRAY['DISPONIBILIDAD', 'CRUCE_DOCENTE', 'MAX_HORAS']) t;
+INSERT INTO disponibilidad_docente (id_docente, id_periodo, horas_asignadas_actuales, estado)
+  SELECT d, p, 0, 1 FROM generate_series(1, {DOCENTES}) d, generate_series(1, {PERIODOS}) p;
+"""
+
+# (nombre, llamada, índices esperados): se ejecuta el código real de cada endpoint (grilla,
+# pendientes, grupos detallados, Excel general, auditoría, carga docente), se capturan las
+# sentencias tal como salen hacia Postgres y se hace EXPLAIN de cada una con sus parámetros.
+# Los índices esperados tienen que aparecer en alguno de esos planes.
+ID_PERIODO = 7
+
+CONSULTAS = (
+    ("grilla_periodo",
+     lambda db: crud_horario.get_horario_periodo(db, ID_PERIODO),
+     {"ix_horario_periodo_estado_bloque"}),
+    ("grilla_delta",
+     lambda db: crud_horario.get_horario_periodo(db, ID_PERIODO, [1234, 1235]),
+     {"ix_horario_id"}),
+    ("sesiones_pendientes",
+     lambda db: horarios._consultar_sesiones_pendientes(db, ID_PERIODO),
+     {"ix_curso_aperturado_id_periodo", "ix_horario_sesion"}),
+    ("grupos_detallado",
+     lambda db: grupos._consultar_cursos_con_grupos(db, ID_PERIODO),
+     {"ix_curso_aperturado_id_periodo", "ix_grupo_id_curso_aperturado"}),
+    ("horario_general",
+     lambda db: exportacion_service.datos_horario_general(db, ID_PERIODO),
+     {"ix_curso_aperturado_id_periodo", "ix_horario_periodo_estado_bloque"}),
+    ("auditoria_cruces",
+     lambda db: auditoria_service.buscar_cruces_periodo(db, ID_PERIODO),
+     {"ix_horario_periodo_estado_bloque"}),
+    ("carga_docente",
+     lambda db: carga_docente_service.mover_horas_docente(db, 17, ID_PERIODO, -2),
+     {"uq_disponibilidad_docente_periodo"}),
+)
+
+
+def _nodos(plan: dict):
+    yield plan
+    for hijo in plan.get("Plans", ()):
+        yield from _nodos(hijo)
+
+
+async def _capturar(engine, llamada) -> list:
+    """Corre `llamada` en una sesión (que se deshace) y devuelve las sentencias que mandó."""
+    enviadas = []
+
+    def anotar(conn, cursor, sentencia, parametros, contexto, executemany):
+        enviadas.append((sentencia, parametros))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", anotar)
+    try:
+        async with AsyncSession(engine) as db:
+            await llamada(db)
+            await db.rollback()
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", anotar)
+    return enviadas
+
+
+async def _planes(base_temporal) -> dict:
+    async with base_temporal(SEMILLA) as engine:
+        async with engine.connect() as conn:
+            await conn.execute(text("ANALYZE"))
+            await conn.commit()
+
+        planes = {}
+        for nombre_consulta, llamada, _ in CONSULTAS:
+            enviadas = await _capturar(engine, llamada)
+            async with engine.connect() as conn:
+                planes[nombre_consulta] = []
+                for sql, parametros in enviadas:
+                    fila = (await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}", parametros)).scalar()
+                    planes[nombre_consulta].append((json.loads(fila) if isinstance(fila, str) else fila)[0]["Plan"])
+        return planes
+
+
+@pytest.fixture(scope="module")
+def planes(base_temporal):
+    return asyncio.run(_planes(base_temporal))
+
+
+@pytest.mark.parametrize("nombre, llamada, indices", CONSULTAS, ids=[c[0] for c in CONSULTAS])
+def test_consulta_usa_indice(planes, nombre, llamada, indices):
+    assert planes[nombre], f"{nombre}: no se capturó ninguna sentencia"
+    nodos = [n for plan in planes[nombre] for n in _nodos(plan)]
+    usados = {n.get("Index Name") for n in nodos if n["Node Type"] in ESCANEOS_CON_INDICE}
+    assert indices <= usados, (
+        f"{nombre}: se esperaba {sorted(indices - usados)}; planes = "
+        + ", ".join(f"{n['Node Type']}({n.get('Index Name') or n.get('Relation Name', '')})" for n in nodos)
+    )
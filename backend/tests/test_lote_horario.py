@@ -0,0 +1,88 @@
+"""
+planificar_lote / guardar_lote (mover-lote) contra un Postgres real: el estado final se
+valida como un todo, así que un intercambio o un movimiento a una casilla que el mismo
+lote libera no es un cruce, y uno real sí.
+
+    cd backend && python -m pytest -q tests/
+"""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.schemas.horario import LoteMovimientos
+from app.services.lote_horario_service import guardar_lote, planificar_lote
+
+# Periodo 1 con dos cursos del ciclo 1 en el mismo grupo 'A' (misma casilla de alumnos),
+# cada uno con su docente y una sesión de 1 hora. Periodo 2 con una sesión propia.
+SEMILLA = """
+INSERT INTO escuela (nombre, facultad, estado) VALUES ('E1', 'F1', 1);
+INSERT INTO turno (nombre, hora_inicio, hora_fin, id_escuela, estado) VALUES ('MAÑANA', '07:00', '13:00', 1, 1);
+INSERT INTO bloque_horario (dia_semana, hora_inicio, hora_fin, orden, id_turno, estado)
+  SELECT 'Lunes', make_time(6 + o, 0, 0), make_time(7 + o, 0, 0), o, 1, 1 FROM generate_series(1, 4) o;
+INSERT INTO periodo_academico (codigo, nombre, fecha_inicio, fecha_fin, estado)
+  VALUES ('2026-I', '2026-I', '2026-03-02', '2026-07-10', 1), ('2026-II', '2026-II', '2026-08-03', '2026-12-11', 1);
+INSERT INTO plan_estudio (codigo, nombre, anio_inicio, id_escuela, estado) VALUES ('P1', 'Plan', 2020, 1, 1);
+INSERT INTO plan_version (codigo_version, id_plan_estudio, estado) VALUES ('V1', 1, 1);
+INSERT INTO curso (codigo, nombre, ciclo, paridad, creditos, horas_teoricas, horas_practicas, tipo_curso, id_plan_version, estado)
+  VALUES ('C1', 'Mate', 1, 'IMPAR', 3, 1, 0, 'O', 1, 1), ('C2', 'Fisica', 1, 'IMPAR', 3, 1, 0, 'O', 1, 1);
+INSERT INTO docente (dni, nombre, apellido, tipo_docente, horas_maximas_semanales, id_escuela, estado)
+  VALUES ('1', 'Ana', 'Perez', 'N', 20, 1, 1), ('2', 'Luis', 'Diaz', 'N', 20, 1, 1);
+INSERT INTO curso_aperturado (id_curso, id_periodo, cupos_proyectados, estado) VALUES (1, 1, 40, 1), (2, 1, 40, 1), (1, 2, 40, 1);
+INSERT INTO grupo (nombre, vacantes, id_curso_aperturado, id_docente, id_turno, estado)
+  VALUES ('A', 40, 1, 1, 1, 1), ('A', 40, 2, 2, 1, 1), ('A', 40, 3, 1, 1, 1);
+INSERT INTO sesion (tipo_sesion, duracion_horas, id_grupo, estado) VALUES ('TEORIA', 1, 1, 1), ('TEORIA', 1, 2, 1), ('TEORIA', 1, 3, 1);
+INSERT INTO horario (id_sesion, id_bloque, id_periodo, ciclo, grupo, estado) VALUES (1, 1, 1, 1, 'A', 1), (2, 2, 1, 1, 'A', 1)
+"""
+
+
+@pytest.fixture
+def lote(base_temporal):
+    """Corre planificar_lote (y si no hay cruces, guardar_lote) sobre una base recién sembrada."""
+    def correr(**datos):
+        async def _correr():
+            async with base_temporal(SEMILLA) as engine:
+                async with AsyncSession(engine) as db:
+                    filas, errores = await planificar_lote(db, LoteMovimientos(id_periodo=1, **datos))
+                    if not errores:
+                        await guardar_lote(db, 1, filas)
+                        await db.commit()
+                    posiciones = (await db.execute(text(
+                        "SELECT id_sesion, id_bloque FROM horario WHERE id_sesion IS NOT NULL ORDER BY id_sesion"
+                    ))).all()
+                    return errores, dict(posiciones)
+        return asyncio.run(_correr())
+    return correr
+
+
+def test_intercambio_no_choca_consigo_mismo(lote):
+    errores, posiciones = lote(intercambios=[{"id_sesion_a": 1, "id_sesion_b": 2}])
+    assert errores == []
+    assert posiciones == {1: 2, 2: 1}
+
+
+def test_mover_a_una_casilla_que_el_lote_libera(lote):
+    # La sesión 2 deja el bloque 2 en el mismo lote en que la 1 llega ahí
+    errores, posiciones = lote(movimientos=[{"id_sesion": 1, "id_bloque": 2}, {"id_sesion": 2, "id_bloque": 3}])
+    assert errores == []
+    assert posiciones == {1: 2, 2: 3}
+
+
+def test_cruce_real_no_guarda_nada(lote):
+    errores, posiciones = lote(movimientos=[{"id_sesion": 1, "id_bloque": 2}])
+    assert len(errores) == 1
+    assert "Sesión 1" in errores[0] and "(sesión 2)" in errores[0]
+    assert posiciones == {1: 1, 2: 2}
+
+
+@pytest.mark.parametrize("datos, codigo", [
+    ({"movimientos": [{"id_sesion": 3, "id_bloque": 3}]}, 404),    # sesión de otro periodo
+    ({"movimientos": [{"id_sesion": 1, "id_bloque": 99}]}, 404),   # bloque inexistente
+    ({"movimientos": [{"id_sesion": 1, "id_bloque": 3}, {"id_sesion": 1, "id_bloque": 4}]}, 422),
+], ids=["otro_periodo", "bloque_inexistente", "sesion_repetida"])
+def test_lote_mal_armado_no_es_cruce(lote, datos, codigo):
+    with pytest.raises(HTTPException) as error:
+        lote(**datos)
+    assert error.value.status_code == codigo
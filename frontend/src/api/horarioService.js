@@ -21,6 +21,30 @@ export default {
         return response.data;
     },
 
+    // Versión liviana para la grilla: { bloques, sesiones, grupos, cursos, docentes, aulas, celdas }
+    // celdas viene en columnas: celdas.id_sesion[i] va con celdas.id_bloque[i] y celdas.id_aula[i]
+    async getGrilla(idPeriodo) {
+        const response = await api.get(`${ENDPOINT_HORARIOS}/periodo/${idPeriodo}/grilla`);
+        return response.data;
+    },
+
+    // Solo lo que cambió desde `desde` (el seq de la respuesta anterior; 0 = todo)
+    // { modo: 'delta' | 'completo', seq, actualizados: [...], eliminados: [ids] }
+    async getCambios(idPeriodo, desde = 0) {
+        const response = await api.get(`${ENDPOINT_HORARIOS}/periodo/${idPeriodo}/cambios`, { params: { desde } });
+        return response.data;
+    },
+
+    // Grilla en vivo: el servidor avisa cada guardado de otros editores del periodo
+    // onMensaje recibe { tipo: 'conectado' | 'cambios' | 'recargar', seq, actualizados?, eliminados? }
+    // Devuelve el WebSocket (llamar a .close() al salir de la vista)
+    conectarCambios(idPeriodo, onMensaje) {
+        const base = api.defaults.baseURL.replace(/^http/, 'ws');
+        const ws = new WebSocket(`${base}${ENDPOINT_HORARIOS}/ws/periodo/${idPeriodo}`);
+        ws.onmessage = (event) => onMensaje(JSON.parse(event.data));
+        return ws;
+    },
+
     async asignarSesion(payload) {
         // payload: { id_sesion, id_bloque, id_aula, id_periodo }
         const response = await api.post(`${ENDPOINT_HORARIOS}/`, payload);
@@ -57,6 +81,13 @@ export default {
         return response.data;
     },
 
+    // Mover / intercambiar varias sesiones en una sola operación
+    async moverLote(payload) {
+        // payload: { id_periodo, movimientos: [{ id_sesion, id_bloque, id_aula }], intercambios: [{ id_sesion_a, id_sesion_b }] }
+        const response = await api.post(`${ENDPOINT_HORARIOS}/mover-lote`, payload);
+        return response.data;
+    },
+
     // Eliminar una asignación
     async eliminar(idHorario) {
         await api.delete(`${ENDPOINT_HORARIOS}/${idHorario}`);